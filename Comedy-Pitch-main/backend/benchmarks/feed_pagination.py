@@ -0,0 +1,134 @@
+"""
+Deep-page feed latency benchmark at catalog scale.
+
+Seeds a SQLite database with --videos rows (default 1M), then times one feed
+page at increasing cursor depths for:
+  - before: the old OR-expanded cursor predicate with no composite indexes
+  - after:  apply_feed_cursor's row-value predicate with the keyset indexes
+
+Seeding 1M rows takes a minute or two; the database is kept in --db-path
+between runs (delete it to reseed).
+
+Usage (from backend/):
+    python -m benchmarks.feed_pagination --videos 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from config.database import Base
+from models.models import User, Video
+from routes.videos import apply_feed_cursor, with_video_authors
+
+BASE_TIME = datetime(2024, 1, 1)
+USERS = 1000
+PAGE_SIZE = 20
+
+def seed(engine, videos: int) -> None:
+    """Insert users and videos; video i is posted i seconds after BASE_TIME"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM videos")).scalar() >= videos:
+            return
+        conn.execute(insert(User), [
+            {"id": i, "firebase_uid": f"bench-{i}", "email": f"bench-{i}@example.com", "is_active": True}
+            for i in range(1, USERS + 1)
+        ])
+        chunk = 50000
+        for start in range(0, videos, chunk):
+            conn.execute(insert(Video), [
+                {
+                    "id": i + 1,
+                    "user_id": (i % USERS) + 1,
+                    "firebase_uid": f"bench-{(i % USERS) + 1}",
+                    "title": f"Set {i}",
+                    "file_type": "video",
+                    "storage_key": f"videos/{i}.mp4",
+                    # Most of the catalog is public
+                    "is_public": i % 10 != 0,
+                    "posted_at": BASE_TIME + timedelta(seconds=i),
+                }
+                for i in range(start, min(start + chunk, videos))
+            ])
+            print(f"  seeded {min(start + chunk, videos):,} videos", flush=True)
+
+def set_indexes(engine, enabled: bool) -> None:
+    with engine.begin() as conn:
+        if enabled:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_videos_public_feed ON videos (is_public, posted_at, id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_videos_user_feed ON videos (user_id, posted_at, id)"))
+        else:
+            conn.execute(text("DROP INDEX IF EXISTS ix_videos_public_feed"))
+            conn.execute(text("DROP INDEX IF EXISTS ix_videos_user_feed"))
+        conn.execute(text("ANALYZE"))
+
+def cursor_at_depth(videos: int, depth: int) -> str:
+    """Cursor pointing just past the row ``depth`` rows from the newest"""
+    video_id = videos - depth
+    posted_at = BASE_TIME + timedelta(seconds=video_id - 1)
+    return f"{posted_at.isoformat()}_{video_id}"
+
+def legacy_cursor(query, cursor: str):
+    """The pre-keyset-index predicate, kept here for comparison"""
+    cursor_timestamp, cursor_id = cursor.split('_')
+    cursor_datetime = datetime.fromisoformat(cursor_timestamp)
+    query = query.filter(
+        (Video.posted_at < cursor_datetime) |
+        ((Video.posted_at == cursor_datetime) & (Video.id < int(cursor_id)))
+    )
+    return query.order_by(Video.posted_at.desc(), Video.id.desc())
+
+def time_page(db, build_query, repeats: int) -> float:
+    """Median milliseconds to fetch one page"""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        rows = with_video_authors(build_query()).limit(PAGE_SIZE + 1).all()
+        samples.append((time.perf_counter() - started) * 1000)
+        assert rows, "empty page"
+        db.expunge_all()
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db-path", default="bench_feed_pagination.db")
+    args = parser.parse_args()
+    
+    engine = create_engine(f"sqlite:///{args.db_path}")
+    print(f"Seeding {args.videos:,} videos into {args.db_path}...")
+    seed(engine, args.videos)
+    
+    depths = [0, args.videos // 100, args.videos // 10, args.videos // 2, (args.videos * 9) // 10]
+    user_id = 7
+    
+    for label, indexed, apply_cursor in (
+        ("before", False, legacy_cursor),
+        ("after", True, apply_feed_cursor),
+    ):
+        set_indexes(engine, indexed)
+        print(f"\n{label}: {'keyset indexes + row-value cursor' if indexed else 'no composite indexes + OR cursor'}")
+        print(f"{'depth':>10} {'home feed ms':>14} {'user feed ms':>14}")
+        with Session(engine) as db:
+            for depth in depths:
+                cursor = cursor_at_depth(args.videos, depth)
+                home = time_page(db, lambda: apply_cursor(
+                    db.query(Video).filter(Video.is_public == True), cursor), args.repeats)
+                user = time_page(db, lambda: apply_cursor(
+                    db.query(Video).filter(Video.user_id == user_id, Video.is_public == True), cursor), args.repeats)
+                print(f"{depth:>10,} {home:>14.2f} {user:>14.2f}")
+    
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
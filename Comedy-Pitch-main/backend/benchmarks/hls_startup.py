@@ -0,0 +1,149 @@
+"""
+Time to first frame for a 60-minute set: the raw upload vs the HLS ladder.
+
+Models what a player must download before it can start, on a few network
+profiles, as round trips * RTT + bytes / bandwidth:
+  - raw, moov at end: the MP4 as phones record it; the player fetches the head,
+    finds no index, seeks to the end for the moov box, then reads the first second
+  - raw, faststart:   the MP4 with its moov box first (index, then the first second)
+  - hls:              master playlist, the lowest rendition's playlist, its first segment
+
+The moov index grows with the set (about 16 bytes per video frame and 8 per
+audio frame across its sample tables), which is what makes long raw sets slow to
+start; HLS downloads are independent of the set's length.
+
+Pass --source to measure real sizes instead: the file's moov box is located and
+(when ffmpeg is available) it is transcoded with the transcode worker's command
+to measure the playlists and first segment.
+
+Usage (from backend/):
+    python -m benchmarks.hls_startup --minutes 60
+    python -m benchmarks.hls_startup --source path/to/set.mp4
+"""
+import argparse
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from workers.transcode_worker import (
+    HLS_SEGMENT_SECONDS,
+    MediaInfo,
+    VIDEO_RENDITIONS,
+    ffmpeg_command,
+    select_renditions
+)
+
+# (name, downlink Mbit/s, round trip ms), after Chrome DevTools' throttling presets
+NETWORKS = (
+    ("slow 3g", 0.4, 2000),
+    ("fast 3g", 1.6, 562),
+    ("4g", 9.0, 170),
+    ("wifi", 30.0, 40)
+)
+
+# A phone recording of a set: 1080p30 H.264 at ~8 Mbit/s, 48 kHz AAC
+RAW_BITRATE = 8_000_000
+RAW_HEAD_BYTES = 64 * 1024  # First read of the file, before the player knows where moov is
+VIDEO_FPS = 30
+AUDIO_FRAMES_PER_SECOND = 48_000 / 1024
+MOOV_BYTES_PER_VIDEO_FRAME = 16  # stsz + stts/ctts + stss + stco entries
+MOOV_BYTES_PER_AUDIO_FRAME = 8
+PLAYLIST_BYTES_PER_SEGMENT = 40  # "#EXTINF:6.000000,\nsegment_00000.ts\n"
+
+def modelled_sizes(minutes: float) -> dict:
+    """Bytes each startup path needs, from the bitrates above"""
+    seconds = minutes * 60
+    moov = int(seconds * (VIDEO_FPS * MOOV_BYTES_PER_VIDEO_FRAME + AUDIO_FRAMES_PER_SECOND * MOOV_BYTES_PER_AUDIO_FRAME))
+    first_second = RAW_BITRATE // 8
+    lowest = VIDEO_RENDITIONS[0]
+    return {
+        "moov": moov,
+        "first_second": first_second,
+        "master": 400,
+        "variant": int(seconds / HLS_SEGMENT_SECONDS * PLAYLIST_BYTES_PER_SEGMENT),
+        "first_segment": int(HLS_SEGMENT_SECONDS * lowest.bandwidth / 8 * 1.04)  # + MPEG-TS overhead
+    }
+
+def startup_paths(sizes: dict) -> dict:
+    """(round trips, bytes) before the first frame for each delivery mode"""
+    return {
+        "raw, moov at end": (3, RAW_HEAD_BYTES + sizes["moov"] + sizes["first_second"]),
+        "raw, faststart": (1, sizes["moov"] + sizes["first_second"]),
+        "hls": (3, sizes["master"] + sizes["variant"] + sizes["first_segment"])
+    }
+
+def startup_seconds(round_trips: int, size: int, mbps: float, rtt_ms: float) -> float:
+    # Every request pays one round trip; TCP/TLS setup is the same for all modes and left out
+    return round_trips * rtt_ms / 1000 + size * 8 / (mbps * 1_000_000)
+
+def moov_size(path: str) -> int:
+    """Size of an MP4's moov box, walking the top-level boxes"""
+    with open(path, "rb") as file:
+        while True:
+            header = file.read(8)
+            if len(header) < 8:
+                raise ValueError("No moov box found")
+            size, box = struct.unpack(">I4s", header)
+            if size == 1:
+                size = struct.unpack(">Q", file.read(8))[0]
+                header_size = 16
+            else:
+                header_size = 8
+            if box == b"moov":
+                return size
+            if size == 0:
+                raise ValueError("No moov box found")
+            file.seek(size - header_size, os.SEEK_CUR)
+
+def measured_sizes(source: str, ffmpeg: str) -> dict:
+    """Real sizes for one file: its moov box and, with ffmpeg, a transcode to HLS"""
+    sizes = {"moov": moov_size(source)}
+    probe = subprocess.run(
+        [ffmpeg.replace("ffmpeg", "ffprobe"), "-v", "error", "-show_entries", "format=duration,bit_rate", "-of", "csv=p=0", source],
+        capture_output=True, text=True, check=True
+    )
+    duration, bit_rate = (float(value) for value in probe.stdout.strip().split(","))
+    sizes["first_second"] = int(bit_rate / 8)
+    sizes["minutes"] = duration / 60
+    with tempfile.TemporaryDirectory() as output_dir:
+        info = MediaInfo(has_video=True, has_audio=True, height=VIDEO_RENDITIONS[-1].height, duration=duration)
+        renditions = select_renditions(info)
+        for rendition in renditions:
+            os.makedirs(os.path.join(output_dir, rendition.name))
+        command = ffmpeg_command(source, output_dir, renditions, info)
+        command[0] = ffmpeg
+        subprocess.run(command, check=True)
+        lowest = os.path.join(output_dir, renditions[0].name)
+        sizes["master"] = os.path.getsize(os.path.join(output_dir, "master.m3u8"))
+        sizes["variant"] = os.path.getsize(os.path.join(lowest, "index.m3u8"))
+        sizes["first_segment"] = os.path.getsize(os.path.join(lowest, "segment_00000.ts"))
+    return sizes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=60.0, help="Set length for the modelled sizes")
+    parser.add_argument("--source", help="Measure a real MP4 instead of modelling one")
+    parser.add_argument("--ffmpeg", default=shutil.which("ffmpeg") or "ffmpeg")
+    args = parser.parse_args()
+
+    if args.source:
+        sizes = measured_sizes(args.source, args.ffmpeg)
+        print(f"{args.source}: {sizes['minutes']:.0f} min, moov {sizes['moov'] / 1024:.0f} KiB\n")
+    else:
+        sizes = modelled_sizes(args.minutes)
+        print(f"Modelled {args.minutes:.0f} min set at {RAW_BITRATE / 1e6:.0f} Mbit/s, moov {sizes['moov'] / 1024:.0f} KiB\n")
+
+    paths = startup_paths(sizes)
+    print(f"{'mode':<18} {'requests':>8} {'KiB':>8}" + "".join(f" {name:>9}" for name, _, _ in NETWORKS))
+    for label, (round_trips, size) in paths.items():
+        times = "".join(f" {startup_seconds(round_trips, size, mbps, rtt):>8.2f}s" for _, mbps, rtt in NETWORKS)
+        print(f"{label:<18} {round_trips:>8} {size / 1024:>8.0f}{times}")
+
+if __name__ == "__main__":
+    main()
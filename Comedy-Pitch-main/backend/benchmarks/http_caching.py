@@ -0,0 +1,143 @@
+"""
+Bytes on the wire and server CPU for GET /api/videos/{id}/analytics.
+
+Seeds one analysed video shaped like a full special (--segments transcript
+segments, --laughs laughter events), then fetches its analytics --requests times
+in each mode:
+  - before:      no compression, no conditional request (a full 200 every time)
+  - gzip:        Accept-Encoding: gzip through GZipMiddleware
+  - conditional: gzip plus If-None-Match with the ETag from the first response (304)
+
+CPU is process time for the whole in-process request (server plus the thin test
+client), so it slightly overstates the server share.
+
+Usage (from backend/):
+    python -m benchmarks.http_caching --segments 1500
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+from config.database import Base, get_db
+from models.models import User, Video, AnalyticsData
+from routes.auth import verify_token_dependency
+from routes.ml import replace_transcript_segments
+from routes.videos import router as videos_router
+
+FIREBASE_USER = {"uid": "bench-uid", "email": "bench@example.com", "name": "Bench"}
+
+def seed(SessionLocal, segments: int, laughs: int) -> int:
+    """Create one comedian with one analysed set, returns the video id"""
+    with SessionLocal() as db:
+        user = User(firebase_uid=FIREBASE_USER["uid"], email=FIREBASE_USER["email"], is_active=True)
+        db.add(user)
+        db.commit()
+        video = Video(
+            user_id=user.id,
+            firebase_uid=user.firebase_uid,
+            title="Full Special",
+            file_type="video",
+            storage_key="videos/special.mp4",
+            processing_status="completed"
+        )
+        db.add(video)
+        db.commit()
+        transcript = [
+            {
+                "text": f"Segment {i}: so my landlord texts me at 3am about the recycling again, and I said",
+                "start_time": i * 3.6,
+                "end_time": i * 3.6 + 3.4,
+                "funniness_score": (i % 10) / 10
+            }
+            for i in range(segments)
+        ]
+        analytics = AnalyticsData(
+            video_id=video.id,
+            transcript=transcript,
+            overall_funniness_score=0.72,
+            laughter_timestamps=[
+                {"timestamp": i * 18.0, "duration": 2.5, "intensity": 0.8} for i in range(laughs)
+            ],
+            processing_version="v1.0.0"
+        )
+        db.add(analytics)
+        db.flush()
+        replace_transcript_segments(db, analytics.id, transcript)
+        db.commit()
+        return video.id
+
+def make_app(SessionLocal, compress: bool) -> FastAPI:
+    app = FastAPI()
+    if compress:
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+    app.include_router(videos_router, prefix="/api/videos")
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[verify_token_dependency] = lambda: FIREBASE_USER
+    return app
+
+def run(client: TestClient, url: str, headers: dict, requests: int):
+    """Returns (status, wire bytes per request, CPU ms per request)"""
+    wire = 0
+    status = None
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get(url, headers=headers)
+        status = response.status_code
+        wire += int(response.headers.get("content-length", len(response.content)))
+    cpu = time.process_time() - started
+    return status, wire / requests, cpu * 1000 / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=1500)
+    parser.add_argument("--laughs", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    # routes.auth configures INFO logging for every request; keep the table readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False)
+        video_id = seed(SessionLocal, args.segments, args.laughs)
+        url = f"/api/videos/{video_id}/analytics"
+
+        plain = TestClient(make_app(SessionLocal, compress=False))
+        compressed = TestClient(make_app(SessionLocal, compress=True))
+        etag = compressed.get(url).headers["ETag"]
+
+        print(f"{args.segments} segments, {args.laughs} laughter events, {args.requests} requests per mode\n")
+        print(f"{'mode':<12} {'status':>6} {'bytes/req':>12} {'cpu ms/req':>12}")
+        for label, client, headers in (
+            ("before", plain, {"Accept-Encoding": "identity"}),
+            ("gzip", compressed, {"Accept-Encoding": "gzip"}),
+            ("conditional", compressed, {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ):
+            status, wire, cpu = run(client, url, headers, args.requests)
+            print(f"{label:<12} {status:>6} {wire:>12,.0f} {cpu:>12.2f}")
+
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
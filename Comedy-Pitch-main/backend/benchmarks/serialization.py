@@ -0,0 +1,128 @@
+"""
+Serialization cost of one feed page, broken down by stage.
+
+Builds --items in-memory videos (no database) and times, per page:
+  before:
+    build      VideoResponse(...) with full validation for every item
+    validate   FastAPI's response_model pass (validate + serialize to JSON-able)
+    encode     JSONResponse (stdlib json.dumps)
+  after:
+    build      plain dicts for trusted rows (format_video_responses)
+    encode     FastJSONResponse (orjson, datetimes encoded natively)
+
+For reference, VideoResponse.model_construct is also timed: in Pydantic 2 it is
+pure Python and slower than a validated build, so the fast path uses dicts.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --items 100
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from config.fast_json import FastJSONResponse
+from models.models import User, Video
+from routes.videos import VideoListResponse, VideoResponse, format_video_author, format_video_responses
+
+def make_videos(items: int):
+    authors = [
+        User(id=i, firebase_uid=f"uid-{i}", email=f"{i}@example.com", display_name=f"Comic {i}",
+             stage_name=f"Stage {i}", is_comedian=True)
+        for i in range(10)
+    ]
+    base = datetime(2024, 1, 1)
+    videos = []
+    for i in range(items):
+        video = Video(
+            id=i + 1, user_id=i % 10, title=f"Tight five #{i}", description="Crowd work at the late show",
+            duration=312.5, file_type="video", storage_key=f"videos/{i}.mp4", thumbnail_url=None,
+            is_public=True, view_count=i * 7, like_count=i, comment_count=0, venue_name="The Cellar",
+            performance_date=base, created_at=base + timedelta(seconds=i), posted_at=base + timedelta(seconds=i)
+        )
+        video.user = authors[i % 10]
+        videos.append(video)
+    return videos
+
+def validated_page(videos, storage):
+    """The pre-change path: every item goes through Pydantic validation"""
+    return VideoListResponse(
+        videos=[
+            VideoResponse(
+                id=video.id, title=video.title, description=video.description, duration=video.duration,
+                file_type=video.file_type, storage_url=storage.get_public_url(video.storage_key),
+                thumbnail_url=video.thumbnail_url, is_public=video.is_public, view_count=video.view_count,
+                like_count=video.like_count, comment_count=video.comment_count, venue_name=video.venue_name,
+                performance_date=video.performance_date, created_at=video.created_at, posted_at=video.posted_at,
+                user=format_video_author(video.user)
+            )
+            for video in videos
+        ],
+        cursor=None,
+        has_more=False
+    )
+
+def timed(fn, repeats: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    videos = make_videos(args.items)
+    storage = MagicMock()
+    storage.get_public_url.side_effect = lambda key: f"https://cdn.example.com/{key}"
+    storage.get_download_url.side_effect = lambda key, private=False: f"https://cdn.example.com/{key}"
+    field = create_response_field(name="Response_list_videos", type_=VideoListResponse)
+
+    def response_model_pass(page):
+        return asyncio.run(serialize_response(field=field, response_content=page, is_coroutine=True))
+
+    page = validated_page(videos, storage)
+    content = response_model_pass(page)
+    before = {
+        "build": timed(lambda: validated_page(videos, storage), args.repeats),
+        "validate": timed(lambda: response_model_pass(page), args.repeats),
+        "encode": timed(lambda: JSONResponse(content), args.repeats),
+    }
+
+    with patch("routes.videos.get_storage", return_value=storage):
+        fast_page = {"videos": format_video_responses(videos), "cursor": None, "has_more": False}
+        after = {
+            "build": timed(lambda: {"videos": format_video_responses(videos), "cursor": None, "has_more": False}, args.repeats),
+            "validate": 0.0,
+            "encode": timed(lambda: FastJSONResponse(fast_page), args.repeats),
+        }
+        items = format_video_responses(videos)
+        construct_ms = timed(lambda: [VideoResponse.model_construct(**item) for item in items], args.repeats)
+        validated_ms = timed(lambda: [VideoResponse(**item) for item in items], args.repeats)
+
+    assert len(JSONResponse(content).body) > 0 and len(FastJSONResponse(fast_page).body) > 0
+
+    print(f"{args.items}-item feed page, median of {args.repeats} runs (ms)\n")
+    print(f"{'stage':<10} {'before':>10} {'after':>10}")
+    for stage in ("build", "validate", "encode"):
+        print(f"{stage:<10} {before[stage]:>10.3f} {after[stage]:>10.3f}")
+    print(f"{'total':<10} {sum(before.values()):>10.3f} {sum(after.values()):>10.3f}")
+    print(f"\nmodels from the same item dicts: validated {validated_ms:.3f} ms, model_construct {construct_ms:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+SQLite concurrency benchmark: feed reads and likes under parallel load.
+
+Compares the development setup (one shared connection via StaticPool) with the
+production WAL-mode pool from config.database. Each worker thread opens its own
+session per operation, the same way a request does.
+
+Each mode runs in its own subprocess: under write-heavy load the shared
+connection can crash the interpreter outright, which is reported as such.
+
+Usage (from backend/):
+    python -m benchmarks.sqlite_concurrency --threads 8 --seconds 5
+"""
+import argparse
+import json
+import subprocess
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from config.database import Base, create_db_engine
+from models.models import User, Video, Like
+
+def seed(engine, users: int, videos: int) -> None:
+    """Create users and public videos to page through"""
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for i in range(users):
+        db.add(User(firebase_uid=f"bench-{i}", email=f"bench-{i}@example.com", display_name=f"Bench {i}"))
+    db.commit()
+    for i in range(videos):
+        db.add(Video(
+            user_id=(i % users) + 1,
+            firebase_uid=f"bench-{i % users}",
+            title=f"Set {i}",
+            file_type="video",
+            storage_key=f"videos/{i}.mp4",
+            is_public=True
+        ))
+    db.commit()
+    db.close()
+
+def feed_page(db, limit: int = 20) -> int:
+    """Same query shape as the home feed"""
+    videos = (
+        db.query(Video)
+        .filter(Video.is_public == True)
+        .order_by(Video.posted_at.desc(), Video.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return sum(1 for video in videos if video.user is not None)
+
+def like(db, user_id: int, video_id: int) -> None:
+    """Insert a like and bump the counter in one transaction"""
+    db.add(Like(user_id=user_id, video_id=video_id, firebase_uid=f"bench-{user_id - 1}"))
+    db.execute(update(Video).where(Video.id == video_id).values(like_count=Video.like_count + 1))
+    db.commit()
+
+def run(mode: str, threads: int, seconds: float, users: int, videos: int, write_ratio: float) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_db_engine(url, sqlite_mode=mode)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, users, videos)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    counts = {"feed": 0, "like": 0, "errors": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+    
+    def worker(seed_value: int):
+        rng = random.Random(seed_value)
+        local = {"feed": 0, "like": 0, "errors": 0}
+        while time.perf_counter() < stop_at:
+            db = Session()
+            try:
+                if rng.random() < write_ratio:
+                    like(db, rng.randint(1, users), rng.randint(1, videos))
+                    local["like"] += 1
+                else:
+                    feed_page(db)
+                    local["feed"] += 1
+            except Exception:
+                # The shared StaticPool connection can be left unusable by another thread
+                try:
+                    db.rollback()
+                except Exception:
+                    pass
+                local["errors"] += 1
+            finally:
+                try:
+                    db.close()
+                except Exception:
+                    local["errors"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    
+    return {
+        "mode": mode,
+        "feed_per_sec": counts["feed"] / elapsed,
+        "likes_per_sec": counts["like"] / elapsed,
+        "errors": counts["errors"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of operations that are likes")
+    parser.add_argument("--mode", choices=["development", "production"], help="Run a single mode and print JSON")
+    args = parser.parse_args()
+    
+    if args.mode:
+        result = run(args.mode, args.threads, args.seconds, args.users, args.videos, args.write_ratio)
+        print(json.dumps(result))
+        return
+    
+    print(f"{'mode':<12} {'feed/s':>10} {'likes/s':>10} {'errors':>8}")
+    for mode in ("development", "production"):
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sqlite_concurrency", "--mode", mode,
+             "--threads", str(args.threads), "--seconds", str(args.seconds),
+             "--users", str(args.users), "--videos", str(args.videos),
+             "--write-ratio", str(args.write_ratio)],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            print(f"{mode:<12} crashed (exit code {proc.returncode})")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{result['mode']:<12} {result['feed_per_sec']:>10.1f} {result['likes_per_sec']:>10.1f} {result['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Fan-out cost of push-based processing status for many idle subscribers in one worker.
+
+Starts --subscribers stream loops (the same subscribe / next_events / format_sse
+path as GET /api/ml/status/stream, without the HTTP layer), each following one of
+--videos videos, and reports:
+  - memory per idle subscriber (subscription plus its waiting task)
+  - publish cost for a video nobody follows
+  - time for one update to reach every follower of a hot video (all subscribers)
+  - the polling load the same clients would put on the database instead, next to
+    the process-wide status poller's
+
+Usage (from backend/):
+    python -m benchmarks.status_fanout --subscribers 5000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.status_events import STATUS_POLL_BATCH_SIZE, STATUS_POLL_SECONDS, StatusBroker
+from routes.ml import format_sse
+
+HOT_VIDEO_ID = 0
+
+async def stream_loop(broker: StatusBroker, video_ids, received: list, done: asyncio.Event, expected: int):
+    """A status stream minus the socket: wait, encode each event, repeat"""
+    subscription = broker.subscribe(video_ids)
+    event_id = 0
+    try:
+        while True:
+            for status in await subscription.next_events(timeout=None):
+                event_id += 1
+                format_sse("status", status, event_id)
+                received.append(status["video_id"])
+                if len(received) >= expected:
+                    done.set()
+    finally:
+        broker.unsubscribe(subscription)
+
+async def run(subscribers: int, videos: int, poll_interval: float) -> None:
+    broker = StatusBroker()
+    received: list = []
+    done = asyncio.Event()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tasks = [
+        asyncio.create_task(stream_loop(broker, [HOT_VIDEO_ID, 1 + i % videos], received, done, subscribers))
+        for i in range(subscribers)
+    ]
+    await asyncio.sleep(0.1)  # Let every loop reach its first wait
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Publishing to a video with no followers (the common case for a status update)
+    publishes = 100_000
+    started = time.perf_counter()
+    for _ in range(publishes):
+        broker.publish(-1, {"video_id": -1, "processing_status": "processing"})
+    idle_publish_us = (time.perf_counter() - started) * 1e6 / publishes
+
+    # One update to a video every subscriber follows
+    status = {
+        "video_id": HOT_VIDEO_ID,
+        "processing_status": "completed",
+        "is_processed": True,
+        "has_analytics": True,
+        "processing_version": "v1.0.0"
+    }
+    started = time.perf_counter()
+    broker.publish(HOT_VIDEO_ID, status)
+    await asyncio.wait_for(done.wait(), timeout=60)
+    fanout_ms = (time.perf_counter() - started) * 1000
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    polls_per_second = subscribers / poll_interval
+    followed = min(videos, subscribers) + 1
+    poller_queries = -(-followed // STATUS_POLL_BATCH_SIZE)
+    print(f"{subscribers:,} idle subscribers over {videos:,} videos\n")
+    print(f"memory per idle subscriber     {(after - before) / subscribers:>10,.0f} bytes")
+    print(f"publish, no followers          {idle_publish_us:>10.2f} us")
+    print(f"fan-out to all {subscribers:,} followers {fanout_ms:>8.1f} ms ({fanout_ms * 1000 / subscribers:.1f} us each)")
+    print(f"\npolling every {poll_interval:g}s instead: {polls_per_second:,.0f} requests/s, "
+          f"{polls_per_second * 2:,.0f} queries/s at the old two queries per poll")
+    print(f"streams: 0 queries while idle; status poller: {poller_queries} "
+          f"quer{'y' if poller_queries == 1 else 'ies'} every {STATUS_POLL_SECONDS:g}s for {followed:,} followed videos")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--videos", type=int, default=1000)
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Client poll interval to compare against")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args.subscribers, args.videos, args.poll_interval))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Upload verification latency for POST /api/videos/ against an S3-compatible store.
+
+Verifies --uploads uploads concurrently on one event loop, the way create_video
+does for simultaneous requests, in each mode:
+  - before:   file_exists then get_file_metadata, called directly (two HEADs, blocking the loop)
+  - one stat: get_file_metadata alone, still called directly
+  - after:    get_file_metadata through run_storage (one HEAD on the storage thread pool)
+
+Reports wall time for the batch, per-request latency and the longest event loop
+stall (how late a 5 ms ticker ran, i.e. how long every other request on the
+worker was frozen).
+
+By default the store is an in-process S3 stand-in that answers HEAD requests
+after --latency seconds; pass --endpoint to use a real MinIO instead (the
+objects are uploaded first).
+
+Usage (from backend/):
+    python -m benchmarks.storage_calls --uploads 50 --latency 0.02
+    python -m benchmarks.storage_calls --endpoint localhost:9000
+"""
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from storage.factory import STORAGE_THREAD_POOL_SIZE, run_storage
+from storage.minio_storage import MinIOStorage
+
+BUCKET = "bench"
+LOCATION_XML = b'<?xml version="1.0" encoding="UTF-8"?><LocationConstraint xmlns="http://s3.amazonaws.com/doc/2006-03-01/"></LocationConstraint>'
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Just enough of the S3 API for MinIOStorage: bucket checks and object HEADs"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like a real store
+    latency = 0.02
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status: int, headers: dict = None, body: bytes = b""):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if "Content-Length" not in (headers or {}):
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        if "location" in urlparse(self.path).query:
+            self.reply(200, {"Content-Type": "application/xml"}, LOCATION_XML)
+        else:
+            self.reply(404)
+
+    def do_HEAD(self):
+        path = urlparse(self.path).path.strip("/")
+        if path == BUCKET:
+            self.reply(200)
+        elif path.startswith(f"{BUCKET}/videos/"):
+            time.sleep(self.latency)
+            self.reply(200, {
+                "ETag": '"0123456789abcdef"',
+                "Content-Length": str(48 * 1024 ** 2),
+                "Content-Type": "video/mp4",
+                "Last-Modified": formatdate(usegmt=True)
+            })
+        else:
+            self.reply(404)
+
+def start_stand_in(latency: float) -> str:
+    """Serve the stand-in on a free port in a daemon thread, returns its host:port"""
+    StandInHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"127.0.0.1:{server.server_address[1]}"
+
+async def verify_before(storage: MinIOStorage, key: str):
+    if not storage.file_exists(key):
+        raise RuntimeError(f"{key} missing")
+    return storage.get_file_metadata(key)
+
+async def verify_one_stat(storage: MinIOStorage, key: str):
+    return storage.get_file_metadata(key)
+
+async def verify_after(storage: MinIOStorage, key: str):
+    return await run_storage(storage.get_file_metadata, key)
+
+async def run(storage: MinIOStorage, verify, keys):
+    """Returns (wall ms, p50 ms, p95 ms, longest loop stall ms)"""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        while not done:
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            stall = max(stall, time.perf_counter() - expected)
+
+    async def timed(key: str) -> float:
+        await verify(storage, key)
+        return time.perf_counter() - started
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(timed(key) for key in keys)))
+    wall = time.perf_counter() - started
+    done = True
+    await ticking
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    return wall * 1000, statistics.median(latencies) * 1000, p95 * 1000, stall * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in HEAD latency in seconds")
+    parser.add_argument("--endpoint", help="host:port of a real MinIO to use instead of the stand-in")
+    parser.add_argument("--access-key", default="minioadmin")
+    parser.add_argument("--secret-key", default="minioadmin")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    endpoint = args.endpoint or start_stand_in(args.latency)
+    storage = MinIOStorage(endpoint=endpoint, access_key=args.access_key, secret_key=args.secret_key, bucket_name=BUCKET)
+    keys = [f"videos/1/set-{i}.mp4" for i in range(args.uploads)]
+    if args.endpoint:
+        for key in keys:
+            storage.client.put_object(BUCKET, key, io.BytesIO(b"0" * 1024), 1024, content_type="video/mp4")
+
+    target = args.endpoint or f"stand-in, {args.latency * 1000:.0f} ms per HEAD"
+    print(f"{args.uploads} concurrent verifications ({target}), storage pool of {STORAGE_THREAD_POOL_SIZE}\n")
+    print(f"{'mode':<10} {'wall ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'max stall ms':>14}")
+    for label, verify in (("before", verify_before), ("one stat", verify_one_stat), ("after", verify_after)):
+        wall, p50, p95, stall = asyncio.run(run(storage, verify, keys))
+        print(f"{label:<10} {wall:>10.1f} {p50:>10.1f} {p95:>10.1f} {stall:>14.1f}")
+
+    if args.endpoint:
+        for key in keys:
+            storage.delete_file(key)
+
+if __name__ == "__main__":
+    main()
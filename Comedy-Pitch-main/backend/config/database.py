@@ -1,39 +1,203 @@
 import os
-from sqlalchemy import create_engine
+import asyncio
+import logging
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from typing import Union
+
+logger = logging.getLogger(__name__)
 
 # Database URL - defaults to SQLite for development, can be overridden for PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./comedy_peach.db")
 
-# SQLAlchemy engine configuration
-if DATABASE_URL.startswith("sqlite"):
-    # SQLite specific configuration
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=os.getenv("SQL_DEBUG", "false").lower() == "true"
-    )
-else:
+# Async mode - route queries run on an async driver (aiosqlite / asyncpg) instead of blocking the event loop
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+
+SQL_ECHO = os.getenv("SQL_DEBUG", "false").lower() == "true"
+
+# SQLite mode - "development" shares one connection (StaticPool), "production" uses a WAL-mode connection pool
+SQLITE_MODE = os.getenv("SQLITE_MODE", "development").lower()
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_WRITE_RETRIES = int(os.getenv("SQLITE_WRITE_RETRIES", "3"))
+
+def is_sqlite_production(url: str, mode: str = SQLITE_MODE) -> bool:
+    """Whether a URL should get the WAL-mode pool (in-memory databases cannot use WAL)"""
+    return url.startswith("sqlite") and mode == "production" and ":memory:" not in url
+
+def apply_sqlite_pragmas(engine: Engine) -> None:
+    """Set WAL journaling and performance pragmas on every new SQLite connection"""
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+def create_db_engine(url: str, sqlite_mode: str = SQLITE_MODE) -> Engine:
+    """Create the sync engine for a database URL"""
+    if is_sqlite_production(url, sqlite_mode):
+        # Production SQLite: one connection per checkout so concurrent sessions don't
+        # share a transaction, WAL so readers never block the writer
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            poolclass=QueuePool,
+            pool_size=SQLITE_POOL_SIZE,
+            max_overflow=SQLITE_POOL_SIZE,
+            echo=SQL_ECHO
+        )
+        apply_sqlite_pragmas(engine)
+        return engine
+    
+    if url.startswith("sqlite"):
+        # SQLite specific configuration
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=SQL_ECHO
+        )
+    
     # PostgreSQL configuration for production
-    engine = create_engine(
-        DATABASE_URL,
-        echo=os.getenv("SQL_DEBUG", "false").lower() == "true"
+    return create_engine(
+        url,
+        echo=SQL_ECHO
     )
 
+# SQLAlchemy engine configuration
+engine = create_db_engine(DATABASE_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    """Dependency to get database session"""
+# What get_db yields to the routes, depending on DATABASE_ASYNC
+DBSession = Union[Session, AsyncSession]
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite for SQLite, asyncpg for PostgreSQL)"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgres:"):
+        return url.replace("postgres:", "postgresql+asyncpg:", 1)
+    return url
+
+# Async engine is only created when DATABASE_ASYNC=true so the sync path needs no async drivers
+async_engine = None
+AsyncSessionLocal = None
+
+if DATABASE_ASYNC:
+    if is_sqlite_production(DATABASE_URL):
+        async_engine = create_async_engine(
+            get_async_database_url(DATABASE_URL),
+            connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=SQLITE_POOL_SIZE,
+            max_overflow=SQLITE_POOL_SIZE,
+            echo=SQL_ECHO
+        )
+        apply_sqlite_pragmas(async_engine.sync_engine)
+    else:
+        async_engine = create_async_engine(get_async_database_url(DATABASE_URL), echo=SQL_ECHO)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+
+async def get_db():
+    """Dependency to get database session (an AsyncSession when DATABASE_ASYNC=true)"""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
-def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+def is_sqlite_locked_error(exc: Exception) -> bool:
+    """Whether an error is SQLite refusing a write because another connection holds the lock"""
+    return isinstance(exc, OperationalError) and (
+        "database is locked" in str(exc) or "database is busy" in str(exc)
+    )
+
+async def run_db(db: DBSession, fn, *args, **kwargs):
+    """Run a sync ORM callable ``fn(session, *args, **kwargs)`` against the request session.
+
+    With an AsyncSession the callable goes through ``run_sync``, so every query it
+    issues (lazy loads included) is awaited on the async driver instead of blocking
+    the event loop. A plain Session is passed straight through.
+
+    In production SQLite mode a unit of work that loses the write lock (busy timeout
+    exceeded, or a stale WAL snapshot) is rolled back and retried with backoff.
+    """
+    retries = SQLITE_WRITE_RETRIES if is_sqlite_production(DATABASE_URL) else 0
+    attempt = 0
+    while True:
+        try:
+            if isinstance(db, AsyncSession):
+                return await db.run_sync(fn, *args, **kwargs)
+            return fn(db, *args, **kwargs)
+        except OperationalError as e:
+            if attempt >= retries or not is_sqlite_locked_error(e):
+                raise
+            attempt += 1
+            logger.warning(f"SQLite write lock contention, retrying ({attempt}/{retries})")
+            if isinstance(db, AsyncSession):
+                await db.rollback()
+            else:
+                db.rollback()
+            await asyncio.sleep(0.05 * 2 ** (attempt - 1))
+
+# Alembic owns the schema; the app migrates to head when it starts
+MIGRATIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+INITIAL_REVISION = "0001"
+
+def schema_matches_models(connection) -> bool:
+    """Whether an unversioned database already has every table, column and index the models define"""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from models.search import is_search_object
+
+    context = MigrationContext.configure(connection, opts={
+        "include_name": lambda name, type_, parent_names: not (
+            type_ in ("table", "index") and name and is_search_object(name)
+        )
+    })
+    return not compare_metadata(context, Base.metadata)
+
+def init_db(bind: Engine = engine):
+    """Bring the database schema up to date with the Alembic migrations.
+
+    A database with tables but no alembic_version predates the migrations (the app
+    used to create_all its tables): it is stamped at head when it already matches
+    the models, otherwise at the initial schema, before upgrading.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_PATH)
+    with bind.begin() as connection:
+        # migrations/env.py runs on this connection instead of opening its own
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if tables and "alembic_version" not in tables:
+            revision = "head" if schema_matches_models(connection) else INITIAL_REVISION
+            logger.info(f"Stamping unversioned database at {revision}")
+            command.stamp(config, revision)
+        command.upgrade(config, "head")
@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# UTC datetimes render with "Z" as Pydantic does; dict keys may be ints (like-status maps)
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def _default(obj: Any) -> Any:
+    """Encode what orjson can't natively (Pydantic models)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson (datetimes, dataclasses and models included)"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed JSON response.
+
+    As the app default it replaces the stdlib json encoder; returned directly from a
+    route with trusted dicts it also skips response_model validation and jsonable_encoder.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,12 +1,91 @@
 import os
+import copy
 import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 import firebase_admin
 from firebase_admin import credentials, auth
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+from config.metrics import firebase_verify_duration
 
 # Global Firebase app instance
 _firebase_app = None
 
+# Verified ID tokens are cached until their exp claim so a client pays for
+# signature verification once per token rather than once per request
+FIREBASE_TOKEN_CACHE_SIZE = int(os.getenv("FIREBASE_TOKEN_CACHE_SIZE", "10000"))
+
+class TokenCache:
+    """Bounded LRU cache of decoded ID tokens keyed by token hash, expiring at exp.
+
+    Claims are copied in and out, so a caller changing its decoded token never
+    changes what later requests with the same token see.
+    """
+    
+    def __init__(self, max_size: int = FIREBASE_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        """Hash the token so raw credentials are never held as keys"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get a decoded token if it is cached and not yet expired"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, token: str, decoded_token: Dict[str, Any]) -> None:
+        """Cache a decoded token until its exp claim; tokens without one are not cached"""
+        expires_at = decoded_token.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= time.time() or self.max_size <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(expires_at), copy.deepcopy(decoded_token))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop every cached token and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+token_cache = TokenCache()
+
 def init_firebase():
     """Initialize Firebase Admin SDK"""
     global _firebase_app
@@ -62,11 +141,21 @@ def get_firebase_web_config() -> Dict[str, Any]:
 
 def verify_firebase_token(token: str) -> Dict[str, Any]:
     """Verify Firebase ID token and return decoded token"""
+    started = time.perf_counter()
+    cached = token_cache.get(token)
+    if cached is not None:
+        firebase_verify_duration.observe(time.perf_counter() - started, "cache_hit")
+        return cached
+    
     try:
         decoded_token = auth.verify_id_token(token)
-        return decoded_token
     except Exception as e:
+        firebase_verify_duration.observe(time.perf_counter() - started, "invalid")
         raise ValueError(f"Invalid token: {str(e)}")
+    
+    firebase_verify_duration.observe(time.perf_counter() - started, "verified")
+    token_cache.put(token, decoded_token)
+    return decoded_token
 
 def get_user_by_uid(uid: str) -> Dict[str, Any]:
     """Get user information by UID"""
@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+# Per-user responses may be cached by the client but must be revalidated (ETag) before reuse
+PRIVATE_REVALIDATE = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the values that determine a response"""
+    digest = hashlib.sha256("|".join(repr(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag from a rendered response body"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the current ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def set_cache_headers(response: Response, etag: str, cache_control: str = PRIVATE_REVALIDATE) -> None:
+    """Attach validator and caching headers to a response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+def not_modified(etag: str, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    """An empty 304 carrying the same validator and caching headers"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control)
+    return response
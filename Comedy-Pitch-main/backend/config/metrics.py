@@ -0,0 +1,235 @@
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus text exposition (format 0.0.4) without the client library: a handful of
+# label-aware counters, gauges and histograms rendered on scrape.
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends charset=utf-8
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+class Gauge(Metric):
+    """A gauge read on scrape from ``collect()``, which yields (labelvalues, value) pairs"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Iterable[Tuple[Tuple, float]]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in (self.collect() if self.collect else ())
+        ]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = self.header()
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+# Registered metrics, rendered in this order
+REGISTRY: List[Metric] = []
+
+def register(metric: Metric) -> Metric:
+    REGISTRY.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Requests
+http_request_duration = register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")
+))
+db_statements_per_request = register(Histogram(
+    "db_statements_per_request", "SQL statements issued per request", ("route",), buckets=COUNT_BUCKETS
+))
+db_time_per_request = register(Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per request", ("route",)
+))
+
+# Database
+db_statement_duration = register(Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time by statement type", ("operation",)
+))
+db_pool_checkout_duration = register(Histogram(
+    "db_pool_checkout_duration_seconds", "Time a connection stays checked out of the pool", ("engine",)
+))
+db_pool_connections_opened = register(Counter(
+    "db_pool_connections_opened_total", "New database connections opened by the pool", ("engine",)
+))
+
+# External calls
+storage_operation_duration = register(Histogram(
+    "storage_operation_duration_seconds", "Storage backend call latency", ("backend", "operation", "outcome")
+))
+firebase_verify_duration = register(Histogram(
+    "firebase_verify_duration_seconds", "Firebase ID token verification time", ("result",)
+))
+
+# Instrumented engines; their current pool is read on scrape, so a dispose() is followed
+_pools: Dict[str, Engine] = {}
+
+def _pool_gauge(read: Callable[[Any], Optional[float]]) -> Callable[[], Iterable[Tuple[Tuple, float]]]:
+    def collect():
+        for name, engine in sorted(_pools.items()):
+            value = read(engine.pool)
+            if value is not None:
+                yield (name,), value
+    return collect
+
+def _pool_capacity(pool: Any) -> Optional[float]:
+    # QueuePool and its async adapter have a fixed size plus overflow; other pools don't
+    if not hasattr(pool, "size") or not hasattr(pool, "_max_overflow"):
+        return None
+    overflow = pool._max_overflow
+    return None if overflow < 0 else pool.size() + overflow
+
+register(Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ("engine",),
+    collect=_pool_gauge(lambda pool: pool.checkedout() if hasattr(pool, "checkedout") else None)
+))
+register(Gauge(
+    "db_pool_capacity", "Maximum connections the pool will open (size plus overflow)", ("engine",),
+    collect=_pool_gauge(_pool_capacity)
+))
+register(Gauge(
+    "db_pool_saturation", "Checked-out connections as a fraction of pool capacity", ("engine",),
+    collect=_pool_gauge(
+        lambda pool: pool.checkedout() / _pool_capacity(pool) if _pool_capacity(pool) and hasattr(pool, "checkedout") else None
+    )
+))
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Time how long connections stay checked out, count new ones and expose the pool's saturation.
+
+    Uses pool events on the engine, which SQLAlchemy carries over to the new pool
+    when the engine is disposed or its pool recreated.
+    """
+    if name in _pools:
+        return
+    _pools[name] = engine
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        db_pool_connections_opened.inc(name)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            db_pool_checkout_duration.observe(time.perf_counter() - started, name)
+
+def instrument_methods(obj: Any, histogram: Histogram, methods: Iterable[str], *labelvalues: Any) -> Any:
+    """Wrap an object's methods in place so each call observes its latency and outcome"""
+    for method_name in methods:
+        method = getattr(obj, method_name, None)
+        if method is None or getattr(method, "_instrumented", False):
+            continue
+
+        def timed(*args, _method=method, _name=method_name, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = _method(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                histogram.observe(time.perf_counter() - started, *labelvalues, _name, outcome)
+
+        timed._instrumented = True
+        setattr(obj, method_name, timed)
+    return obj
@@ -0,0 +1,65 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.metrics import db_statement_duration
+
+# Statement text kept per breakdown entry (enough to recognise the query)
+STATEMENT_PREVIEW_LENGTH = 200
+
+@dataclass
+class QueryStats:
+    """SQL statements issued while handling one request"""
+    count: int = 0
+    total_time: float = 0.0  # Seconds spent executing statements
+    # Statement text -> [executions, seconds], for slow-request logs
+    statements: Dict[str, List[float]] = field(default_factory=dict)
+    
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        entry = self.statements.setdefault(" ".join(statement[:STATEMENT_PREVIEW_LENGTH].split()), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+    
+    def breakdown(self, limit: int = 5) -> List[Tuple[str, int, float]]:
+        """The statements that took longest in total: (statement, executions, seconds)"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(statement, int(count), elapsed) for statement, (count, elapsed) in ranked[:limit]]
+
+# Stats for the request being handled; the mutable object is shared with the
+# tasks and run_sync greenlets that inherit this context
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def start_query_stats() -> QueryStats:
+    """Start counting SQL statements for the current request"""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Get stats for the current request, if counting was started"""
+    return _current_stats.get()
+
+# Listen on the Engine class so every engine (sync, async, test) is counted
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_statement_duration.observe(elapsed, statement_operation(statement))
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+def statement_operation(statement: str) -> str:
+    """SELECT / INSERT / UPDATE / DELETE / OTHER, for a low-cardinality metric label"""
+    words = statement.lstrip().split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Comment lines sent on idle SSE streams so proxies keep them open and disconnects are noticed
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+# How often each API process re-reads the followed videos for changes committed by
+# other processes (manage.py ml-worker); 0 turns the poller off
+STATUS_POLL_SECONDS = float(os.getenv("STATUS_POLL_SECONDS", "5"))
+STATUS_POLL_BATCH_SIZE = 500  # Video ids per query, under SQLite's bound parameter limit
+
+class StatusSubscription:
+    """One subscriber's pending status updates, coalesced to the latest per video.
+
+    Idle subscribers cost one small dict and one asyncio.Event; a burst of updates for
+    a video is delivered as its most recent status, so slow clients never queue up.
+    """
+    __slots__ = ("video_ids", "pending", "wake")
+
+    def __init__(self, video_ids: Iterable[int]):
+        self.video_ids = frozenset(video_ids)
+        self.pending: Dict[int, Dict[str, Any]] = {}
+        self.wake = asyncio.Event()
+
+    def deliver(self, video_id: int, status: Dict[str, Any]) -> None:
+        self.pending[video_id] = status
+        self.wake.set()
+
+    async def next_events(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Wait for updates, returns them (oldest video first) or [] on timeout"""
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self.wake.clear()
+        events = list(self.pending.values())
+        self.pending.clear()
+        return events
+
+class StatusBroker:
+    """In-process pub/sub of video processing status changes.
+
+    Publishing is O(subscribers of that video) and safe from any thread: calls off the
+    event loop are handed over with call_soon_threadsafe. Subscribers live in this
+    process only, so each API worker serves the streams connected to it.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[StatusSubscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, video_ids: Iterable[int]) -> StatusSubscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = StatusSubscription(video_ids)
+        for video_id in subscription.video_ids:
+            self._subscribers[video_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        for video_id in subscription.video_ids:
+            subscribers = self._subscribers.get(video_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[video_id]
+
+    def has_subscribers(self, video_ids: Iterable[int]) -> bool:
+        """Cheap check so publishers can skip building statuses nobody is waiting for"""
+        return any(video_id in self._subscribers for video_id in video_ids)
+
+    def followed_video_ids(self) -> List[int]:
+        """Every video at least one subscriber follows"""
+        return list(self._subscribers)
+
+    def subscriber_count(self) -> int:
+        return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    def publish(self, video_id: int, status: Dict[str, Any]) -> None:
+        """Send a video's new status to its subscribers"""
+        if video_id not in self._subscribers or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(video_id, status)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, video_id, status)
+
+    def _deliver(self, video_id: int, status: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers.get(video_id, ())):
+            subscription.deliver(video_id, status)
+
+status_broker = StatusBroker()
+
+class StatusPoller:
+    """Publishes status changes committed by other processes through a broker.
+
+    One background task per process reads the status of every followed video in
+    batched queries on its own short-lived session and publishes those that differ
+    from its previous read. The database load depends on how many videos are followed,
+    not on how many streams are open; streams themselves only wait on the broker.
+    """
+
+    def __init__(
+        self,
+        broker: StatusBroker,
+        fetch: Callable[[Session, List[int]], Dict[int, Dict[str, Any]]],
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = STATUS_POLL_SECONDS
+    ):
+        self.broker = broker
+        self.fetch = fetch
+        self.session_factory = session_factory
+        self.interval = interval
+        self._last: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def poll(self, video_ids: List[int]) -> int:
+        """Read the videos' statuses and publish the changed ones, returns how many changed"""
+        followed = set(video_ids)
+        for video_id in [video_id for video_id in self._last if video_id not in followed]:
+            del self._last[video_id]
+        if not video_ids:
+            return 0
+
+        changed = 0
+        with self.session_factory() as db:
+            for start in range(0, len(video_ids), STATUS_POLL_BATCH_SIZE):
+                statuses = self.fetch(db, video_ids[start:start + STATUS_POLL_BATCH_SIZE])
+                for video_id, status in statuses.items():
+                    if self._last.get(video_id) != status:
+                        self._last[video_id] = status
+                        self.broker.publish(video_id, status)
+                        changed += 1
+        return changed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.poll, self.broker.followed_video_ids())
+            except Exception as e:
+                logger.warning(f"Error polling processing status: {e}")
+
+    def start(self) -> None:
+        """Start polling on the running event loop (unless the interval is 0)"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._last.clear()
@@ -0,0 +1,74 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Resolved users are cached per Firebase UID so authenticated requests skip the
+# users lookup. Profile updates invalidate their entry; the TTL bounds how long
+# another process's changes (deactivation, deletion) can go unnoticed.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+
+@dataclass(frozen=True)
+class UserIdentity:
+    """The hot fields routes need about the requesting user"""
+    id: int
+    firebase_uid: str
+    display_name: Optional[str]
+    is_comedian: bool
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserIdentity":
+        return cls(
+            id=user.id,
+            firebase_uid=user.firebase_uid,
+            display_name=user.display_name,
+            is_comedian=bool(user.is_comedian),
+            is_active=bool(user.is_active)
+        )
+
+class UserCache:
+    """Bounded LRU cache of user identities keyed by Firebase UID"""
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, UserIdentity]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, firebase_uid: str) -> Optional[UserIdentity]:
+        """Get a cached identity if it hasn't expired"""
+        with self._lock:
+            entry = self._entries.get(firebase_uid)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[firebase_uid]
+                return None
+            self._entries.move_to_end(firebase_uid)
+            return entry[1]
+
+    def put(self, identity: UserIdentity) -> None:
+        """Cache an identity for the TTL"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[identity.firebase_uid] = (time.monotonic() + self.ttl, identity)
+            self._entries.move_to_end(identity.firebase_uid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, firebase_uid: str) -> None:
+        """Drop a user's entry after their row changes"""
+        with self._lock:
+            self._entries.pop(firebase_uid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Process-wide cache used by the routes
+user_cache = UserCache()
@@ -0,0 +1,144 @@
+import os
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Connection, Engine
+
+from config.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Views are buffered in memory and written in batches. A crash loses at most
+# VIEW_COUNT_FLUSH_INTERVAL seconds of views; a busy buffer flushes early once it
+# holds VIEW_COUNT_FLUSH_SIZE distinct videos.
+VIEW_COUNT_FLUSH_INTERVAL = float(os.getenv("VIEW_COUNT_FLUSH_INTERVAL", "5"))
+VIEW_COUNT_FLUSH_SIZE = int(os.getenv("VIEW_COUNT_FLUSH_SIZE", "500"))
+# Consecutive failed flushes whose views are kept for the next attempt; after that
+# (a database outage) they are dropped and counted so the buffer can't grow unbounded
+VIEW_COUNT_MAX_RETRIES = int(os.getenv("VIEW_COUNT_MAX_RETRIES", "5"))
+
+class ViewCounter:
+    """Write-behind buffer that coalesces view increments per video"""
+
+    def __init__(
+        self,
+        bind: Engine = engine,
+        flush_interval: float = VIEW_COUNT_FLUSH_INTERVAL,
+        flush_size: int = VIEW_COUNT_FLUSH_SIZE,
+        max_retries: int = VIEW_COUNT_MAX_RETRIES
+    ):
+        self.bind = bind
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_retries = max_retries
+        self.failed_flushes = 0  # Consecutive
+        self.dropped_views = 0
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, video_id: int) -> int:
+        """Count one view, returns the views buffered for the video so far"""
+        with self._lock:
+            pending = self._pending.get(video_id, 0) + 1
+            self._pending[video_id] = pending
+            full = len(self._pending) >= self.flush_size
+        if full and self._wake is not None:
+            self._wake.set()
+        return pending
+
+    def pending(self, video_id: int) -> int:
+        """Views buffered for a video but not yet written"""
+        with self._lock:
+            return self._pending.get(video_id, 0)
+
+    def drain(self) -> Dict[int, int]:
+        """Take every buffered increment, leaving the buffer empty"""
+        with self._lock:
+            counts, self._pending = self._pending, {}
+        return counts
+
+    def _restore(self, counts: Dict[int, int]) -> None:
+        """Put increments back after a failed flush so they go out with the next one,
+        or drop them once max_retries flushes in a row have failed"""
+        with self._lock:
+            self.failed_flushes += 1
+            if self.failed_flushes > self.max_retries:
+                dropped = sum(counts.values())
+                self.dropped_views += dropped
+                logger.error(f"Dropped {dropped} buffered views after {self.failed_flushes} failed flushes")
+                return
+            for video_id, delta in counts.items():
+                self._pending[video_id] = self._pending.get(video_id, 0) + delta
+
+    def flush(self, connection: Optional[Connection] = None) -> int:
+        """Write buffered views as one batched UPDATE, returns the number of videos touched.
+
+        With a connection the caller owns the transaction, otherwise the flush
+        commits on its own.
+        """
+        counts = self.drain()
+        if not counts:
+            return 0
+
+        from models.models import Video
+        videos = Video.__table__
+        statement = (
+            update(videos)
+            .where(videos.c.id == bindparam("video_id"))
+            .values(view_count=videos.c.view_count + bindparam("delta"))
+        )
+        params = [{"video_id": video_id, "delta": delta} for video_id, delta in counts.items()]
+
+        try:
+            if connection is not None:
+                connection.execute(statement, params)
+            else:
+                with self.bind.begin() as conn:
+                    conn.execute(statement, params)
+        except Exception:
+            self._restore(counts)
+            raise
+        self.failed_flushes = 0
+        return len(counts)
+
+    async def _run(self) -> None:
+        """Flush on the interval, or early when the size threshold wakes us"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Error flushing view counts: {e}")
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop"""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.error(f"Error flushing view counts on shutdown: {e}")
+
+# Process-wide buffer used by the routes
+view_counter = ViewCounter()
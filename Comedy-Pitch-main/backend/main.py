@@ -2,9 +2,12 @@ import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
+import logging
 import os
+import time
 from pathlib import Path
 
 # Load environment variables
@@ -12,12 +15,27 @@ load_dotenv()
 
 # Import our config and routes
 from config.firebase_config import init_firebase
-from config.database import init_db
+from config.database import init_db, engine, async_engine, DATABASE_ASYNC
+from config.fast_json import FastJSONResponse
+from config.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    db_statements_per_request,
+    db_time_per_request,
+    http_request_duration,
+    instrument_pool,
+    render_metrics
+)
+from config.query_stats import start_query_stats
+from config.view_counter import view_counter
 from routes.auth import router as auth_router
 from routes.videos import router as videos_router
 from routes.users import router as users_router
 from routes.likes import router as likes_router
-from routes.ml import router as ml_router
+from routes.ml import router as ml_router, status_poller
+from routes.search import router as search_router
+from routes.media import router as media_router
+from storage.factory import shutdown_storage_executor, storage_backend_name
+from storage.local_storage import LOCAL_MEDIA_PATH
 
 # Import models to ensure they're registered
 from models.models import User, Video, Like, AnalyticsData
@@ -25,7 +43,7 @@ from models.models import User, Video, Like, AnalyticsData
 # Initialize Firebase
 init_firebase()
 
-# Initialize database
+# Bring the database schema up to date (Alembic migrations)
 init_db()
 
 # Create FastAPI app
@@ -33,6 +51,7 @@ app = FastAPI(
     title="Comedy Peach Backend",
     description="Backend for Comedy Platform with Firebase authentication, video uploads, and AI analytics",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_tags=[
@@ -101,12 +120,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (transcripts, feeds) for clients that accept gzip
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+# Connection pool checkout wait and saturation
+instrument_pool(engine, "sync")
+if async_engine is not None:
+    instrument_pool(async_engine.sync_engine, "async")
+
+# Requests slower than this (seconds) are logged with their SQL breakdown
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
+slow_request_logger = logging.getLogger("slow_requests")
+
+_route_templates = {}
+
+def route_template(request) -> str:
+    """The matched route's path template (bounded label values), or "unmatched" """
+    if not _route_templates:
+        for route in app.routes:
+            _route_templates[getattr(route, "endpoint", None) or getattr(route, "app", None)] = route.path
+    return _route_templates.get(request.scope.get("endpoint"), "unmatched")
+
+# Count SQL statements per request and record request metrics
+@app.middleware("http")
+async def query_stats_middleware(request, call_next):
+    stats = start_query_stats()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    response.headers["X-Query-Count"] = str(stats.count)
+    
+    route = route_template(request)
+    http_request_duration.observe(elapsed, request.method, route, response.status_code)
+    db_statements_per_request.observe(stats.count, route)
+    db_time_per_request.observe(stats.total_time, route)
+    
+    if elapsed >= SLOW_REQUEST_SECONDS:
+        breakdown = "; ".join(
+            f"{seconds * 1000:.1f}ms x{count} {statement}" for statement, count, seconds in stats.breakdown()
+        )
+        slow_request_logger.warning(
+            f"Slow request {request.method} {request.url.path} ({route}) -> {response.status_code} "
+            f"in {elapsed * 1000:.0f}ms: {stats.count} SQL statements, {stats.total_time * 1000:.0f}ms in SQL"
+            + (f" | {breakdown}" if breakdown else "")
+        )
+    return response
+
 # Include all route modules
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 app.include_router(videos_router, prefix="/api/videos", tags=["videos"])
 app.include_router(users_router, prefix="/api/users", tags=["users"])
 app.include_router(likes_router, prefix="/api/videos", tags=["likes"])  # Nested under videos
 app.include_router(ml_router, prefix="/api/ml", tags=["ml_processing"])
+app.include_router(search_router, prefix="/api/search", tags=["search"])
+app.include_router(media_router, prefix=LOCAL_MEDIA_PATH, tags=["media"])
 
 # Mount static files for test UI
 test_ui_path = Path(__file__).parent / "test-auth-ui"
@@ -133,6 +201,11 @@ async def test_auth():
         ]
     }
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 # Health check endpoint
 @app.get("/")
 async def health_check():
@@ -140,14 +213,16 @@ async def health_check():
         "message": "Comedy Peach Backend is running!",
         "framework": "FastAPI",
         "version": "1.0.0",
-        "storage_backend": os.getenv("STORAGE_BACKEND", "local"),
+        "storage_backend": storage_backend_name(),
         "database": "SQLite" if os.getenv("DATABASE_URL", "").startswith("sqlite") else "PostgreSQL",
+        "database_mode": "async" if DATABASE_ASYNC else "sync",
         "endpoints": {
             "health": "/",
             "auth": "/api/auth",
             "videos": "/api/videos", 
             "users": "/api/users",
             "ml": "/api/ml",
+            "metrics": "/metrics",
             "testUI": "/test-auth-ui",
             "docs": "/docs",
             "redoc": "/redoc"
@@ -163,6 +238,21 @@ async def health_check():
         ]
     }
 
+# Start the write-behind view counter and the processing status poller
+@app.on_event("startup")
+async def startup_event():
+    view_counter.start()
+    status_poller.start()
+
+# Flush buffered views, finish storage calls and release pooled async connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await view_counter.stop()
+    await status_poller.stop()
+    shutdown_storage_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -177,7 +267,7 @@ async def global_exception_handler(request, exc):
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
-    storage_backend = os.getenv("STORAGE_BACKEND", "local")
+    storage_backend = storage_backend_name()
     
     print("🍑 Comedy Peach Backend Starting...")
     print(f"🚀 Server: http://localhost:{port}")
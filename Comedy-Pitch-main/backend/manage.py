@@ -0,0 +1,116 @@
+"""
+Management commands for the Comedy Peach backend.
+
+Usage (from backend/):
+    python manage.py reconcile-user-stats
+    python manage.py rebuild-search-index
+    python manage.py ml-worker [--worker-id ID] [--poll-interval SECONDS] [--once]
+    python manage.py transcode-worker [--worker-id ID] [--poll-interval SECONDS] [--once]
+    python manage.py thumbnail-worker [--worker-id ID] [--poll-interval SECONDS] [--once]
+"""
+import argparse
+import logging
+
+from dotenv import load_dotenv
+
+# Load environment variables before config.database reads DATABASE_URL
+load_dotenv()
+
+from config.database import engine
+
+# Import models to ensure they're registered
+from models.models import User, Video, Like, AnalyticsData
+from models.user import reconcile_user_stats
+from models.job import ML_ANALYSIS_JOB, THUMBNAIL_JOB, TRANSCODE_JOB
+from models.search import rebuild_search_index
+
+def reconcile_user_stats_command(args):
+    """Recompute denormalized user stats (video_count, total_likes) from the videos table"""
+    with engine.begin() as connection:
+        updated = reconcile_user_stats(connection)
+    print(f"✅ Reconciled stats for {updated} users")
+
+def rebuild_search_index_command(args):
+    """Re-index every video and comedian for search (triggers keep it current after that)"""
+    with engine.begin() as connection:
+        rebuild_search_index(connection)
+    print("✅ Rebuilt search index")
+
+def ml_worker_command(args):
+    """Lease queued ML analysis jobs and run ML_PIPELINE_COMMAND for each (start more processes to scale)"""
+    from workers.base import run_worker
+    from workers.ml_worker import run_ml_pipeline
+    
+    logging.basicConfig(level=logging.INFO)
+    processed = run_worker(
+        ML_ANALYSIS_JOB,
+        run_ml_pipeline,
+        worker_id=args.worker_id,
+        poll_interval=args.poll_interval,
+        once=args.once
+    )
+    print(f"✅ Processed {processed} jobs")
+
+def transcode_worker_command(args):
+    """Lease queued transcode jobs and package each upload as adaptive HLS with ffmpeg"""
+    from workers.base import run_worker
+    from workers.transcode_worker import run_transcode
+    
+    logging.basicConfig(level=logging.INFO)
+    processed = run_worker(
+        TRANSCODE_JOB,
+        run_transcode,
+        worker_id=args.worker_id,
+        poll_interval=args.poll_interval,
+        once=args.once
+    )
+    print(f"✅ Processed {processed} jobs")
+
+def thumbnail_worker_command(args):
+    """Lease queued thumbnail jobs and store WebP thumbnails of a representative frame"""
+    from workers.base import run_worker
+    from workers.thumbnail_worker import run_thumbnails
+    
+    logging.basicConfig(level=logging.INFO)
+    processed = run_worker(
+        THUMBNAIL_JOB,
+        run_thumbnails,
+        worker_id=args.worker_id,
+        poll_interval=args.poll_interval,
+        once=args.once
+    )
+    print(f"✅ Processed {processed} jobs")
+
+def main():
+    parser = argparse.ArgumentParser(description="Comedy Peach management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    reconcile = subparsers.add_parser("reconcile-user-stats", help=reconcile_user_stats_command.__doc__)
+    reconcile.set_defaults(func=reconcile_user_stats_command)
+    
+    rebuild_search = subparsers.add_parser("rebuild-search-index", help=rebuild_search_index_command.__doc__)
+    rebuild_search.set_defaults(func=rebuild_search_index_command)
+    
+    ml_worker = subparsers.add_parser("ml-worker", help=ml_worker_command.__doc__)
+    ml_worker.add_argument("--worker-id", default=None, help="Defaults to hostname:pid")
+    ml_worker.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to wait when the queue is empty")
+    ml_worker.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    ml_worker.set_defaults(func=ml_worker_command)
+    
+    transcode_worker = subparsers.add_parser("transcode-worker", help=transcode_worker_command.__doc__)
+    transcode_worker.add_argument("--worker-id", default=None, help="Defaults to hostname:pid")
+    transcode_worker.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to wait when the queue is empty")
+    transcode_worker.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    transcode_worker.set_defaults(func=transcode_worker_command)
+    
+    thumbnail_worker = subparsers.add_parser("thumbnail-worker", help=thumbnail_worker_command.__doc__)
+    thumbnail_worker.add_argument("--worker-id", default=None, help="Defaults to hostname:pid")
+    thumbnail_worker.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to wait when the queue is empty")
+    thumbnail_worker.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    thumbnail_worker.set_defaults(func=thumbnail_worker_command)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Denormalized user stats
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 03:05:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('video_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('total_likes', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing videos
+    op.execute(
+        "UPDATE users SET "
+        "video_count = (SELECT COUNT(videos.id) FROM videos WHERE videos.user_id = users.id), "
+        "total_likes = (SELECT COALESCE(SUM(videos.like_count), 0) FROM videos WHERE videos.user_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('total_likes')
+        batch_op.drop_column('video_count')
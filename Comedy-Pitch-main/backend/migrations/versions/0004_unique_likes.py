@@ -0,0 +1,44 @@
+"""Unique like per user and video
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 03:21:40.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicate likes left by the old read-then-insert path, keeping the earliest
+    op.execute(
+        "DELETE FROM likes WHERE id NOT IN "
+        "(SELECT MIN(id) FROM likes GROUP BY user_id, video_id)"
+    )
+
+    with op.batch_alter_table('likes', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_likes_user_video', ['user_id', 'video_id'])
+
+    # Counters may have drifted with the duplicates (or lost updates); recompute them
+    op.execute(
+        "UPDATE videos SET like_count = "
+        "(SELECT COUNT(likes.id) FROM likes WHERE likes.video_id = videos.id)"
+    )
+    op.execute(
+        "UPDATE users SET "
+        "total_likes = (SELECT COALESCE(SUM(videos.like_count), 0) FROM videos WHERE videos.user_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('likes', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_likes_user_video', type_='unique')
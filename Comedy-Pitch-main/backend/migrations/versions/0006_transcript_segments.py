@@ -0,0 +1,72 @@
+"""Transcript segments table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 04:31:08.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # The app used to create_all at startup, so a database it ran against may already have the table
+    if not sa.inspect(connection).has_table('transcript_segments'):
+        op.create_table('transcript_segments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('analytics_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('start_time', sa.Float(), nullable=False),
+        sa.Column('end_time', sa.Float(), nullable=False),
+        sa.Column('funniness_score', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['analytics_id'], ['analytics_data.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('transcript_segments', schema=None) as batch_op:
+            batch_op.create_index('ix_transcript_segments_window', ['analytics_id', 'start_time', 'position'], unique=False)
+    segments = sa.table('transcript_segments',
+        *[sa.column(name) for name in ('analytics_id', 'position', 'text', 'start_time', 'end_time', 'funniness_score')]
+    )
+
+    # Backfill from the JSON transcripts, one analytics row at a time (skipping rows already split)
+    rows = connection.execute(
+        sa.text(
+            "SELECT id, transcript FROM analytics_data WHERE transcript IS NOT NULL "
+            "AND id NOT IN (SELECT analytics_id FROM transcript_segments)"
+        )
+    ).fetchall()
+    for analytics_id, transcript in rows:
+        if isinstance(transcript, str):
+            transcript = json.loads(transcript)
+        if not transcript:
+            continue
+        op.bulk_insert(segments, [
+            {
+                "analytics_id": analytics_id,
+                "position": position,
+                "text": segment.get("text", ""),
+                "start_time": segment.get("start_time", 0.0),
+                "end_time": segment.get("end_time", 0.0),
+                "funniness_score": segment.get("funniness_score")
+            }
+            for position, segment in enumerate(transcript)
+        ])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('transcript_segments', schema=None) as batch_op:
+        batch_op.drop_index('ix_transcript_segments_window')
+
+    op.drop_table('transcript_segments')
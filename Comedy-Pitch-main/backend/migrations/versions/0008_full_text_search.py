@@ -0,0 +1,203 @@
+"""Full-text search index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 05:41:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The index as this revision creates it. The SQL is spelled out here rather than
+# imported from models.search, so later changes there can't alter this revision.
+
+# SQLite: FTS5 tables and the triggers that keep them current
+SQLITE_TABLES = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS video_search USING fts5(title, description, performer, "
+    "transcript, tokenize = 'porter unicode61 remove_diacritics 2')",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS comedian_search USING fts5(stage_name, display_name, tokenize"
+    " = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+]
+
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS video_search_video_insert AFTER INSERT ON videos BEGIN INSERT INTO "
+    "video_search (rowid, title, description, performer, transcript) VALUES (NEW.id, NEW.title, "
+    "NEW.description, (SELECT trim(coalesce(users.stage_name, '') || ' ' || "
+    "coalesce(users.display_name, '')) FROM users WHERE users.id = NEW.user_id), (SELECT "
+    "full_transcript_text FROM analytics_data WHERE analytics_data.video_id = NEW.id ORDER BY "
+    "analytics_data.id DESC LIMIT 1)); END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_video_update AFTER UPDATE OF title, description, "
+    "user_id ON videos BEGIN UPDATE video_search SET title = NEW.title, description = "
+    "NEW.description, performer = (SELECT trim(coalesce(users.stage_name, '') || ' ' || "
+    "coalesce(users.display_name, '')) FROM users WHERE users.id = NEW.user_id) WHERE rowid = NEW.id;"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_video_delete AFTER DELETE ON videos BEGIN DELETE FROM "
+    "video_search WHERE rowid = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_user_insert AFTER INSERT ON users BEGIN INSERT INTO "
+    "comedian_search (rowid, stage_name, display_name) VALUES (NEW.id, NEW.stage_name, "
+    "NEW.display_name); END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_user_update AFTER UPDATE OF stage_name, display_name "
+    "ON users BEGIN UPDATE comedian_search SET stage_name = NEW.stage_name, display_name = "
+    "NEW.display_name WHERE rowid = NEW.id; UPDATE video_search SET performer = "
+    "trim(coalesce(NEW.stage_name, '') || ' ' || coalesce(NEW.display_name, '')) WHERE rowid IN "
+    "(SELECT id FROM videos WHERE videos.user_id = NEW.id); END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_user_delete AFTER DELETE ON users BEGIN DELETE FROM "
+    "comedian_search WHERE rowid = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_analytics_insert AFTER INSERT ON analytics_data BEGIN "
+    "UPDATE video_search SET transcript = NEW.full_transcript_text WHERE rowid = NEW.video_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_analytics_update AFTER UPDATE OF full_transcript_text,"
+    " video_id ON analytics_data BEGIN UPDATE video_search SET transcript = (SELECT "
+    "full_transcript_text FROM analytics_data WHERE analytics_data.video_id = OLD.video_id ORDER BY "
+    "analytics_data.id DESC LIMIT 1) WHERE rowid = OLD.video_id AND OLD.video_id != NEW.video_id; "
+    "UPDATE video_search SET transcript = (SELECT full_transcript_text FROM analytics_data WHERE "
+    "analytics_data.video_id = NEW.video_id ORDER BY analytics_data.id DESC LIMIT 1) WHERE rowid = "
+    "NEW.video_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_analytics_delete AFTER DELETE ON analytics_data BEGIN "
+    "UPDATE video_search SET transcript = (SELECT full_transcript_text FROM analytics_data WHERE "
+    "analytics_data.video_id = OLD.video_id ORDER BY analytics_data.id DESC LIMIT 1) WHERE rowid = "
+    "OLD.video_id; END",
+]
+
+SQLITE_TRIGGER_NAMES = [
+    "video_search_video_insert",
+    "video_search_video_update",
+    "video_search_video_delete",
+    "video_search_user_insert",
+    "video_search_user_update",
+    "video_search_user_delete",
+    "video_search_analytics_insert",
+    "video_search_analytics_update",
+    "video_search_analytics_delete",
+]
+
+SQLITE_BACKFILL = [
+    "INSERT INTO video_search (rowid, title, description, performer, transcript) SELECT videos.id, "
+    "videos.title, videos.description, trim(coalesce(users.stage_name, '') || ' ' || "
+    "coalesce(users.display_name, '')), (SELECT full_transcript_text FROM analytics_data WHERE "
+    "analytics_data.video_id = videos.id ORDER BY analytics_data.id DESC LIMIT 1) FROM videos LEFT "
+    "JOIN users ON users.id = videos.user_id",
+
+    "INSERT INTO comedian_search (rowid, stage_name, display_name) SELECT id, stage_name, "
+    "display_name FROM users",
+]
+
+# Postgres: a tsvector table with GIN indexes, refreshed by triggers
+POSTGRES_TABLES = [
+    "CREATE TABLE IF NOT EXISTS video_search (video_id INTEGER PRIMARY KEY REFERENCES videos (id) ON "
+    "DELETE CASCADE, document tsvector NOT NULL)",
+
+    "CREATE INDEX IF NOT EXISTS ix_video_search_document ON video_search USING GIN (document)",
+
+    "CREATE INDEX IF NOT EXISTS ix_users_search ON users USING GIN ((to_tsvector('simple', "
+    "coalesce(stage_name, '') || ' ' || coalesce(display_name, ''))))",
+]
+
+POSTGRES_TRIGGERS = [
+    "CREATE OR REPLACE FUNCTION video_search_refresh(target integer) RETURNS void AS $$ INSERT INTO "
+    "video_search (video_id, document) SELECT v.id, setweight(to_tsvector('english', "
+    "coalesce(v.title, '')), 'A') || setweight(to_tsvector('english', concat_ws(' ', u.stage_name, "
+    "u.display_name)), 'B') || setweight(to_tsvector('english', coalesce(v.description, '')), 'C') ||"
+    " setweight(to_tsvector('english', coalesce((SELECT a.full_transcript_text FROM analytics_data a "
+    "WHERE a.video_id = v.id ORDER BY a.id DESC LIMIT 1), '')), 'D') FROM videos v LEFT JOIN users u "
+    "ON u.id = v.user_id WHERE v.id = target ON CONFLICT (video_id) DO UPDATE SET document = "
+    "EXCLUDED.document $$ LANGUAGE sql",
+
+    "CREATE OR REPLACE FUNCTION video_search_video_changed() RETURNS trigger AS $$ BEGIN PERFORM "
+    "video_search_refresh(NEW.id); RETURN NULL; END $$ LANGUAGE plpgsql",
+
+    "CREATE OR REPLACE FUNCTION video_search_user_changed() RETURNS trigger AS $$ BEGIN PERFORM "
+    "video_search_refresh(id) FROM videos WHERE user_id = NEW.id; RETURN NULL; END $$ LANGUAGE "
+    "plpgsql",
+
+    "CREATE OR REPLACE FUNCTION video_search_analytics_changed() RETURNS trigger AS $$ BEGIN IF TG_OP"
+    " != 'INSERT' THEN PERFORM video_search_refresh(OLD.video_id); END IF; IF TG_OP = 'INSERT' OR "
+    "(TG_OP = 'UPDATE' AND NEW.video_id != OLD.video_id) THEN PERFORM "
+    "video_search_refresh(NEW.video_id); END IF; RETURN NULL; END $$ LANGUAGE plpgsql",
+
+    "DROP TRIGGER IF EXISTS video_search_video ON videos",
+
+    "CREATE TRIGGER video_search_video AFTER INSERT OR UPDATE OF title, description, user_id ON "
+    "videos FOR EACH ROW EXECUTE FUNCTION video_search_video_changed()",
+
+    "DROP TRIGGER IF EXISTS video_search_user ON users",
+
+    "CREATE TRIGGER video_search_user AFTER UPDATE OF stage_name, display_name ON users FOR EACH ROW "
+    "EXECUTE FUNCTION video_search_user_changed()",
+
+    "DROP TRIGGER IF EXISTS video_search_analytics ON analytics_data",
+
+    "CREATE TRIGGER video_search_analytics AFTER INSERT OR DELETE OR UPDATE OF full_transcript_text, "
+    "video_id ON analytics_data FOR EACH ROW EXECUTE FUNCTION video_search_analytics_changed()",
+]
+
+POSTGRES_BACKFILL = [
+    "SELECT video_search_refresh(id) FROM videos",
+]
+
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS video_search_video ON videos",
+
+    "DROP TRIGGER IF EXISTS video_search_user ON users",
+
+    "DROP TRIGGER IF EXISTS video_search_analytics ON analytics_data",
+
+    "DROP FUNCTION IF EXISTS video_search_video_changed()",
+
+    "DROP FUNCTION IF EXISTS video_search_user_changed()",
+
+    "DROP FUNCTION IF EXISTS video_search_analytics_changed()",
+
+    "DROP FUNCTION IF EXISTS video_search_refresh(integer)",
+
+    "DROP INDEX IF EXISTS ix_users_search",
+
+    "DROP TABLE IF EXISTS video_search",
+]
+
+
+def _execute_all(statements) -> None:
+    connection = op.get_bind()
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def upgrade() -> None:
+    # FTS5 tables (SQLite) or a tsvector table and GIN indexes (Postgres), plus the
+    # triggers that maintain them; backfilled from existing videos and users unless
+    # the index already existed (the app used to create it alongside create_all)
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_search'"
+        ).first() is not None
+        _execute_all(SQLITE_TABLES + SQLITE_TRIGGERS + ([] if exists else SQLITE_BACKFILL))
+    elif dialect == "postgresql":
+        exists = connection.exec_driver_sql("SELECT to_regclass('video_search')").scalar() is not None
+        _execute_all(POSTGRES_TABLES + POSTGRES_TRIGGERS + ([] if exists else POSTGRES_BACKFILL))
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        _execute_all([f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGER_NAMES])
+        _execute_all(["DROP TABLE IF EXISTS video_search", "DROP TABLE IF EXISTS comedian_search"])
+    elif dialect == "postgresql":
+        _execute_all(POSTGRES_DROP)
@@ -0,0 +1,28 @@
+"""HLS manifest key on videos
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 09:14:06.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Plain ALTERs: a batch rebuild of videos would break the search triggers on SQLite
+    op.add_column('videos', sa.Column('hls_manifest_key', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    # SQLite 3.35+ drops columns in place
+    op.drop_column('videos', 'hls_manifest_key')
@@ -0,0 +1,28 @@
+"""Generated thumbnail prefix on videos
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 11:02:41.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Plain ALTERs: a batch rebuild of videos would break the search triggers on SQLite
+    op.add_column('videos', sa.Column('thumbnail_key', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    # SQLite 3.35+ drops columns in place
+    op.drop_column('videos', 'thumbnail_key')
@@ -0,0 +1,28 @@
+"""Generated thumbnail widths on videos
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 13:20:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Plain ALTERs: a batch rebuild of videos would break the search triggers on SQLite
+    op.add_column('videos', sa.Column('thumbnail_widths', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    # SQLite 3.35+ drops columns in place
+    op.drop_column('videos', 'thumbnail_widths')
@@ -0,0 +1,38 @@
+"""One active job per video and kind
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 15:12:37.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('queued', 'leased')"
+
+
+def upgrade() -> None:
+    # Fail any duplicates left by earlier concurrent enqueues, keeping the oldest active job
+    op.execute(
+        "UPDATE processing_jobs SET status = 'failed', leased_by = NULL, lease_expires_at = NULL, "
+        "last_error = 'Duplicate of an earlier job' "
+        f"WHERE {ACTIVE} AND id NOT IN ("
+        f"SELECT MIN(id) FROM processing_jobs WHERE {ACTIVE} GROUP BY video_id, kind)"
+    )
+    op.create_index(
+        'uq_processing_jobs_active', 'processing_jobs', ['video_id', 'kind'], unique=True,
+        sqlite_where=sa.text(ACTIVE), postgresql_where=sa.text(ACTIVE)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_processing_jobs_active', table_name='processing_jobs')
@@ -1,22 +1,25 @@
 from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Float, JSON
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from config.database import Base
 
 class AnalyticsData(Base):
     __tablename__ = "analytics_data"
     
     id = Column(Integer, primary_key=True, index=True)
-    video_id = Column(Integer, ForeignKey("videos.id"), nullable=False)
+    video_id = Column(Integer, ForeignKey("videos.id"), nullable=False, index=True)
+    
+    # Heavy JSON/text columns are deferred: they can run to hundreds of KB for a
+    # full special, so they load only when accessed or explicitly undeferred
     
     # Transcript data
-    transcript = Column(JSON, nullable=True)  # Array of transcript segments
-    full_transcript_text = Column(Text, nullable=True)  # Complete transcript as text
+    transcript = deferred(Column(JSON, nullable=True))  # Array of transcript segments
+    full_transcript_text = deferred(Column(Text, nullable=True))  # Complete transcript as text
     
     # ML Analytics
     overall_funniness_score = Column(Float, nullable=True)  # 0.0 - 1.0
-    laughter_timestamps = Column(JSON, nullable=True)  # Array of laughter detection data
-    sentiment_analysis = Column(JSON, nullable=True)  # Sentiment scores per segment
+    laughter_timestamps = deferred(Column(JSON, nullable=True))  # Array of laughter detection data
+    sentiment_analysis = deferred(Column(JSON, nullable=True))  # Sentiment scores per segment
     
     # Processing metadata
     processing_version = Column(String(50), nullable=True)  # ML model version
@@ -26,7 +29,7 @@ class AnalyticsData(Base):
     # Additional analytics
     word_count = Column(Integer, nullable=True)
     speaking_rate = Column(Float, nullable=True)  # Words per minute
-    pause_analysis = Column(JSON, nullable=True)  # Pause timing data
+    pause_analysis = deferred(Column(JSON, nullable=True))  # Pause timing data
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -34,6 +37,12 @@ class AnalyticsData(Base):
     
     # Relationships
     video = relationship("Video", back_populates="analytics")
+    segments = relationship(
+        "TranscriptSegment",
+        back_populates="analytics",
+        cascade="all, delete-orphan",
+        order_by="TranscriptSegment.position"
+    )
     
     def __repr__(self):
         return f"<AnalyticsData(video_id={self.video_id}, funniness_score={self.overall_funniness_score})>" 
\ No newline at end of file
@@ -0,0 +1,247 @@
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Index, and_, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, Session
+from config.database import Base
+
+# Queue tuning (seconds unless noted)
+ML_JOB_LEASE_SECONDS = int(os.getenv("ML_JOB_LEASE_SECONDS", "300"))
+ML_JOB_MAX_ATTEMPTS = int(os.getenv("ML_JOB_MAX_ATTEMPTS", "5"))
+ML_JOB_BACKOFF_BASE = float(os.getenv("ML_JOB_BACKOFF_BASE", "30"))
+ML_JOB_BACKOFF_MAX = float(os.getenv("ML_JOB_BACKOFF_MAX", "3600"))
+
+# Job kinds. Only ML analysis state is mirrored onto videos.processing_status
+ML_ANALYSIS_JOB = "ml_analysis"
+TRANSCODE_JOB = "transcode"
+THUMBNAIL_JOB = "thumbnail"
+
+# New uploads jump ahead of catalog backfills, which enqueue at priority 0 or below
+UPLOAD_JOB_PRIORITY = 10
+
+# Job states: queued -> leased -> completed, or back to queued (retry) / failed (attempts exhausted)
+JOB_QUEUED = "queued"
+JOB_LEASED = "leased"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATES = (JOB_QUEUED, JOB_LEASED)
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+    __table_args__ = (
+        # Lease scan: WHERE status = ? AND run_after <= ? ORDER BY priority DESC, id
+        Index("ix_processing_jobs_ready", "status", "priority", "run_after"),
+        # Expired-lease scan: WHERE status = 'leased' AND lease_expires_at < ?
+        Index("ix_processing_jobs_lease", "status", "lease_expires_at"),
+        # At most one queued or leased job per video and kind, even for concurrent enqueues
+        Index(
+            "uq_processing_jobs_active", "video_id", "kind", unique=True,
+            sqlite_where=text("status IN ('queued', 'leased')"),
+            postgresql_where=text("status IN ('queued', 'leased')")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(50), nullable=False, default=ML_ANALYSIS_JOB)
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+
+    # Retry state
+    attempts = Column(Integer, nullable=False, default=0)  # Leases handed out so far
+    max_attempts = Column(Integer, nullable=False, default=ML_JOB_MAX_ATTEMPTS)
+    run_after = Column(DateTime(timezone=True), nullable=False)  # Not leased before this (backoff)
+    last_error = Column(Text, nullable=True)
+
+    # Lease state
+    leased_by = Column(String(255), nullable=True)  # Worker id
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    video = relationship("Video", back_populates="jobs")
+
+    def __repr__(self):
+        return f"<ProcessingJob(id={self.id}, video_id={self.video_id}, status='{self.status}')>"
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for a job that has been leased ``attempts`` times"""
+    delay = min(ML_JOB_BACKOFF_BASE * 2 ** max(attempts - 1, 0), ML_JOB_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+def active_job(db: Session, video_id: int, kind: str) -> Optional[ProcessingJob]:
+    """A video's queued or leased job of one kind (uq_processing_jobs_active allows one)"""
+    return db.scalars(
+        select(ProcessingJob)
+        .where(ProcessingJob.video_id == video_id, ProcessingJob.kind == kind, ProcessingJob.status.in_(ACTIVE_JOB_STATES))
+        .order_by(ProcessingJob.id)
+    ).first()
+
+def enqueue_job(db: Session, video_id: int, priority: int = 0, kind: str = ML_ANALYSIS_JOB) -> ProcessingJob:
+    """Queue a job for a video, or return its already queued/leased job (raising the priority if needed).
+
+    The insert runs in a savepoint: if a concurrent enqueue committed the same job
+    first, the unique index rejects it and the other job is returned instead.
+    """
+    job = active_job(db, video_id, kind)
+    if job is None:
+        job = ProcessingJob(video_id=video_id, kind=kind, priority=priority, status=JOB_QUEUED, attempts=0, run_after=utcnow())
+        try:
+            with db.begin_nested():
+                db.add(job)
+            return job
+        except IntegrityError:
+            job = active_job(db, video_id, kind)
+            if job is None:
+                raise
+    job.priority = max(job.priority, priority)
+    return job
+
+def fail_expired_leases(db: Session) -> List[int]:
+    """Fail expired leases with no attempts left instead of handing them out again.
+
+    Returns the videos whose processing_status became "failed" (ML analysis jobs only);
+    the caller commits.
+    """
+    failed = db.execute(
+        update(ProcessingJob)
+        .where(
+            ProcessingJob.status == JOB_LEASED,
+            ProcessingJob.lease_expires_at < utcnow(),
+            ProcessingJob.attempts >= ProcessingJob.max_attempts
+        )
+        .values(status=JOB_FAILED, leased_by=None, lease_expires_at=None, last_error="Lease expired")
+        .returning(ProcessingJob.video_id, ProcessingJob.kind),
+        execution_options={"synchronize_session": False}
+    ).all()
+    failed_video_ids = [row.video_id for row in failed if row.kind == ML_ANALYSIS_JOB]
+    if failed_video_ids:
+        mark_videos(db, failed_video_ids, "failed")
+    return failed_video_ids
+
+def lease_jobs(
+    db: Session,
+    worker_id: str,
+    limit: int = 1,
+    lease_seconds: int = ML_JOB_LEASE_SECONDS,
+    kind: str = ML_ANALYSIS_JOB,
+    fail_expired: bool = True
+) -> List[ProcessingJob]:
+    """Atomically lease up to ``limit`` ready jobs (highest priority first) to a worker.
+
+    Ready means queued and past its backoff, or leased to a worker whose lease expired.
+    The candidate SELECT uses FOR UPDATE SKIP LOCKED on PostgreSQL so concurrent workers
+    never block on or double-lease the same rows; SQLite ignores the locking clause, and
+    the single UPDATE ... WHERE id IN (SELECT ...) already runs under its database write lock.
+
+    Expired leases are failed first (see fail_expired_leases) unless the caller already did
+    so itself to learn which videos failed.
+    """
+    now = utcnow()
+
+    if fail_expired:
+        fail_expired_leases(db)
+
+    candidates = (
+        select(ProcessingJob.id)
+        .where(
+            ProcessingJob.kind == kind,
+            or_(
+                and_(ProcessingJob.status == JOB_QUEUED, ProcessingJob.run_after <= now),
+                and_(ProcessingJob.status == JOB_LEASED, ProcessingJob.lease_expires_at < now)
+            )
+        )
+        .order_by(ProcessingJob.priority.desc(), ProcessingJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = list(db.scalars(
+        update(ProcessingJob)
+        .where(ProcessingJob.id.in_(candidates.scalar_subquery()))
+        .values(
+            status=JOB_LEASED,
+            leased_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=ProcessingJob.attempts + 1
+        )
+        .returning(ProcessingJob),
+        execution_options={"synchronize_session": False, "populate_existing": True}
+    ))
+    if jobs and kind == ML_ANALYSIS_JOB:
+        mark_videos(db, [job.video_id for job in jobs], "processing")
+    # Detach first so the RETURNING values survive the commit without a refresh query per job
+    for job in jobs:
+        db.expunge(job)
+    db.commit()
+    jobs.sort(key=lambda job: (-job.priority, job.id))
+    return jobs
+
+def heartbeat_job(db: Session, job_id: int, worker_id: str, lease_seconds: int = ML_JOB_LEASE_SECONDS) -> Optional[datetime]:
+    """Extend a worker's lease, returns the new expiry or None if the worker no longer holds it"""
+    expires_at = utcnow() + timedelta(seconds=lease_seconds)
+    result = db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.leased_by == worker_id, ProcessingJob.status == JOB_LEASED)
+        .values(lease_expires_at=expires_at),
+        execution_options={"synchronize_session": False}
+    )
+    db.commit()
+    return expires_at if result.rowcount else None
+
+def complete_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """Mark a leased job done, returns False if the worker no longer holds it"""
+    result = db.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.leased_by == worker_id, ProcessingJob.status == JOB_LEASED)
+        .values(status=JOB_COMPLETED, leased_by=None, lease_expires_at=None, last_error=None, completed_at=utcnow()),
+        execution_options={"synchronize_session": False}
+    )
+    db.commit()
+    return bool(result.rowcount)
+
+def fail_job(db: Session, job_id: int, worker_id: str, error: str, retry: bool = True) -> Optional[ProcessingJob]:
+    """Record a failed attempt: requeue with backoff, or fail for good once attempts run out.
+
+    Returns the job, or None if the worker no longer holds its lease.
+    """
+    job = db.scalars(
+        select(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.leased_by == worker_id, ProcessingJob.status == JOB_LEASED)
+        .with_for_update()
+    ).first()
+    if not job:
+        return None
+    job.leased_by = None
+    job.lease_expires_at = None
+    job.last_error = error[:2000]
+    if retry and job.attempts < job.max_attempts:
+        job.status = JOB_QUEUED
+        job.run_after = utcnow() + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status = JOB_FAILED
+    if job.kind == ML_ANALYSIS_JOB:
+        mark_videos(db, [job.video_id], "pending" if job.status == JOB_QUEUED else "failed")
+    db.commit()
+    return job
+
+def mark_videos(db: Session, video_ids: List[int], processing_status: str) -> None:
+    """Mirror job state onto videos.processing_status for the existing status endpoints"""
+    from models.video import Video
+
+    db.execute(
+        update(Video)
+        .where(Video.id.in_(video_ids))
+        .values(processing_status=processing_status, is_processed=processing_status == "completed"),
+        execution_options={"synchronize_session": False}
+    )
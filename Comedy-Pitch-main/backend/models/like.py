@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config.database import Base
 
 class Like(Base):
     __tablename__ = "likes"
+    __table_args__ = (
+        # One like per user per video; also the (user_id, video_id) lookup index
+        UniqueConstraint("user_id", "video_id", name="uq_likes_user_video"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -3,6 +3,11 @@ from models.user import User
 from models.video import Video
 from models.like import Like
 from models.analytics import AnalyticsData
+from models.transcript import TranscriptSegment
+from models.job import ProcessingJob
+
+# Full-text search index, created alongside the tables above
+import models.search  # noqa: F401
 
 # Export all models
-__all__ = ["User", "Video", "Like", "AnalyticsData"] 
\ No newline at end of file
+__all__ = ["User", "Video", "Like", "AnalyticsData", "TranscriptSegment", "ProcessingJob"] 
\ No newline at end of file
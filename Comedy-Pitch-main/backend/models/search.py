@@ -0,0 +1,219 @@
+"""
+Full-text search index over videos (title, description, performer names, transcript)
+and comedians (stage and display names).
+
+SQLite: FTS5 tables video_search (rowid = videos.id) and comedian_search
+(rowid = users.id), kept current by triggers on videos, users and analytics_data.
+
+Postgres: a video_search table of weighted tsvectors with a GIN index, refreshed by
+triggers, plus a GIN expression index on users for name search.
+
+Neither dialect's objects are ORM tables: they are created after Base.metadata's
+tables (create_all or migration 0008) and excluded from autogenerate. Migration
+0008 keeps its own copy of this SQL, so changing it here needs a new migration.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from config.database import Base
+
+SEARCH_TABLES = ("video_search", "comedian_search")
+SEARCH_INDEXES = ("ix_video_search_document", "ix_users_search")
+
+# Text search configurations (Postgres): stemmed for sets, as-is for names
+VIDEO_TS_CONFIG = "english"
+NAME_TS_CONFIG = "simple"
+
+def is_search_object(name: str) -> bool:
+    """Whether a table or index belongs to the search index (FTS5 shadow tables included)"""
+    return name.startswith(SEARCH_TABLES) or name in SEARCH_INDEXES
+
+# SQLite FTS5
+_SQLITE_PERFORMER = "trim(coalesce({u}.stage_name, '') || ' ' || coalesce({u}.display_name, ''))"
+_SQLITE_VIDEO_PERFORMER = (
+    "(SELECT " + _SQLITE_PERFORMER.format(u="users") + " FROM users WHERE users.id = NEW.user_id)"
+)
+_SQLITE_LATEST_TRANSCRIPT = (
+    "(SELECT full_transcript_text FROM analytics_data WHERE analytics_data.video_id = {video_id} "
+    "ORDER BY analytics_data.id DESC LIMIT 1)"
+)
+
+SQLITE_SEARCH_TABLES = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS video_search USING fts5("
+    "title, description, performer, transcript, tokenize = 'porter unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS comedian_search USING fts5("
+    "stage_name, display_name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+]
+
+# Triggers only fire for the indexed columns, so view/like counter updates cost nothing
+SQLITE_SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS video_search_video_insert AFTER INSERT ON videos BEGIN "
+    "INSERT INTO video_search (rowid, title, description, performer, transcript) VALUES ("
+    f"NEW.id, NEW.title, NEW.description, {_SQLITE_VIDEO_PERFORMER}, "
+    f"{_SQLITE_LATEST_TRANSCRIPT.format(video_id='NEW.id')}); END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_video_update AFTER UPDATE OF title, description, user_id ON videos BEGIN "
+    "UPDATE video_search SET title = NEW.title, description = NEW.description, "
+    f"performer = {_SQLITE_VIDEO_PERFORMER} WHERE rowid = NEW.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_video_delete AFTER DELETE ON videos BEGIN "
+    "DELETE FROM video_search WHERE rowid = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_user_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO comedian_search (rowid, stage_name, display_name) "
+    "VALUES (NEW.id, NEW.stage_name, NEW.display_name); END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_user_update AFTER UPDATE OF stage_name, display_name ON users BEGIN "
+    "UPDATE comedian_search SET stage_name = NEW.stage_name, display_name = NEW.display_name WHERE rowid = NEW.id; "
+    f"UPDATE video_search SET performer = {_SQLITE_PERFORMER.format(u='NEW')} "
+    "WHERE rowid IN (SELECT id FROM videos WHERE videos.user_id = NEW.id); END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_user_delete AFTER DELETE ON users BEGIN "
+    "DELETE FROM comedian_search WHERE rowid = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_analytics_insert AFTER INSERT ON analytics_data BEGIN "
+    "UPDATE video_search SET transcript = NEW.full_transcript_text WHERE rowid = NEW.video_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_analytics_update AFTER UPDATE OF full_transcript_text, video_id "
+    "ON analytics_data BEGIN "
+    f"UPDATE video_search SET transcript = {_SQLITE_LATEST_TRANSCRIPT.format(video_id='OLD.video_id')} "
+    "WHERE rowid = OLD.video_id AND OLD.video_id != NEW.video_id; "
+    f"UPDATE video_search SET transcript = {_SQLITE_LATEST_TRANSCRIPT.format(video_id='NEW.video_id')} "
+    "WHERE rowid = NEW.video_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS video_search_analytics_delete AFTER DELETE ON analytics_data BEGIN "
+    f"UPDATE video_search SET transcript = {_SQLITE_LATEST_TRANSCRIPT.format(video_id='OLD.video_id')} "
+    "WHERE rowid = OLD.video_id; END",
+]
+
+SQLITE_SEARCH_TRIGGER_NAMES = [statement.split()[5] for statement in SQLITE_SEARCH_TRIGGERS]
+
+SQLITE_SEARCH_BACKFILL = [
+    "INSERT INTO video_search (rowid, title, description, performer, transcript) "
+    f"SELECT videos.id, videos.title, videos.description, {_SQLITE_PERFORMER.format(u='users')}, "
+    f"{_SQLITE_LATEST_TRANSCRIPT.format(video_id='videos.id')} "
+    "FROM videos LEFT JOIN users ON users.id = videos.user_id",
+
+    "INSERT INTO comedian_search (rowid, stage_name, display_name) SELECT id, stage_name, display_name FROM users",
+]
+
+# Postgres tsvector
+POSTGRES_VIDEO_DOCUMENT = (
+    f"setweight(to_tsvector('{VIDEO_TS_CONFIG}', coalesce(v.title, '')), 'A') || "
+    f"setweight(to_tsvector('{VIDEO_TS_CONFIG}', concat_ws(' ', u.stage_name, u.display_name)), 'B') || "
+    f"setweight(to_tsvector('{VIDEO_TS_CONFIG}', coalesce(v.description, '')), 'C') || "
+    f"setweight(to_tsvector('{VIDEO_TS_CONFIG}', coalesce((SELECT a.full_transcript_text FROM analytics_data a "
+    "WHERE a.video_id = v.id ORDER BY a.id DESC LIMIT 1), '')), 'D')"
+)
+# Queries must repeat the ix_users_search expression exactly for the planner to use it
+# (and index expressions must be immutable, which rules out concat_ws)
+POSTGRES_NAME_DOCUMENT = (
+    f"to_tsvector('{NAME_TS_CONFIG}', coalesce(stage_name, '') || ' ' || coalesce(display_name, ''))"
+)
+
+POSTGRES_SEARCH_TABLES = [
+    "CREATE TABLE IF NOT EXISTS video_search ("
+    "video_id INTEGER PRIMARY KEY REFERENCES videos (id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_video_search_document ON video_search USING GIN (document)",
+    f"CREATE INDEX IF NOT EXISTS ix_users_search ON users USING GIN (({POSTGRES_NAME_DOCUMENT}))",
+]
+
+POSTGRES_SEARCH_TRIGGERS = [
+    "CREATE OR REPLACE FUNCTION video_search_refresh(target integer) RETURNS void AS $$ "
+    f"INSERT INTO video_search (video_id, document) SELECT v.id, {POSTGRES_VIDEO_DOCUMENT} "
+    "FROM videos v LEFT JOIN users u ON u.id = v.user_id WHERE v.id = target "
+    "ON CONFLICT (video_id) DO UPDATE SET document = EXCLUDED.document "
+    "$$ LANGUAGE sql",
+
+    "CREATE OR REPLACE FUNCTION video_search_video_changed() RETURNS trigger AS $$ BEGIN "
+    "PERFORM video_search_refresh(NEW.id); RETURN NULL; END $$ LANGUAGE plpgsql",
+
+    "CREATE OR REPLACE FUNCTION video_search_user_changed() RETURNS trigger AS $$ BEGIN "
+    "PERFORM video_search_refresh(id) FROM videos WHERE user_id = NEW.id; RETURN NULL; END $$ LANGUAGE plpgsql",
+
+    "CREATE OR REPLACE FUNCTION video_search_analytics_changed() RETURNS trigger AS $$ BEGIN "
+    "IF TG_OP != 'INSERT' THEN PERFORM video_search_refresh(OLD.video_id); END IF; "
+    "IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.video_id != OLD.video_id) THEN "
+    "PERFORM video_search_refresh(NEW.video_id); END IF; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+
+    "DROP TRIGGER IF EXISTS video_search_video ON videos",
+    "CREATE TRIGGER video_search_video AFTER INSERT OR UPDATE OF title, description, user_id ON videos "
+    "FOR EACH ROW EXECUTE FUNCTION video_search_video_changed()",
+
+    "DROP TRIGGER IF EXISTS video_search_user ON users",
+    "CREATE TRIGGER video_search_user AFTER UPDATE OF stage_name, display_name ON users "
+    "FOR EACH ROW EXECUTE FUNCTION video_search_user_changed()",
+
+    "DROP TRIGGER IF EXISTS video_search_analytics ON analytics_data",
+    "CREATE TRIGGER video_search_analytics AFTER INSERT OR DELETE OR UPDATE OF full_transcript_text, video_id "
+    "ON analytics_data FOR EACH ROW EXECUTE FUNCTION video_search_analytics_changed()",
+]
+
+POSTGRES_SEARCH_BACKFILL = [
+    "SELECT video_search_refresh(id) FROM videos",
+]
+
+POSTGRES_SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS video_search_video ON videos",
+    "DROP TRIGGER IF EXISTS video_search_user ON users",
+    "DROP TRIGGER IF EXISTS video_search_analytics ON analytics_data",
+    "DROP FUNCTION IF EXISTS video_search_video_changed()",
+    "DROP FUNCTION IF EXISTS video_search_user_changed()",
+    "DROP FUNCTION IF EXISTS video_search_analytics_changed()",
+    "DROP FUNCTION IF EXISTS video_search_refresh(integer)",
+    "DROP INDEX IF EXISTS ix_users_search",
+    "DROP TABLE IF EXISTS video_search",
+]
+
+def _execute_all(connection: Connection, statements) -> None:
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+def search_index_exists(connection: Connection) -> bool:
+    if connection.dialect.name == "sqlite":
+        return connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_search'"
+        ).first() is not None
+    return connection.exec_driver_sql("SELECT to_regclass('video_search')").scalar() is not None
+
+def create_search_index(connection: Connection) -> None:
+    """Create the search tables and triggers if missing, backfilling a new index from existing rows"""
+    dialect = connection.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+    created = not search_index_exists(connection)
+    if dialect == "sqlite":
+        _execute_all(connection, SQLITE_SEARCH_TABLES + SQLITE_SEARCH_TRIGGERS)
+        if created:
+            _execute_all(connection, SQLITE_SEARCH_BACKFILL)
+    else:
+        _execute_all(connection, POSTGRES_SEARCH_TABLES + POSTGRES_SEARCH_TRIGGERS)
+        if created:
+            _execute_all(connection, POSTGRES_SEARCH_BACKFILL)
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Re-index every video and comedian from the source tables"""
+    if connection.dialect.name == "sqlite":
+        _execute_all(connection, ["DELETE FROM video_search", "DELETE FROM comedian_search"] + SQLITE_SEARCH_BACKFILL)
+        _execute_all(connection, ["INSERT INTO video_search (video_search) VALUES ('optimize')"])
+    elif connection.dialect.name == "postgresql":
+        _execute_all(connection, ["DELETE FROM video_search"] + POSTGRES_SEARCH_BACKFILL)
+
+def drop_search_index(connection: Connection) -> None:
+    """Drop the search tables and triggers"""
+    if connection.dialect.name == "sqlite":
+        _execute_all(connection, [f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_SEARCH_TRIGGER_NAMES])
+        _execute_all(connection, [f"DROP TABLE IF EXISTS {name}" for name in SEARCH_TABLES])
+    elif connection.dialect.name == "postgresql":
+        _execute_all(connection, POSTGRES_SEARCH_DROP)
+
+# Keep the index alongside the ORM tables for create_all / drop_all
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    create_search_index(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Text, Integer, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
+from config.database import Base
+
+class TranscriptSegment(Base):
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        # Time-window reads: WHERE analytics_id = ? AND start_time >= ? ORDER BY start_time, position
+        Index("ix_transcript_segments_window", "analytics_id", "start_time", "position"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    analytics_id = Column(Integer, ForeignKey("analytics_data.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)  # Order within the transcript
+    text = Column(Text, nullable=False)
+    start_time = Column(Float, nullable=False)  # Seconds
+    end_time = Column(Float, nullable=False)  # Seconds
+    funniness_score = Column(Float, nullable=True)  # 0.0 - 1.0
+    
+    # Relationships
+    analytics = relationship("AnalyticsData", back_populates="segments")
+    
+    def to_dict(self):
+        return {
+            "text": self.text,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "funniness_score": self.funniness_score
+        }
+    
+    def __repr__(self):
+        return f"<TranscriptSegment(analytics_id={self.analytics_id}, start_time={self.start_time})>"
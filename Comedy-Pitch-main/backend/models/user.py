@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, select, update
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config.database import Base
@@ -21,9 +21,39 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Denormalized stats - kept in step with videos and likes in the same transaction
+    video_count = Column(Integer, default=0, server_default="0", nullable=False)
+    total_likes = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Relationships
     videos = relationship("Video", back_populates="user", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
-        return f"<User(firebase_uid='{self.firebase_uid}', email='{self.email}')>" 
\ No newline at end of file
+        return f"<User(firebase_uid='{self.firebase_uid}', email='{self.email}')>" 
+
+def user_stats_update(user_id: int, video_count: int = 0, total_likes: int = 0):
+    """Build an atomic UPDATE applying deltas to a user's denormalized stats"""
+    users = User.__table__
+    return update(users).where(users.c.id == user_id).values(
+        video_count=users.c.video_count + video_count,
+        total_likes=users.c.total_likes + total_likes
+    )
+
+def reconcile_user_stats(connection) -> int:
+    """Recompute every user's stats from the videos table, returns rows updated"""
+    from models.video import Video
+    
+    users = User.__table__
+    videos = Video.__table__
+    result = connection.execute(
+        update(users).values(
+            video_count=select(func.count(videos.c.id))
+                .where(videos.c.user_id == users.c.id)
+                .scalar_subquery(),
+            total_likes=select(func.coalesce(func.sum(videos.c.like_count), 0))
+                .where(videos.c.user_id == users.c.id)
+                .scalar_subquery()
+        )
+    )
+    return result.rowcount
@@ -1,10 +1,25 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, ForeignKey, Float, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, ForeignKey, Float, JSON, Index, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config.database import Base
+from models.user import user_stats_update
+
+# Target widths of the generated WebP thumbnails (for srcset); sources narrower than a
+# width get one at their own width instead. thumbnail_url is the default one.
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+THUMBNAIL_DEFAULT_WIDTH = 640
+
+def thumbnail_variant_key(prefix: str, width: int) -> str:
+    """Storage key of one generated thumbnail width, under Video.thumbnail_key"""
+    return f"{prefix}/{width}.webp"
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        # Keyset pagination indexes matching the feed filters and (posted_at DESC, id DESC) order
+        Index("ix_videos_public_feed", "is_public", "posted_at", "id"),
+        Index("ix_videos_user_feed", "user_id", "posted_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -22,6 +37,9 @@ class Video(Base):
     storage_key = Column(String(500), nullable=False)  # S3/MinIO key
     storage_url = Column(String(1000), nullable=True)  # Public URL if available
     thumbnail_url = Column(String(1000), nullable=True)
+    hls_manifest_key = Column(String(500), nullable=True)  # HLS master playlist, set once transcoded
+    thumbnail_key = Column(String(500), nullable=True)  # Prefix of the generated WebP thumbnails
+    thumbnail_widths = Column(JSON, nullable=True)  # Widths actually generated under thumbnail_key, ascending
     
     # Visibility and status
     is_public = Column(Boolean, default=True)
@@ -48,6 +66,16 @@ class Video(Base):
     user = relationship("User", back_populates="videos")
     likes = relationship("Like", back_populates="video", cascade="all, delete-orphan")
     analytics = relationship("AnalyticsData", back_populates="video", cascade="all, delete-orphan")
+    jobs = relationship("ProcessingJob", back_populates="video", cascade="all, delete-orphan")
     
     def __repr__(self):
-        return f"<Video(id={self.id}, title='{self.title}', user_id={self.user_id})>" 
\ No newline at end of file
+        return f"<Video(id={self.id}, title='{self.title}', user_id={self.user_id})>" 
+
+# Keep the author's denormalized stats in step with every insert/delete, whatever the code path
+@event.listens_for(Video, "after_insert")
+def _video_inserted(mapper, connection, video):
+    connection.execute(user_stats_update(video.user_id, video_count=1, total_likes=video.like_count or 0))
+
+@event.listens_for(Video, "after_delete")
+def _video_deleted(mapper, connection, video):
+    connection.execute(user_stats_update(video.user_id, video_count=-1, total_likes=-(video.like_count or 0)))
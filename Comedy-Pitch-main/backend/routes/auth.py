@@ -8,7 +8,8 @@ from config.firebase_config import (
     verify_firebase_token,
     get_user_by_uid,
     list_all_users,
-    create_custom_token
+    create_custom_token,
+    token_cache
 )
 
 # Configure logging
@@ -123,6 +124,7 @@ async def auth_health():
     return {
         "status": "healthy",
         "service": "authentication",
+        "token_cache": token_cache.stats(),
         "routes": [
             "/config",
             "/verify-token",
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Tuple
 import logging
 
-from config.database import get_db
+from config.database import get_db, run_db, DBSession
 from routes.auth import verify_token_dependency
 from models.models import User, Video, Like
-from routes.videos import get_or_create_user
+from models.user import user_stats_update
+from routes.videos import resolve_user, get_liked_video_ids
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -19,61 +22,124 @@ class LikeResponse(BaseModel):
     liked: bool
     like_count: int
 
+class LikeStatusRequest(BaseModel):
+    video_ids: List[int] = Field(..., max_length=500, description="Up to 500 video IDs")
 
+class LikeStatusResponse(BaseModel):
+    statuses: Dict[int, bool]
+
+# Helper functions
+def insert_ignoring_duplicates(db: Session, table):
+    """INSERT ... ON CONFLICT DO NOTHING for the session's dialect"""
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert(table).on_conflict_do_nothing(index_elements=["user_id", "video_id"])
+
+def add_like(db: Session, user_id: int, video: Video, firebase_uid: str) -> Tuple[bool, int]:
+    """Atomically like a video, returns (newly_liked, like_count).
+    
+    The unique (user_id, video_id) constraint makes the insert itself the duplicate
+    check, and the counters are bumped in SQL so concurrent likes never lose updates.
+    """
+    inserted = db.execute(
+        insert_ignoring_duplicates(db, Like.__table__)
+        .values(user_id=user_id, video_id=video.id, firebase_uid=firebase_uid)
+        .returning(Like.__table__.c.id)
+    ).first()
+    
+    if inserted is None:
+        return False, video.like_count
+    
+    like_count = db.execute(
+        update(Video.__table__)
+        .where(Video.__table__.c.id == video.id)
+        .values(like_count=Video.__table__.c.like_count + 1)
+        .returning(Video.__table__.c.like_count)
+    ).scalar_one()
+    db.execute(user_stats_update(video.user_id, total_likes=1))
+    db.commit()
+    return True, like_count
+
+def remove_like(db: Session, user_id: int, video: Video) -> Tuple[bool, int]:
+    """Atomically unlike a video, returns (was_liked, like_count)"""
+    deleted = db.execute(
+        delete(Like.__table__)
+        .where(Like.__table__.c.user_id == user_id, Like.__table__.c.video_id == video.id)
+        .returning(Like.__table__.c.id)
+    ).first()
+    
+    if deleted is None:
+        return False, video.like_count
+    
+    # Never let the counter go negative
+    decremented = db.execute(
+        update(Video.__table__)
+        .where(Video.__table__.c.id == video.id, Video.__table__.c.like_count > 0)
+        .values(like_count=Video.__table__.c.like_count - 1)
+        .returning(Video.__table__.c.like_count)
+    ).first()
+    if decremented is not None:
+        db.execute(user_stats_update(video.user_id, total_likes=-1))
+        like_count = decremented[0]
+    else:
+        like_count = 0
+    db.commit()
+    return True, like_count
 
 # Routes
+@router.post("/likes/status", response_model=LikeStatusResponse)
+async def get_like_status(
+    request: LikeStatusRequest,
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Whether the current user liked each of the given videos, in one round trip"""
+    try:
+        def _get_like_status(db: Session) -> LikeStatusResponse:
+            user = resolve_user(db, firebase_user)
+            liked_ids = get_liked_video_ids(db, user.id, request.video_ids)
+            return LikeStatusResponse(
+                statuses={video_id: video_id in liked_ids for video_id in request.video_ids}
+            )
+        
+        return await run_db(db, _get_like_status)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting like status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get like status")
+
 @router.post("/{video_id}/likes", response_model=LikeResponse)
 async def like_video(
     video_id: int,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Like a video"""
     try:
-        # Get or create user
-        user = get_or_create_user(db, firebase_user)
-        
-        # Check if video exists
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
-        
-        # Check if video is accessible (public or owned by user)
-        if not video.is_public and video.user_id != user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Check if user already liked this video
-        existing_like = db.query(Like).filter(
-            Like.user_id == user.id,
-            Like.video_id == video_id
-        ).first()
-        
-        if existing_like:
+        def _like_video(db: Session) -> LikeResponse:
+            # Get or create user
+            user = resolve_user(db, firebase_user)
+            
+            # Check if video exists
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            # Check if video is accessible (public or owned by user)
+            if not video.is_public and video.user_id != user.id:
+                raise HTTPException(status_code=403, detail="Access denied")
+            
+            liked, like_count = add_like(db, user.id, video, firebase_user["uid"])
+            
             return LikeResponse(
-                message="Video already liked",
+                message="Video liked successfully" if liked else "Video already liked",
                 liked=True,
-                like_count=video.like_count
+                like_count=like_count
             )
         
-        # Create new like
-        new_like = Like(
-            user_id=user.id,
-            video_id=video_id,
-            firebase_uid=firebase_user["uid"]
-        )
-        
-        db.add(new_like)
-        
-        # Update video like count
-        video.like_count += 1
-        
-        db.commit()
-        
-        return LikeResponse(
-            message="Video liked successfully",
-            liked=True,
-            like_count=video.like_count
-        )
+        return await run_db(db, _like_video)
         
     except HTTPException:
         raise
@@ -85,44 +151,28 @@ async def like_video(
 async def unlike_video(
     video_id: int,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Remove like from a video"""
     try:
-        # Get or create user
-        user = get_or_create_user(db, firebase_user)
-        
-        # Check if video exists
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
-        
-        # Find existing like
-        existing_like = db.query(Like).filter(
-            Like.user_id == user.id,
-            Like.video_id == video_id
-        ).first()
-        
-        if not existing_like:
+        def _unlike_video(db: Session) -> LikeResponse:
+            # Get or create user
+            user = resolve_user(db, firebase_user)
+            
+            # Check if video exists
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            was_liked, like_count = remove_like(db, user.id, video)
+            
             return LikeResponse(
-                message="Video not liked by user",
+                message="Like removed successfully" if was_liked else "Video not liked by user",
                 liked=False,
-                like_count=video.like_count
+                like_count=like_count
             )
         
-        # Remove like
-        db.delete(existing_like)
-        
-        # Update video like count
-        video.like_count = max(0, video.like_count - 1)  # Ensure it doesn't go negative
-        
-        db.commit()
-        
-        return LikeResponse(
-            message="Like removed successfully",
-            liked=False,
-            like_count=video.like_count
-        )
+        return await run_db(db, _unlike_video)
         
     except HTTPException:
         raise
@@ -0,0 +1,197 @@
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
+from email.utils import formatdate
+from typing import Optional, Tuple
+from pathlib import Path
+from urllib.parse import quote
+import os
+import re
+import secrets
+import time
+import logging
+
+import anyio
+
+from config.http_cache import etag_matches, not_modified
+from storage.base import MultipartUploadError
+from storage.factory import get_storage
+from storage.local_storage import LocalStorage, content_type_for, file_etag
+
+# Configure logging
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Bytes read per chunk when the API streams a file itself
+MEDIA_CHUNK_SIZE = 256 * 1024
+
+# When set (e.g. "/protected-media/"), downloads are handed to the front proxy with
+# X-Accel-Redirect: nginx then sends the file with sendfile() and handles Range and
+# conditional requests itself, and no media bytes pass through Python
+LOCAL_STORAGE_ACCEL_REDIRECT = os.getenv("LOCAL_STORAGE_ACCEL_REDIRECT", "")
+
+# Upper bound for uploads whose signed URL carries no declared size
+LOCAL_STORAGE_MAX_UPLOAD_BYTES = int(os.getenv("LOCAL_STORAGE_MAX_UPLOAD_BYTES", str(5 * 1024 ** 3)))
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+class FileRangeResponse(Response):
+    """Streams bytes start..end (inclusive) of a file in MEDIA_CHUNK_SIZE reads"""
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int, headers: dict, send_body: bool = True):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.send_body = send_body
+        super().__init__(status_code=status_code, headers=headers)
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        remaining = self.end - self.start + 1 if self.send_body else 0
+        if remaining > 0:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.start)
+                while remaining > 0:
+                    chunk = await file.read(min(MEDIA_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break  # Truncated since the stat; end the response short
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+# Helper functions
+def get_local_storage() -> LocalStorage:
+    """The local storage backend, or 404 when files are served by an object store"""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    return storage
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The (start, end) of a single-range "bytes=" header, None to send the whole file.
+    
+    Multiple ranges and malformed headers are ignored (a full 200 is always a valid
+    answer); a range starting past the end is 416.
+    """
+    match = RANGE_PATTERN.fullmatch(range_header.strip()) if range_header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start > end and last and int(last) < start:
+            return None
+    if start >= size or size == 0:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+# Routes
+@router.api_route("/{key:path}", methods=["GET", "HEAD"])
+async def download_media(
+    key: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Serve a locally stored file from a signed URL, with Range and If-None-Match support"""
+    storage = get_local_storage()
+    if not storage.verify_signature("GET", key, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+    
+    try:
+        path, stat = storage.stat_file(key)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    etag = file_etag(stat)
+    # Signed URLs are per-viewer: let the browser keep the file until the URL expires
+    cache_control = f"private, max-age={max(expires - int(time.time()), 0)}"
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Type": content_type_for(key),
+        # Media is already compressed; also keeps GZipMiddleware from buffering it
+        "Content-Encoding": "identity"
+    }
+    
+    if LOCAL_STORAGE_ACCEL_REDIRECT:
+        headers["X-Accel-Redirect"] = LOCAL_STORAGE_ACCEL_REDIRECT.rstrip("/") + "/" + quote(key)
+        del headers["Content-Encoding"]
+        return Response(status_code=200, headers=headers)
+    
+    # A stale If-Range (the file changed since the client's partial copy) gets the whole file
+    byte_range = parse_range(range, stat.st_size) if not if_range or if_range.strip() == etag else None
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    else:
+        start, end = 0, stat.st_size - 1
+        status_code = 200
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return FileRangeResponse(path, start, end, status_code, headers, send_body=request.method != "HEAD")
+
+@router.put("/{key:path}")
+async def upload_media(
+    key: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    size: Optional[int] = Query(None),
+    upload_id: Optional[str] = Query(None, alias="uploadId"),
+    part_number: Optional[int] = Query(None, alias="partNumber")
+):
+    """Receive an upload to a signed URL (the local counterpart of a presigned PUT or UploadPart)"""
+    storage = get_local_storage()
+    upload_part = (upload_id, part_number) if upload_id and part_number else None
+    if not storage.verify_signature("PUT", key, expires, signature, size, upload_part):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+    
+    limit = size if size is not None else LOCAL_STORAGE_MAX_UPLOAD_BYTES
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Upload exceeds the signed size")
+    
+    try:
+        path = storage.part_path(key, *upload_part) if upload_part else storage.path_for(key)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid storage key")
+    except MultipartUploadError as e:
+        # Completed or aborted since the part URL was signed
+        raise HTTPException(status_code=404, detail=str(e))
+    temp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.part")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        # Stream to a temp file and rename, so readers never see a partial upload
+        async with await anyio.open_file(temp_path, mode="wb") as file:
+            async for chunk in request.stream():
+                written += len(chunk)
+                if written > limit:
+                    raise HTTPException(status_code=413, detail="Upload exceeds the signed size")
+                await file.write(chunk)
+        os.replace(temp_path, path)
+        return Response(status_code=200, headers={"ETag": file_etag(path.stat())})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error storing upload {key}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to store upload")
+    finally:
+        temp_path.unlink(missing_ok=True)
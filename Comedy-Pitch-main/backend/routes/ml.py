@@ -1,16 +1,46 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import bindparam, delete, insert, select, update
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Union
+from datetime import datetime
 import logging
+import os
+import zlib
 
-from config.database import get_db
+import msgpack
+
+from config.database import get_db, run_db, DBSession
+from config.fast_json import dumps
+from config.status_events import SSE_KEEPALIVE_SECONDS, StatusPoller, status_broker
 from models.models import Video, AnalyticsData
+from models.job import (
+    ML_JOB_LEASE_SECONDS,
+    ProcessingJob,
+    complete_job,
+    enqueue_job,
+    fail_expired_leases,
+    fail_job,
+    heartbeat_job,
+    lease_jobs
+)
+# Aliased: TranscriptSegment below is the request schema
+from models.transcript import TranscriptSegment as TranscriptSegmentRecord
 
 # Configure logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# A status stream can follow at most this many videos
+STATUS_STREAM_MAX_VIDEOS = 100
+TERMINAL_STATUSES = {"completed", "failed"}
+
+# Bulk ingestion commits once per this many records
+ML_BULK_BATCH_SIZE = int(os.getenv("ML_BULK_BATCH_SIZE", "500"))
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+MSGPACK_CONTENT_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+
 # Pydantic models for ML processing results
 class TranscriptSegment(BaseModel):
     text: str = Field(..., description="Transcript text for this segment")
@@ -39,95 +69,325 @@ class MLScoreResponse(BaseModel):
     video_id: int
     analytics_id: int
 
+class BulkScoreResult(BaseModel):
+    line: int = Field(..., description="Line number (NDJSON) or record number (msgpack), starting at 1")
+    video_id: Optional[int] = None
+    status: str = Field(..., description="ok or error")
+    analytics_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkScoreResponse(BaseModel):
+    processed: int
+    failed: int
+    results: List[BulkScoreResult]
+
+class EnqueueJobRequest(BaseModel):
+    video_id: int
+    priority: int = Field(0, description="Higher runs first; uploads enqueue at 10")
+
+class LeaseJobsRequest(BaseModel):
+    worker_id: str = Field(..., min_length=1, max_length=255, description="Stable id of the leasing worker")
+    limit: int = Field(1, ge=1, le=50, description="Maximum jobs to lease")
+    lease_seconds: int = Field(ML_JOB_LEASE_SECONDS, ge=10, le=3600, description="Lease length; heartbeat before it runs out")
+
+class WorkerRequest(BaseModel):
+    worker_id: str = Field(..., min_length=1, max_length=255)
+    lease_seconds: int = Field(ML_JOB_LEASE_SECONDS, ge=10, le=3600)
+
+class FailJobRequest(BaseModel):
+    worker_id: str = Field(..., min_length=1, max_length=255)
+    error: str = Field(..., description="Why the attempt failed")
+    retry: bool = Field(True, description="False fails the job without further attempts")
+
+class JobResponse(BaseModel):
+    id: int
+    video_id: int
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    run_after: Optional[datetime] = None
+    lease_expires_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    storage_key: Optional[str] = None
+
+class LeaseJobsResponse(BaseModel):
+    jobs: List[JobResponse]
+
 class VideoProcessingStatusUpdate(BaseModel):
     video_id: int
     status: str = Field(..., description="Processing status: pending, processing, completed, failed")
     error_message: Optional[str] = None
 
+# Helper functions
+def score_result_values(ml_data: MLScoreRequest) -> Dict[str, Any]:
+    """Analytics column values for one ML result (transcript and laughter as JSON)"""
+    transcript_json = [
+        {
+            "text": segment.text,
+            "start_time": segment.start_time,
+            "end_time": segment.end_time,
+            "funniness_score": segment.funniness_score
+        }
+        for segment in ml_data.transcript
+    ]
+    laughter_json = None
+    if ml_data.laughter_timestamps:
+        laughter_json = [
+            {
+                "timestamp": event.timestamp,
+                "duration": event.duration,
+                "intensity": event.intensity
+            }
+            for event in ml_data.laughter_timestamps
+        ]
+    return {
+        "transcript": transcript_json,
+        "full_transcript_text": " ".join(segment.text for segment in ml_data.transcript),
+        "overall_funniness_score": ml_data.overall_funniness_score,
+        "laughter_timestamps": laughter_json,
+        "processing_version": ml_data.processing_version,
+        "confidence_score": ml_data.confidence_score,
+        "processing_duration": ml_data.processing_duration,
+        "word_count": ml_data.word_count,
+        "speaking_rate": ml_data.speaking_rate
+    }
+
+def replace_transcript_segment_sets(db: Session, transcripts: Dict[int, List[Dict[str, Any]]]) -> None:
+    """Swap the transcript segments of many analytics rows in one DELETE and one executemany INSERT"""
+    segments = TranscriptSegmentRecord.__table__
+    db.execute(delete(segments).where(segments.c.analytics_id.in_(list(transcripts))))
+    rows = [
+        {
+            "analytics_id": analytics_id,
+            "position": position,
+            "text": segment["text"],
+            "start_time": segment["start_time"],
+            "end_time": segment["end_time"],
+            "funniness_score": segment.get("funniness_score")
+        }
+        for analytics_id, transcript in transcripts.items()
+        for position, segment in enumerate(transcript)
+    ]
+    if rows:
+        db.execute(insert(segments), rows)
+
+def replace_transcript_segments(db: Session, analytics_id: int, transcript: List[Dict[str, Any]]) -> None:
+    """Swap an analytics row's transcript segments for a new set"""
+    replace_transcript_segment_sets(db, {analytics_id: transcript})
+
+def validation_error_message(error: ValidationError) -> str:
+    """Compact one-line summary of a record's validation errors"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()[:3]
+    )
+
+async def read_score_records(
+    request: Request,
+    content_type: str,
+    gzipped: bool
+) -> AsyncIterator[Tuple[int, Union[MLScoreRequest, str]]]:
+    """Stream-decode a bulk body into (line, record or error message) without buffering it whole"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    
+    async def chunks() -> AsyncIterator[bytes]:
+        async for chunk in request.stream():
+            if decompressor is not None:
+                try:
+                    chunk = decompressor.decompress(chunk)
+                except zlib.error:
+                    raise HTTPException(status_code=400, detail="Malformed gzip body")
+            if chunk:
+                yield chunk
+    
+    def parse(line: int, raw: Any) -> Tuple[int, Union[MLScoreRequest, str]]:
+        try:
+            if isinstance(raw, (bytes, bytearray)):
+                return line, MLScoreRequest.model_validate_json(raw)
+            return line, MLScoreRequest.model_validate(raw)
+        except ValidationError as e:
+            return line, validation_error_message(e)
+    
+    line = 0
+    if content_type in MSGPACK_CONTENT_TYPES:
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        async for chunk in chunks():
+            unpacker.feed(chunk)
+            try:
+                for raw in unpacker:
+                    line += 1
+                    yield parse(line, raw)
+            except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError):
+                raise HTTPException(status_code=400, detail=f"Malformed msgpack after record {line}")
+        return
+    
+    buffer = b""
+    async for chunk in chunks():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line += 1
+            if raw.strip():
+                yield parse(line, raw)
+    if buffer.strip():
+        yield parse(line + 1, buffer)
+
+def write_score_batch(db: Session, batch: List[Tuple[int, MLScoreRequest]]) -> List[BulkScoreResult]:
+    """Upsert one batch of ML results in a single transaction with a fixed number of statements"""
+    # Later records for the same video win, as if the batch were applied one by one
+    latest: Dict[int, MLScoreRequest] = {}
+    for _, ml_data in batch:
+        latest[ml_data.video_id] = ml_data
+    
+    known_videos = set(db.scalars(select(Video.id).where(Video.id.in_(list(latest)))))
+    existing: Dict[int, int] = {}
+    for analytics_id, video_id in db.execute(
+        select(AnalyticsData.id, AnalyticsData.video_id)
+        .where(AnalyticsData.video_id.in_(list(known_videos)))
+        .order_by(AnalyticsData.id)
+    ):
+        existing.setdefault(video_id, analytics_id)
+    
+    analytics_table = AnalyticsData.__table__
+    values = {video_id: score_result_values(latest[video_id]) for video_id in known_videos}
+    updates = [
+        {"b_id": existing[video_id], **values[video_id]}
+        for video_id in known_videos if video_id in existing
+    ]
+    inserts = [
+        {"video_id": video_id, **values[video_id]}
+        for video_id in known_videos if video_id not in existing
+    ]
+    if updates:
+        db.execute(
+            update(analytics_table)
+            .where(analytics_table.c.id == bindparam("b_id"))
+            .values({column: bindparam(column) for column in updates[0] if column != "b_id"}),
+            updates
+        )
+    if inserts:
+        for analytics_id, video_id in db.execute(
+            insert(analytics_table).returning(analytics_table.c.id, analytics_table.c.video_id),
+            inserts
+        ):
+            existing[video_id] = analytics_id
+    
+    if known_videos:
+        replace_transcript_segment_sets(
+            db, {existing[video_id]: values[video_id]["transcript"] for video_id in known_videos}
+        )
+        db.execute(
+            update(Video)
+            .where(Video.id.in_(list(known_videos)))
+            .values(is_processed=True, processing_status="completed")
+        )
+    db.commit()
+    publish_video_statuses(db, list(known_videos))
+    
+    return [
+        BulkScoreResult(line=line, video_id=ml_data.video_id, status="ok", analytics_id=existing[ml_data.video_id])
+        if ml_data.video_id in known_videos
+        else BulkScoreResult(line=line, video_id=ml_data.video_id, status="error", error="Video not found")
+        for line, ml_data in batch
+    ]
+
+def fetch_video_statuses(db: Session, video_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Processing status of many videos in one query (scalar columns only, never the analytics JSON)"""
+    statuses: Dict[int, Dict[str, Any]] = {}
+    rows = db.execute(
+        select(Video.id, Video.processing_status, Video.is_processed, AnalyticsData.id, AnalyticsData.processing_version)
+        .outerjoin(AnalyticsData, AnalyticsData.video_id == Video.id)
+        .where(Video.id.in_(video_ids))
+        .order_by(AnalyticsData.id)
+    )
+    for video_id, processing_status, is_processed, analytics_id, processing_version in rows:
+        statuses.setdefault(video_id, {
+            "video_id": video_id,
+            "processing_status": processing_status,
+            "is_processed": is_processed,
+            "has_analytics": analytics_id is not None,
+            "processing_version": processing_version
+        })
+    return statuses
+
+# Started with the app: publishes changes committed by ml-worker processes
+status_poller = StatusPoller(status_broker, fetch_video_statuses)
+
+def publish_video_statuses(db: Session, video_ids: List[int]) -> None:
+    """Push committed status changes to stream subscribers (no query when nobody is listening)"""
+    if not status_broker.has_subscribers(video_ids):
+        return
+    for video_id, status in fetch_video_statuses(db, video_ids).items():
+        status_broker.publish(video_id, status)
+
+def format_sse(event: str, data: Dict[str, Any], event_id: int) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), dumps(data))
+
+def format_job_response(job: ProcessingJob, storage_key: Optional[str] = None) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        video_id=job.video_id,
+        status=job.status,
+        priority=job.priority,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        run_after=job.run_after,
+        lease_expires_at=job.lease_expires_at,
+        last_error=job.last_error,
+        storage_key=storage_key
+    )
+
 # Routes
 @router.post("/score-results", response_model=MLScoreResponse)
 async def submit_ml_results(
     ml_data: MLScoreRequest,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Accept ML processing results and store in database"""
     try:
-        # Verify video exists
-        video = db.query(Video).filter(Video.id == ml_data.video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
-        
-        # Convert transcript segments to JSON format
-        transcript_json = [
-            {
-                "text": segment.text,
-                "start_time": segment.start_time,
-                "end_time": segment.end_time,
-                "funniness_score": segment.funniness_score
-            }
-            for segment in ml_data.transcript
-        ]
-        
-        # Convert laughter events to JSON format
-        laughter_json = None
-        if ml_data.laughter_timestamps:
-            laughter_json = [
-                {
-                    "timestamp": event.timestamp,
-                    "duration": event.duration,
-                    "intensity": event.intensity
-                }
-                for event in ml_data.laughter_timestamps
-            ]
-        
-        # Create full transcript text
-        full_transcript = " ".join([segment.text for segment in ml_data.transcript])
-        
-        # Check if analytics record already exists
-        existing_analytics = db.query(AnalyticsData).filter(
-            AnalyticsData.video_id == ml_data.video_id
-        ).first()
-        
-        if existing_analytics:
-            # Update existing record
-            existing_analytics.transcript = transcript_json
-            existing_analytics.full_transcript_text = full_transcript
-            existing_analytics.overall_funniness_score = ml_data.overall_funniness_score
-            existing_analytics.laughter_timestamps = laughter_json
-            existing_analytics.processing_version = ml_data.processing_version
-            existing_analytics.confidence_score = ml_data.confidence_score
-            existing_analytics.processing_duration = ml_data.processing_duration
-            existing_analytics.word_count = ml_data.word_count
-            existing_analytics.speaking_rate = ml_data.speaking_rate
-            analytics = existing_analytics
-        else:
-            # Create new analytics record
-            analytics = AnalyticsData(
+        def _submit_ml_results(db: Session) -> MLScoreResponse:
+            # Verify video exists
+            video = db.query(Video).filter(Video.id == ml_data.video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            values = score_result_values(ml_data)
+            
+            # Check if analytics record already exists
+            existing_analytics = db.query(AnalyticsData).filter(
+                AnalyticsData.video_id == ml_data.video_id
+            ).first()
+            
+            if existing_analytics:
+                # Update existing record
+                for column, value in values.items():
+                    setattr(existing_analytics, column, value)
+                analytics = existing_analytics
+            else:
+                # Create new analytics record
+                analytics = AnalyticsData(video_id=ml_data.video_id, **values)
+                db.add(analytics)
+            
+            # Replace the queryable transcript segments with one bulk insert
+            db.flush()
+            replace_transcript_segments(db, analytics.id, values["transcript"])
+            
+            # Update video processing status
+            video.is_processed = True
+            video.processing_status = "completed"
+            
+            db.commit()
+            db.refresh(analytics)
+            publish_video_statuses(db, [ml_data.video_id])
+            
+            return MLScoreResponse(
+                message="ML results processed successfully",
                 video_id=ml_data.video_id,
-                transcript=transcript_json,
-                full_transcript_text=full_transcript,
-                overall_funniness_score=ml_data.overall_funniness_score,
-                laughter_timestamps=laughter_json,
-                processing_version=ml_data.processing_version,
-                confidence_score=ml_data.confidence_score,
-                processing_duration=ml_data.processing_duration,
-                word_count=ml_data.word_count,
-                speaking_rate=ml_data.speaking_rate
+                analytics_id=analytics.id
             )
-            db.add(analytics)
-        
-        # Update video processing status
-        video.is_processed = True
-        video.processing_status = "completed"
         
-        db.commit()
-        db.refresh(analytics)
-        
-        return MLScoreResponse(
-            message="ML results processed successfully",
-            video_id=ml_data.video_id,
-            analytics_id=analytics.id
-        )
+        return await run_db(db, _submit_ml_results)
         
     except HTTPException:
         raise
@@ -135,61 +395,226 @@ async def submit_ml_results(
         logger.error(f"Error processing ML results: {e}")
         raise HTTPException(status_code=500, detail="Failed to process ML results")
 
+@router.post("/score-results/bulk", response_model=BulkScoreResponse)
+async def submit_ml_results_bulk(
+    request: Request,
+    db: DBSession = Depends(get_db)
+):
+    """Accept many ML results as streamed NDJSON or msgpack (optionally gzip) and upsert them in batches.
+
+    Each batch of ML_BULK_BATCH_SIZE records is committed on its own, and upserts are
+    idempotent, so a failed request can simply be resent.
+    """
+    content_type = request.headers.get("content-type", "application/x-ndjson").split(";")[0].strip().lower()
+    content_encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if content_type not in NDJSON_CONTENT_TYPES | MSGPACK_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or application/msgpack")
+    if content_encoding not in ("identity", "gzip"):
+        raise HTTPException(status_code=415, detail="Only gzip content encoding is supported")
+    
+    results: List[BulkScoreResult] = []
+    batch: List[Tuple[int, MLScoreRequest]] = []
+    
+    async def flush_batch() -> None:
+        try:
+            results.extend(await run_db(db, write_score_batch, batch))
+        except Exception as e:
+            logger.error(f"Error writing ML results batch: {e}")
+            if isinstance(db, Session):
+                db.rollback()
+            else:
+                await db.rollback()
+            results.extend(
+                BulkScoreResult(line=line, video_id=ml_data.video_id, status="error", error="Failed to store result")
+                for line, ml_data in batch
+            )
+        batch.clear()
+    
+    try:
+        async for line, record in read_score_records(request, content_type, content_encoding == "gzip"):
+            if isinstance(record, str):
+                results.append(BulkScoreResult(line=line, status="error", error=record))
+                continue
+            batch.append((line, record))
+            if len(batch) >= ML_BULK_BATCH_SIZE:
+                await flush_batch()
+        if batch:
+            await flush_batch()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading bulk ML results: {e}")
+        raise HTTPException(status_code=500, detail="Failed to process ML results")
+    
+    results.sort(key=lambda result: result.line)
+    failed = sum(1 for result in results if result.status != "ok")
+    return BulkScoreResponse(processed=len(results) - failed, failed=failed, results=results)
+
 @router.post("/processing-status")
 async def update_processing_status(
     status_update: VideoProcessingStatusUpdate,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Update video processing status"""
     try:
-        video = db.query(Video).filter(Video.id == status_update.video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
+        def _update_processing_status(db: Session) -> Dict[str, Any]:
+            video = db.query(Video).filter(Video.id == status_update.video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            video.processing_status = status_update.status
+            
+            if status_update.status == "processing":
+                video.is_processed = False
+            elif status_update.status == "completed":
+                video.is_processed = True
+            elif status_update.status == "failed":
+                video.is_processed = False
+                # Could store error message in a separate field if needed
+            
+            db.commit()
+            publish_video_statuses(db, [status_update.video_id])
+            
+            return {
+                "message": "Processing status updated successfully",
+                "video_id": status_update.video_id,
+                "status": status_update.status
+            }
         
-        video.processing_status = status_update.status
+        return await run_db(db, _update_processing_status)
         
-        if status_update.status == "processing":
-            video.is_processed = False
-        elif status_update.status == "completed":
-            video.is_processed = True
-        elif status_update.status == "failed":
-            video.is_processed = False
-            # Could store error message in a separate field if needed
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating processing status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update processing status")
+
+@router.post("/jobs", response_model=JobResponse)
+async def enqueue_processing_job(
+    job_request: EnqueueJobRequest,
+    db: DBSession = Depends(get_db)
+):
+    """Queue (re)processing of a video; a video has at most one active job"""
+    try:
+        def _enqueue_processing_job(db: Session) -> JobResponse:
+            if db.get(Video, job_request.video_id) is None:
+                raise HTTPException(status_code=404, detail="Video not found")
+            job = enqueue_job(db, job_request.video_id, priority=job_request.priority)
+            db.commit()
+            return format_job_response(job)
         
-        db.commit()
+        return await run_db(db, _enqueue_processing_job)
         
-        return {
-            "message": "Processing status updated successfully",
-            "video_id": status_update.video_id,
-            "status": status_update.status
-        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error enqueueing processing job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to enqueue processing job")
+
+@router.post("/jobs/lease", response_model=LeaseJobsResponse)
+async def lease_processing_jobs(
+    lease_request: LeaseJobsRequest,
+    db: DBSession = Depends(get_db)
+):
+    """Lease ready jobs to a worker, highest priority first (an empty list means nothing is ready)"""
+    try:
+        def _lease_processing_jobs(db: Session) -> LeaseJobsResponse:
+            failed_video_ids = fail_expired_leases(db)
+            jobs = lease_jobs(db, lease_request.worker_id, lease_request.limit, lease_request.lease_seconds, fail_expired=False)
+            publish_video_statuses(db, failed_video_ids + [job.video_id for job in jobs])
+            storage_keys = dict(db.execute(
+                select(Video.id, Video.storage_key).where(Video.id.in_([job.video_id for job in jobs]))
+            ).all()) if jobs else {}
+            return LeaseJobsResponse(jobs=[format_job_response(job, storage_keys.get(job.video_id)) for job in jobs])
+        
+        return await run_db(db, _lease_processing_jobs)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error updating processing status: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update processing status")
+        logger.error(f"Error leasing processing jobs: {e}")
+        raise HTTPException(status_code=500, detail="Failed to lease processing jobs")
+
+@router.post("/jobs/{job_id}/heartbeat")
+async def heartbeat_processing_job(
+    job_id: int,
+    worker_request: WorkerRequest,
+    db: DBSession = Depends(get_db)
+):
+    """Extend a job lease; 409 means the lease was lost and the worker should stop"""
+    try:
+        def _heartbeat_processing_job(db: Session) -> Dict[str, Any]:
+            expires_at = heartbeat_job(db, job_id, worker_request.worker_id, worker_request.lease_seconds)
+            if expires_at is None:
+                raise HTTPException(status_code=409, detail="Job is not leased to this worker")
+            return {"job_id": job_id, "lease_expires_at": expires_at}
+        
+        return await run_db(db, _heartbeat_processing_job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error extending job lease: {e}")
+        raise HTTPException(status_code=500, detail="Failed to extend job lease")
+
+@router.post("/jobs/{job_id}/complete")
+async def complete_processing_job(
+    job_id: int,
+    worker_request: WorkerRequest,
+    db: DBSession = Depends(get_db)
+):
+    """Mark a leased job done (after its results were posted to /score-results)"""
+    try:
+        def _complete_processing_job(db: Session) -> Dict[str, Any]:
+            if not complete_job(db, job_id, worker_request.worker_id):
+                raise HTTPException(status_code=409, detail="Job is not leased to this worker")
+            return {"job_id": job_id, "status": "completed"}
+        
+        return await run_db(db, _complete_processing_job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error completing job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to complete job")
+
+@router.post("/jobs/{job_id}/fail", response_model=JobResponse)
+async def fail_processing_job(
+    job_id: int,
+    fail_request: FailJobRequest,
+    db: DBSession = Depends(get_db)
+):
+    """Report a failed attempt; the job is retried with exponential backoff until max_attempts"""
+    try:
+        def _fail_processing_job(db: Session) -> JobResponse:
+            job = fail_job(db, job_id, fail_request.worker_id, fail_request.error, fail_request.retry)
+            if job is None:
+                raise HTTPException(status_code=409, detail="Job is not leased to this worker")
+            publish_video_statuses(db, [job.video_id])
+            return format_job_response(job)
+        
+        return await run_db(db, _fail_processing_job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error failing job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to record job failure")
 
 @router.get("/video/{video_id}/status")
 async def get_processing_status(
     video_id: int,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get current processing status of a video"""
     try:
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
-        
-        analytics = db.query(AnalyticsData).filter(AnalyticsData.video_id == video_id).first()
+        def _get_processing_status(db: Session) -> Dict[str, Any]:
+            status = fetch_video_statuses(db, [video_id]).get(video_id)
+            if not status:
+                raise HTTPException(status_code=404, detail="Video not found")
+            return status
         
-        return {
-            "video_id": video_id,
-            "processing_status": video.processing_status,
-            "is_processed": video.is_processed,
-            "has_analytics": analytics is not None,
-            "processing_version": analytics.processing_version if analytics else None
-        }
+        return await run_db(db, _get_processing_status)
         
     except HTTPException:
         raise
@@ -197,6 +622,82 @@ async def get_processing_status(
         logger.error(f"Error getting processing status: {e}")
         raise HTTPException(status_code=500, detail="Failed to get processing status")
 
+@router.get("/status/stream")
+async def stream_processing_status(
+    request: Request,
+    video_ids: str = Query(..., description="Comma-separated video IDs to follow"),
+    until_done: bool = Query(True, description="Close the stream once every video is completed or failed"),
+    db: DBSession = Depends(get_db)
+):
+    """Server-Sent Events stream of processing status changes for one or more videos.
+
+    Sends a `status` event per video with its current state, then one whenever it
+    changes, instead of clients polling /video/{video_id}/status.
+    
+    Changes made in this process arrive through status_broker at once; those made by
+    ml-worker processes are published by status_poller within STATUS_POLL_SECONDS.
+    The stream itself never queries the database after the first snapshot.
+    """
+    try:
+        ids = sorted({int(part) for part in video_ids.split(",") if part.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="video_ids must be comma-separated integers")
+    if not ids or len(ids) > STATUS_STREAM_MAX_VIDEOS:
+        raise HTTPException(status_code=400, detail=f"Follow between 1 and {STATUS_STREAM_MAX_VIDEOS} videos")
+    
+    # Subscribe before the snapshot so no change between the two is missed
+    subscription = status_broker.subscribe(ids)
+    
+    def _snapshot(db: Session) -> Dict[int, Dict[str, Any]]:
+        statuses = fetch_video_statuses(db, ids)
+        # End the read transaction so an open stream doesn't pin a pooled connection
+        db.commit()
+        return statuses
+    
+    try:
+        statuses = await run_db(db, _snapshot)
+    except Exception as e:
+        status_broker.unsubscribe(subscription)
+        logger.error(f"Error reading processing status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get processing status")
+    missing = [video_id for video_id in ids if video_id not in statuses]
+    if missing:
+        status_broker.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail=f"Video not found: {missing[0]}")
+    
+    async def events():
+        event_id = 0
+        sent: Dict[int, Dict[str, Any]] = {}
+        try:
+            pending = list(statuses.values())
+            while True:
+                for status in pending:
+                    if sent.get(status["video_id"]) == status:
+                        continue
+                    event_id += 1
+                    sent[status["video_id"]] = status
+                    yield format_sse("status", status, event_id)
+                if until_done and all(status["processing_status"] in TERMINAL_STATUSES for status in sent.values()):
+                    return
+                pending = await subscription.next_events(timeout=SSE_KEEPALIVE_SECONDS)
+                if not pending:
+                    if await request.is_disconnected():
+                        return
+                    yield b": keepalive\n\n"
+        finally:
+            status_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # GZipMiddleware would buffer the stream; an explicit encoding makes it pass through
+            "Content-Encoding": "identity"
+        }
+    )
+
 # Health check endpoint
 @router.get("/health")
 async def ml_health():
@@ -206,8 +707,15 @@ async def ml_health():
         "service": "ml_processing",
         "routes": [
             "/score-results",
+            "/score-results/bulk",
             "/processing-status", 
+            "/jobs",
+            "/jobs/lease",
+            "/jobs/{job_id}/heartbeat",
+            "/jobs/{job_id}/complete",
+            "/jobs/{job_id}/fail",
             "/video/{video_id}/status",
+            "/status/stream",
             "/health"
         ]
     } 
\ No newline at end of file
@@ -0,0 +1,194 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any, Tuple, Union
+import re
+import logging
+
+from config.database import get_db, run_db, DBSession
+from config.fast_json import FastJSONResponse
+from routes.auth import verify_token_dependency
+from models.models import User, Video
+from models.search import NAME_TS_CONFIG, POSTGRES_NAME_DOCUMENT, VIDEO_TS_CONFIG
+from routes.videos import VideoResponse, format_video_responses, get_liked_video_ids, resolve_user, with_video_authors
+from routes.users import PublicUserProfileResponse, format_user_profile
+
+# Configure logging
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Longer queries are cut to this many terms
+MAX_SEARCH_TERMS = 8
+
+# Matched terms in snippets are wrapped in these; the rest of the snippet is unescaped text
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+
+# bm25 column weights (title, description, performer, transcript; stage_name, display_name)
+VIDEO_COLUMN_WEIGHTS = (10.0, 2.0, 5.0, 1.0)
+COMEDIAN_COLUMN_WEIGHTS = (2.0, 1.0)
+
+# Pydantic models
+class VideoSearchResult(VideoResponse):
+    snippet: Optional[str] = None
+
+class SearchResponse(BaseModel):
+    type: str
+    results: List[Union[VideoSearchResult, PublicUserProfileResponse]]
+    cursor: Optional[str] = None
+    has_more: bool
+
+# Helper functions
+def search_terms(q: str) -> List[str]:
+    """Split a query into plain word terms, so user input can never be parsed as query syntax"""
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+def match_expression(terms: List[str], dialect: str) -> str:
+    """All terms must match; the last one as a prefix, for search-as-you-type"""
+    if dialect == "sqlite":
+        return " ".join(f'"{term}"' for term in terms) + "*"
+    return " & ".join(terms) + ":*"
+
+def parse_search_cursor(cursor: str) -> Tuple[float, int]:
+    """Parse a "score_id" search cursor"""
+    try:
+        score, row_id = cursor.rsplit("_", 1)
+        return float(score), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor format")
+
+def ranked_page(db: Session, ranked_sql: str, params: Dict[str, Any], cursor: Optional[str], limit: int) -> List[Tuple[int, float]]:
+    """Keyset-paginate a ranked match query by (score, id), lower scores first.
+    
+    ranked_sql selects (id, score) for every match; scores are computed once per
+    query and ties broken by id, so pages never overlap.
+    """
+    sql = f"SELECT id, score FROM ({ranked_sql}) AS ranked"
+    if cursor:
+        params["after_score"], params["after_id"] = parse_search_cursor(cursor)
+        sql += " WHERE score > :after_score OR (score = :after_score AND id > :after_id)"
+    sql += " ORDER BY score, id LIMIT :limit"
+    params["limit"] = limit
+    return [(row.id, row.score) for row in db.execute(text(sql), params)]
+
+def search_video_ids(db: Session, terms: List[str], cursor: Optional[str], limit: int) -> List[Tuple[int, float]]:
+    """Public videos matching all terms, best first"""
+    dialect = db.get_bind().dialect.name
+    query = match_expression(terms, dialect)
+    if dialect == "sqlite":
+        weights = ", ".join(str(weight) for weight in VIDEO_COLUMN_WEIGHTS)
+        ranked_sql = (
+            f"SELECT video_search.rowid AS id, bm25(video_search, {weights}) AS score "
+            "FROM video_search JOIN videos ON videos.id = video_search.rowid "
+            "WHERE video_search MATCH :query AND videos.is_public"
+        )
+    else:
+        ranked_sql = (
+            f"SELECT s.video_id AS id, -ts_rank(s.document, to_tsquery('{VIDEO_TS_CONFIG}', :query)) AS score "
+            "FROM video_search s JOIN videos ON videos.id = s.video_id "
+            f"WHERE s.document @@ to_tsquery('{VIDEO_TS_CONFIG}', :query) AND videos.is_public"
+        )
+    return ranked_page(db, ranked_sql, {"query": query}, cursor, limit)
+
+def search_comedian_ids(db: Session, terms: List[str], cursor: Optional[str], limit: int) -> List[Tuple[int, float]]:
+    """Active comedians (or anyone who has posted) whose stage or display name matches all terms"""
+    dialect = db.get_bind().dialect.name
+    query = match_expression(terms, dialect)
+    if dialect == "sqlite":
+        weights = ", ".join(str(weight) for weight in COMEDIAN_COLUMN_WEIGHTS)
+        ranked_sql = (
+            f"SELECT comedian_search.rowid AS id, bm25(comedian_search, {weights}) AS score "
+            "FROM comedian_search JOIN users ON users.id = comedian_search.rowid "
+            "WHERE comedian_search MATCH :query"
+        )
+    else:
+        ranked_sql = (
+            f"SELECT users.id AS id, -ts_rank({POSTGRES_NAME_DOCUMENT}, to_tsquery('{NAME_TS_CONFIG}', :query)) AS score "
+            f"FROM users WHERE {POSTGRES_NAME_DOCUMENT} @@ to_tsquery('{NAME_TS_CONFIG}', :query)"
+        )
+    ranked_sql += " AND users.is_active AND (users.is_comedian OR users.video_count > 0)"
+    return ranked_page(db, ranked_sql, {"query": query}, cursor, limit)
+
+def video_snippets(db: Session, terms: List[str], video_ids: List[int]) -> Dict[int, str]:
+    """A highlighted excerpt of the best-matching field for each video on the page"""
+    if not video_ids:
+        return {}
+    dialect = db.get_bind().dialect.name
+    query = match_expression(terms, dialect)
+    if dialect == "sqlite":
+        sql = text(
+            f"SELECT rowid AS id, snippet(video_search, -1, '{SNIPPET_START}', '{SNIPPET_END}', '…', 16) AS snippet "
+            "FROM video_search WHERE video_search MATCH :query AND rowid IN :ids"
+        )
+    else:
+        sql = text(
+            f"SELECT videos.id, ts_headline('{VIDEO_TS_CONFIG}', concat_ws(' ', videos.title, videos.description, "
+            "(SELECT a.full_transcript_text FROM analytics_data a WHERE a.video_id = videos.id ORDER BY a.id DESC LIMIT 1)), "
+            f"to_tsquery('{VIDEO_TS_CONFIG}', :query), "
+            f"'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxFragments=1, MaxWords=16, MinWords=6') AS snippet "
+            "FROM videos WHERE videos.id IN :ids"
+        )
+    rows = db.execute(sql.bindparams(bindparam("ids", expanding=True)), {"query": query, "ids": video_ids})
+    return {row.id: row.snippet for row in rows}
+
+# Routes
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    type: str = Query("videos", pattern="^(videos|comedians)$", description="What to search: videos or comedians"),
+    cursor: Optional[str] = Query(None, description="Pagination cursor"),
+    limit: int = Query(20, ge=1, le=50, description="Number of results to return"),
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Ranked full-text search over videos (titles, descriptions, comedians, transcripts) or comedians"""
+    try:
+        def _search(db: Session) -> FastJSONResponse:
+            user = resolve_user(db, firebase_user)
+            terms = search_terms(q)
+            if not terms:
+                return FastJSONResponse({"type": type, "results": [], "cursor": None, "has_more": False})
+            
+            # Fetch one extra to check if there are more results
+            if type == "comedians":
+                ranked = search_comedian_ids(db, terms, cursor, limit + 1)
+            else:
+                ranked = search_video_ids(db, terms, cursor, limit + 1)
+            
+            has_more = len(ranked) > limit
+            ranked = ranked[:limit]
+            ids = [row_id for row_id, _ in ranked]
+            
+            if type == "comedians":
+                users = {row.id: row for row in db.query(User).filter(User.id.in_(ids)).all()}
+                results = [format_user_profile(users[row_id]) for row_id in ids if row_id in users]
+            else:
+                videos = {video.id: video for video in with_video_authors(db.query(Video).filter(Video.id.in_(ids))).all()}
+                page = [videos[row_id] for row_id in ids if row_id in videos]
+                liked_ids = get_liked_video_ids(db, user.id, ids)
+                snippets = video_snippets(db, terms, ids)
+                results = format_video_responses(page, liked_ids)
+                for result in results:
+                    result["snippet"] = snippets.get(result["id"])
+            
+            # Generate next cursor
+            next_cursor = None
+            if has_more and ranked:
+                last_id, last_score = ranked[-1]
+                next_cursor = f"{last_score!r}_{last_id}"
+            
+            return FastJSONResponse({
+                "type": type,
+                "results": results,
+                "cursor": next_cursor,
+                "has_more": has_more
+            })
+        
+        return await run_db(db, _search)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search")
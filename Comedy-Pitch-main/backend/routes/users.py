@@ -1,14 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
+from datetime import datetime
 import json
 import logging
 
-from config.database import get_db
+from config.database import get_db, run_db, DBSession
+from config.fast_json import FastJSONResponse
+from config.http_cache import body_etag, etag_matches, not_modified, set_cache_headers
+from config.user_cache import user_cache
 from routes.auth import verify_token_dependency
-from models.models import User, Video
-from routes.videos import get_or_create_user
+from models.models import User, Video, AnalyticsData
+from routes.videos import get_or_create_user, resolve_user, resolve_user_async
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -58,13 +62,24 @@ class PublicUserProfileResponse(BaseModel):
     video_count: int
     total_likes: int
 
+class SetScoreSummary(BaseModel):
+    video_id: int
+    title: str
+    posted_at: datetime
+    overall_funniness_score: Optional[float]
+    confidence_score: Optional[float]
+    word_count: Optional[int]
+    speaking_rate: Optional[float]
+    processing_version: Optional[str]
+
+class AnalyticsSummaryResponse(BaseModel):
+    sets: List[SetScoreSummary]
+    count: int
+    average_funniness_score: Optional[float]
+
 # Helper functions
 def format_user_profile(user: User, include_private: bool = False) -> Dict[str, Any]:
     """Format user profile for API response"""
-    # Calculate video count and total likes
-    video_count = len(user.videos) if user.videos else 0
-    total_likes = sum(video.like_count for video in user.videos) if user.videos else 0
-    
     # Parse social links JSON
     social_links = None
     if user.social_links:
@@ -82,8 +97,9 @@ def format_user_profile(user: User, include_private: bool = False) -> Dict[str,
         "location": user.location,
         "website": user.website,
         "social_links": social_links,
-        "video_count": video_count,
-        "total_likes": total_likes
+        # Denormalized on the user row, no need to load the videos
+        "video_count": user.video_count or 0,
+        "total_likes": user.total_likes or 0
     }
     
     if include_private:
@@ -100,14 +116,24 @@ def format_user_profile(user: User, include_private: bool = False) -> Dict[str,
 # Routes
 @router.get("/me", response_model=UserProfileResponse)
 async def get_my_profile(
+    if_none_match: Optional[str] = Header(None),
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get own profile information"""
     try:
-        user = get_or_create_user(db, firebase_user)
-        profile_data = format_user_profile(user, include_private=True)
-        return UserProfileResponse(**profile_data)
+        def _get_my_profile(db: Session) -> Dict[str, Any]:
+            user = get_or_create_user(db, firebase_user)
+            return format_user_profile(user, include_private=True)
+        
+        response = FastJSONResponse(await run_db(db, _get_my_profile))
+        
+        # Profile stats change without touching updated_at, so validate on the body
+        etag = body_etag(response.body)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+        return response
         
     except Exception as e:
         logger.error(f"Error getting user profile: {e}")
@@ -117,39 +143,43 @@ async def get_my_profile(
 async def update_my_profile(
     profile_update: UserProfileUpdate,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Update own profile information"""
     try:
-        user = get_or_create_user(db, firebase_user)
-        
-        # Update fields if provided
-        if profile_update.display_name is not None:
-            user.display_name = profile_update.display_name
-        
-        if profile_update.bio is not None:
-            user.bio = profile_update.bio
-        
-        if profile_update.is_comedian is not None:
-            user.is_comedian = profile_update.is_comedian
-        
-        if profile_update.stage_name is not None:
-            user.stage_name = profile_update.stage_name
+        def _update_my_profile(db: Session) -> UserProfileResponse:
+            user = get_or_create_user(db, firebase_user)
+            
+            # Update fields if provided
+            if profile_update.display_name is not None:
+                user.display_name = profile_update.display_name
+            
+            if profile_update.bio is not None:
+                user.bio = profile_update.bio
+            
+            if profile_update.is_comedian is not None:
+                user.is_comedian = profile_update.is_comedian
+            
+            if profile_update.stage_name is not None:
+                user.stage_name = profile_update.stage_name
+            
+            if profile_update.location is not None:
+                user.location = profile_update.location
+            
+            if profile_update.website is not None:
+                user.website = profile_update.website
+            
+            if profile_update.social_links is not None:
+                user.social_links = json.dumps(profile_update.social_links)
+            
+            db.commit()
+            db.refresh(user)
+            user_cache.invalidate(user.firebase_uid)
+            
+            profile_data = format_user_profile(user, include_private=True)
+            return UserProfileResponse(**profile_data)
         
-        if profile_update.location is not None:
-            user.location = profile_update.location
-        
-        if profile_update.website is not None:
-            user.website = profile_update.website
-        
-        if profile_update.social_links is not None:
-            user.social_links = json.dumps(profile_update.social_links)
-        
-        db.commit()
-        db.refresh(user)
-        
-        profile_data = format_user_profile(user, include_private=True)
-        return UserProfileResponse(**profile_data)
+        return await run_db(db, _update_my_profile)
         
     except Exception as e:
         logger.error(f"Error updating user profile: {e}")
@@ -159,11 +189,11 @@ async def update_my_profile(
 async def update_my_settings(
     settings_update: UserSettingsUpdate,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Update user settings and preferences"""
     try:
-        user = get_or_create_user(db, firebase_user)
+        user = await resolve_user_async(db, firebase_user)
         
         # For now, we'll store these as a JSON field or add columns later
         # This is a placeholder for user settings functionality
@@ -175,24 +205,89 @@ async def update_my_settings(
         logger.error(f"Error updating user settings: {e}")
         raise HTTPException(status_code=500, detail="Failed to update user settings")
 
+@router.get("/me/analytics/summary", response_model=AnalyticsSummaryResponse)
+async def get_my_analytics_summary(
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Overall scores for all of the current user's analysed sets"""
+    try:
+        def _get_my_analytics_summary(db: Session) -> AnalyticsSummaryResponse:
+            user = resolve_user(db, firebase_user)
+            
+            # One query over scalar columns, driven by the user feed index; the
+            # transcript and other JSON columns are never read
+            rows = db.query(
+                Video.id,
+                Video.title,
+                Video.posted_at,
+                AnalyticsData.overall_funniness_score,
+                AnalyticsData.confidence_score,
+                AnalyticsData.word_count,
+                AnalyticsData.speaking_rate,
+                AnalyticsData.processing_version
+            ).join(
+                AnalyticsData, AnalyticsData.video_id == Video.id
+            ).filter(
+                Video.user_id == user.id
+            ).order_by(Video.posted_at.desc(), Video.id.desc()).all()
+            
+            sets = [
+                SetScoreSummary(
+                    video_id=row.id,
+                    title=row.title,
+                    posted_at=row.posted_at,
+                    overall_funniness_score=row.overall_funniness_score,
+                    confidence_score=row.confidence_score,
+                    word_count=row.word_count,
+                    speaking_rate=row.speaking_rate,
+                    processing_version=row.processing_version
+                )
+                for row in rows
+            ]
+            scores = [summary.overall_funniness_score for summary in sets if summary.overall_funniness_score is not None]
+            
+            return AnalyticsSummaryResponse(
+                sets=sets,
+                count=len(sets),
+                average_funniness_score=sum(scores) / len(scores) if scores else None
+            )
+        
+        return await run_db(db, _get_my_analytics_summary)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting analytics summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get analytics summary")
+
 @router.get("/{user_id}", response_model=PublicUserProfileResponse)
 async def get_public_profile(
     user_id: int,
+    if_none_match: Optional[str] = Header(None),
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get public profile of another user"""
     try:
-        # Verify requesting user exists
-        requesting_user = get_or_create_user(db, firebase_user)
+        def _get_public_profile(db: Session) -> Dict[str, Any]:
+            # Verify requesting user exists
+            requesting_user = resolve_user(db, firebase_user)
+            
+            # Get target user
+            target_user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+            if not target_user:
+                raise HTTPException(status_code=404, detail="User not found")
+            
+            return format_user_profile(target_user, include_private=False)
         
-        # Get target user
-        target_user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
-        if not target_user:
-            raise HTTPException(status_code=404, detail="User not found")
+        response = FastJSONResponse(await run_db(db, _get_public_profile))
         
-        profile_data = format_user_profile(target_user, include_private=False)
-        return PublicUserProfileResponse(**profile_data)
+        etag = body_etag(response.body)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+        return response
         
     except HTTPException:
         raise
@@ -206,63 +301,54 @@ async def get_user_videos(
     limit: int = 20,
     cursor: Optional[str] = None,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get public videos from a specific user"""
     try:
-        # Verify requesting user exists
-        requesting_user = get_or_create_user(db, firebase_user)
-        
-        # Get target user
-        target_user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
-        if not target_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Get public videos from this user
-        from routes.videos import format_video_response
-        from datetime import datetime
-        
-        query = db.query(Video).filter(
-            Video.user_id == user_id,
-            Video.is_public == True
-        )
-        
-        # Apply cursor-based pagination if provided
-        if cursor:
-            try:
-                cursor_timestamp, cursor_id = cursor.split('_')
-                cursor_datetime = datetime.fromisoformat(cursor_timestamp.replace('Z', '+00:00'))
-                query = query.filter(
-                    (Video.posted_at < cursor_datetime) |
-                    ((Video.posted_at == cursor_datetime) & (Video.id < int(cursor_id)))
-                )
-            except (ValueError, IndexError):
-                raise HTTPException(status_code=400, detail="Invalid cursor format")
-        
-        # Order by posted_at descending
-        query = query.order_by(Video.posted_at.desc(), Video.id.desc())
-        
-        # Fetch one extra to check if there are more results
-        videos = query.limit(limit + 1).all()
-        
-        has_more = len(videos) > limit
-        if has_more:
-            videos = videos[:limit]
-        
-        # Generate next cursor
-        next_cursor = None
-        if has_more and videos:
-            last_video = videos[-1]
-            next_cursor = f"{last_video.posted_at.isoformat()}_{last_video.id}"
-        
-        video_responses = [format_video_response(video) for video in videos]
+        def _get_user_videos(db: Session) -> Dict[str, Any]:
+            # Verify requesting user exists
+            requesting_user = resolve_user(db, firebase_user)
+            
+            # Get target user
+            target_user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+            if not target_user:
+                raise HTTPException(status_code=404, detail="User not found")
+            
+            # Get public videos from this user
+            from routes.videos import apply_feed_cursor, format_video_responses, get_liked_video_ids, with_video_authors
+            
+            query = db.query(Video).filter(
+                Video.user_id == user_id,
+                Video.is_public == True
+            )
+            
+            # Apply cursor-based pagination, newest first
+            query = apply_feed_cursor(query, cursor)
+            
+            # Fetch one extra to check if there are more results
+            videos = with_video_authors(query).limit(limit + 1).all()
+            
+            has_more = len(videos) > limit
+            if has_more:
+                videos = videos[:limit]
+            
+            # Generate next cursor
+            next_cursor = None
+            if has_more and videos:
+                last_video = videos[-1]
+                next_cursor = f"{last_video.posted_at.isoformat()}_{last_video.id}"
+            
+            liked_ids = get_liked_video_ids(db, requesting_user.id, [video.id for video in videos])
+            video_responses = format_video_responses(videos, liked_ids)
+            
+            return FastJSONResponse({
+                "videos": video_responses,
+                "cursor": next_cursor,
+                "has_more": has_more,
+                "user": format_user_profile(target_user, include_private=False)
+            })
         
-        return {
-            "videos": video_responses,
-            "cursor": next_cursor,
-            "has_more": has_more,
-            "user": format_user_profile(target_user, include_private=False)
-        }
+        return await run_db(db, _get_user_videos)
         
     except HTTPException:
         raise
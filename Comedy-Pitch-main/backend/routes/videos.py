@@ -1,22 +1,56 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Header, Response
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple, Union
 from datetime import datetime
+import math
+import os
+import posixpath
+import re
 import uuid
 import logging
 
-from config.database import get_db
+from config.database import get_db, run_db, DBSession
+from config.fast_json import FastJSONResponse
 from config.firebase_config import verify_firebase_token
+from config.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from config.user_cache import UserIdentity, user_cache
+from config.view_counter import view_counter
 from routes.auth import verify_token_dependency
-from models.models import User, Video, AnalyticsData
-from storage.factory import get_storage
-from storage.base import UploadMetadata
+from models.models import User, Video, Like, AnalyticsData, TranscriptSegment
+from models.video import THUMBNAIL_DEFAULT_WIDTH, thumbnail_variant_key
+from models.job import ML_ANALYSIS_JOB, THUMBNAIL_JOB, TRANSCODE_JOB, UPLOAD_JOB_PRIORITY, enqueue_job
+from storage.factory import get_storage, run_storage
+from storage.base import (
+    MAX_PARTS,
+    MultipartUploadError,
+    StorageBackend,
+    UploadedPart,
+    UploadMetadata,
+    multipart_part_size
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Preferred multipart part size; grown for very large files to stay within 10,000 parts
+MULTIPART_PART_SIZE = int(os.getenv("MULTIPART_PART_SIZE", str(64 * 1024 ** 2)))
+
+# Part URLs are handed out in batches of at most this many
+MULTIPART_URL_BATCH = 100
+
+# Part URLs only need to be valid when each part's PUT starts
+MULTIPART_URL_EXPIRES = 3600
+
+# Segment URLs in served playlists must outlive a paused 60-minute set, not just its start
+HLS_SEGMENT_URL_TTL = int(os.getenv("HLS_SEGMENT_URL_TTL", str(6 * 3600)))
+
+# The master playlist or one rendition's playlist, relative to the master
+HLS_PLAYLIST_PATTERN = re.compile(r"(?:[A-Za-z0-9_-]+/)?[A-Za-z0-9_-]+\.m3u8")
+
 # Pydantic models for requests/responses
 class PresignedUploadRequest(BaseModel):
     filename: str = Field(..., description="Original filename")
@@ -29,6 +63,53 @@ class PresignedUploadResponse(BaseModel):
     expires_in: int
     fields: Optional[Dict[str, str]] = None
 
+class MultipartUploadRequest(BaseModel):
+    filename: str = Field(..., description="Original filename")
+    content_type: str = Field(..., description="MIME type of the file")
+    content_length: int = Field(..., gt=0, description="File size in bytes")
+
+class PartUploadUrl(BaseModel):
+    part_number: int
+    upload_url: str
+
+class MultipartUploadResponse(BaseModel):
+    upload_id: str
+    storage_key: str
+    part_size: int
+    part_count: int
+    expires_in: int
+    parts: List[PartUploadUrl]
+
+class PartUrlsRequest(BaseModel):
+    storage_key: str
+    part_numbers: List[int] = Field(..., min_length=1, max_length=MULTIPART_URL_BATCH)
+
+class PartUrlsResponse(BaseModel):
+    expires_in: int
+    parts: List[PartUploadUrl]
+
+class UploadedPartResponse(BaseModel):
+    part_number: int
+    etag: str
+    size: Optional[int] = None
+
+class UploadedPartsResponse(BaseModel):
+    parts: List[UploadedPartResponse]
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(..., ge=1, le=MAX_PARTS)
+    etag: str = Field(..., description="ETag header returned by the part upload")
+
+class CompleteMultipartRequest(BaseModel):
+    storage_key: str
+    parts: Optional[List[CompletedPart]] = Field(
+        None, max_length=MAX_PARTS, description="Parts to assemble; omit to use every uploaded part"
+    )
+
+class CompleteMultipartResponse(BaseModel):
+    storage_key: str
+    part_count: int
+
 class VideoCreateRequest(BaseModel):
     storage_key: str = Field(..., description="Storage key from presigned upload")
     title: str = Field(..., min_length=1, max_length=255)
@@ -49,6 +130,8 @@ class VideoResponse(BaseModel):
     file_type: str
     storage_url: Optional[str]
     thumbnail_url: Optional[str]
+    thumbnails: Optional[Dict[str, str]] = None  # Generated thumbnail URL by width
+    hls_url: Optional[str] = None
     is_public: bool
     view_count: int
     like_count: int
@@ -58,6 +141,7 @@ class VideoResponse(BaseModel):
     created_at: datetime
     posted_at: datetime
     user: Dict[str, Any]
+    liked_by_me: bool = False
 
 class VideoListResponse(BaseModel):
     videos: List[VideoResponse]
@@ -69,71 +153,289 @@ class AnalyticsResponse(BaseModel):
     overall_funniness_score: Optional[float] = None
     laughter_timestamps: Optional[List[Dict[str, Any]]] = None
     processing_status: str
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 # Helper functions
+def upsert_user(db: Session, firebase_user: Dict[str, Any]) -> User:
+    """Create a first-seen user in one statement, returning the existing row if another request won the race"""
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(User).values(
+        firebase_uid=firebase_user["uid"],
+        email=firebase_user.get("email", ""),
+        display_name=firebase_user.get("name"),
+        is_active=True
+    )
+    # A no-op update (rather than DO NOTHING) so RETURNING yields the row either way
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.firebase_uid],
+        set_={"firebase_uid": statement.excluded.firebase_uid}
+    ).returning(User)
+    user = db.scalars(statement, execution_options={"populate_existing": True}).one()
+    db.commit()
+    return user
+
 def get_or_create_user(db: Session, firebase_user: Dict[str, Any]) -> User:
     """Get or create user in database from Firebase user data"""
     user = db.query(User).filter(User.firebase_uid == firebase_user["uid"]).first()
     
     if not user:
-        user = User(
-            firebase_uid=firebase_user["uid"],
-            email=firebase_user.get("email", ""),
-            display_name=firebase_user.get("name"),
-            is_active=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = upsert_user(db, firebase_user)
     
+    user_cache.put(UserIdentity.from_user(user))
     return user
 
+async def get_or_create_user_async(db: DBSession, firebase_user: Dict[str, Any]) -> User:
+    """Async version of get_or_create_user that works with either session type"""
+    return await run_db(db, get_or_create_user, firebase_user)
+
+def resolve_user(db: Session, firebase_user: Dict[str, Any]) -> UserIdentity:
+    """Get the requesting user's identity, from the user cache when possible"""
+    identity = user_cache.get(firebase_user["uid"])
+    if identity is None:
+        identity = UserIdentity.from_user(get_or_create_user(db, firebase_user))
+    return identity
+
+async def resolve_user_async(db: DBSession, firebase_user: Dict[str, Any]) -> UserIdentity:
+    """Async version of resolve_user that only touches the session on a cache miss"""
+    identity = user_cache.get(firebase_user["uid"])
+    if identity is None:
+        identity = await run_db(db, resolve_user, firebase_user)
+    return identity
+
 def generate_storage_key(filename: str, user_id: int) -> str:
     """Generate a unique storage key for the file"""
     file_extension = filename.split('.')[-1] if '.' in filename else ''
     unique_id = str(uuid.uuid4())
     return f"videos/{user_id}/{unique_id}.{file_extension}"
 
-def format_video_response(video: Video) -> VideoResponse:
+def check_upload_key(storage_key: str, user_id: int) -> None:
+    """Multipart calls must name a key under the user's own upload prefix"""
+    if not storage_key.startswith(f"videos/{user_id}/"):
+        raise HTTPException(status_code=403, detail="Not authorized to access this upload")
+
+def part_urls(urls: Dict[int, str]) -> List[PartUploadUrl]:
+    """Part URLs in part number order"""
+    return [PartUploadUrl(part_number=number, upload_url=url) for number, url in sorted(urls.items())]
+
+def thumbnail_urls(video: Video, storage: StorageBackend) -> Optional[Dict[str, str]]:
+    """Generated thumbnail URLs by their real width, None until the thumbnail job has run"""
+    if not video.thumbnail_key or not video.thumbnail_widths:
+        return None
+    return {
+        str(width): storage.get_download_url(thumbnail_variant_key(video.thumbnail_key, width), private=not video.is_public)
+        for width in video.thumbnail_widths
+    }
+
+def default_thumbnail_width(widths: List[int]) -> int:
+    """The widest thumbnail up to THUMBNAIL_DEFAULT_WIDTH (the narrowest if all are wider)"""
+    return max((width for width in widths if width <= THUMBNAIL_DEFAULT_WIDTH), default=min(widths))
+
+def rewrite_playlist(playlist: str, playlist_key: str, segment_url: Callable[[str], str]) -> str:
+    """Point a playlist's segment lines at storage URLs; playlist references stay relative
+    so players come back through the API for them"""
+    directory = posixpath.dirname(playlist_key)
+    lines = []
+    for line in playlist.splitlines():
+        uri = line.strip()
+        if uri and not uri.startswith("#") and not uri.endswith(".m3u8"):
+            line = segment_url(posixpath.normpath(posixpath.join(directory, uri)))
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+def hls_segment_url(storage: StorageBackend, key: str, is_public: bool) -> str:
+    """Segment URL for a served playlist: the permanent public URL where there is one,
+    otherwise signed for HLS_SEGMENT_URL_TTL"""
+    if is_public and storage.public_url_ttl is None:
+        return storage.get_public_url(key)
+    return storage.generate_presigned_download_url(key, HLS_SEGMENT_URL_TTL)
+
+def format_video_author(user: User) -> Dict[str, Any]:
+    """Format the author summary embedded in video responses"""
+    return {
+        "id": user.id,
+        "display_name": user.display_name,
+        "stage_name": user.stage_name,
+        "is_comedian": user.is_comedian
+    }
+
+def get_liked_video_ids(db: Session, user_id: int, video_ids: List[int]) -> Set[int]:
+    """Which of the given videos a user has liked, in one query"""
+    if not video_ids:
+        return set()
+    rows = db.query(Like.video_id).filter(Like.user_id == user_id, Like.video_id.in_(video_ids)).all()
+    return {row.video_id for row in rows}
+
+def video_response_dict(
+    video: Video,
+    storage: StorageBackend,
+    author: Optional[Dict[str, Any]] = None,
+    liked_by_me: bool = False
+) -> Dict[str, Any]:
+    """VideoResponse fields for a trusted row, as a plain dict"""
+    thumbnails = thumbnail_urls(video, storage)
+    return {
+        "id": video.id,
+        "title": video.title,
+        "description": video.description,
+        "duration": video.duration,
+        "file_type": video.file_type,
+        "storage_url": storage.get_download_url(video.storage_key, private=not video.is_public) if video.storage_key else None,
+        "thumbnail_url": thumbnails[str(default_thumbnail_width(video.thumbnail_widths))] if thumbnails else video.thumbnail_url,
+        "thumbnails": thumbnails,
+        "hls_url": f"/api/videos/{video.id}/hls/master.m3u8" if video.hls_manifest_key else None,
+        "is_public": video.is_public,
+        "view_count": video.view_count,
+        "like_count": video.like_count,
+        "comment_count": video.comment_count,
+        "venue_name": video.venue_name,
+        "performance_date": video.performance_date,
+        "created_at": video.created_at,
+        "posted_at": video.posted_at,
+        "user": author or format_video_author(video.user),
+        "liked_by_me": liked_by_me
+    }
+
+def format_video_response(
+    video: Video,
+    storage: Optional[StorageBackend] = None,
+    author: Optional[Dict[str, Any]] = None,
+    liked_by_me: bool = False
+) -> VideoResponse:
     """Format video for API response"""
+    return VideoResponse(**video_response_dict(video, storage or get_storage(), author, liked_by_me))
+
+def format_video_responses(videos: List[Video], liked_ids: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+    """Format a page of eager-loaded videos, resolving storage and each author once.
+
+    Rows are trusted, so items skip Pydantic validation and go straight to
+    FastJSONResponse as dicts; in Pydantic 2 even model_construct costs more than a
+    validated build.
+    """
     storage = get_storage()
-    storage_url = storage.get_public_url(video.storage_key) if video.storage_key else None
+    liked_ids = liked_ids or set()
+    authors: Dict[int, Dict[str, Any]] = {}
+    responses = []
+    for video in videos:
+        if video.user_id not in authors:
+            authors[video.user_id] = format_video_author(video.user)
+        responses.append(video_response_dict(
+            video,
+            storage,
+            author=authors[video.user_id],
+            liked_by_me=video.id in liked_ids
+        ))
+    return responses
+
+def apply_feed_cursor(query, cursor: Optional[str]):
+    """Apply keyset pagination ordered by (posted_at DESC, id DESC).
+    
+    The cursor is compared as a row value so the planner can seek straight into
+    the composite (..., posted_at, id) feed indexes instead of sorting.
+    """
+    if cursor:
+        try:
+            # Cursor format: timestamp_id
+            cursor_timestamp, cursor_id = cursor.split('_')
+            cursor_datetime = datetime.fromisoformat(cursor_timestamp.replace('Z', '+00:00'))
+            cursor_id = int(cursor_id)
+        except (ValueError, IndexError):
+            raise HTTPException(status_code=400, detail="Invalid cursor format")
+        query = query.filter(tuple_(Video.posted_at, Video.id) < tuple_(cursor_datetime, cursor_id))
     
-    return VideoResponse(
-        id=video.id,
-        title=video.title,
-        description=video.description,
-        duration=video.duration,
-        file_type=video.file_type,
-        storage_url=storage_url,
-        thumbnail_url=video.thumbnail_url,
-        is_public=video.is_public,
-        view_count=video.view_count,
-        like_count=video.like_count,
-        comment_count=video.comment_count,
-        venue_name=video.venue_name,
-        performance_date=video.performance_date,
-        created_at=video.created_at,
-        posted_at=video.posted_at,
-        user={
-            "id": video.user.id,
-            "display_name": video.user.display_name,
-            "stage_name": video.user.stage_name,
-            "is_comedian": video.user.is_comedian
+    return query.order_by(Video.posted_at.desc(), Video.id.desc())
+
+def parse_segment_cursor(cursor: str) -> Tuple[float, int]:
+    """Parse a "start_time_position" transcript cursor"""
+    try:
+        start_time, position = cursor.rsplit("_", 1)
+        return float(start_time), int(position)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor format")
+
+def get_transcript_window(
+    db: Session,
+    analytics: AnalyticsData,
+    from_time: Optional[float] = None,
+    to_time: Optional[float] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """Segments starting in [from_time, to_time), in (start_time, position) order, returns (segments, next_cursor)"""
+    after = parse_segment_cursor(cursor) if cursor else None
+    
+    query = db.query(
+        TranscriptSegment.text,
+        TranscriptSegment.start_time,
+        TranscriptSegment.end_time,
+        TranscriptSegment.funniness_score,
+        TranscriptSegment.position
+    ).filter(TranscriptSegment.analytics_id == analytics.id)
+    if from_time is not None:
+        query = query.filter(TranscriptSegment.start_time >= from_time)
+    if to_time is not None:
+        query = query.filter(TranscriptSegment.start_time < to_time)
+    if after is not None:
+        query = query.filter(tuple_(TranscriptSegment.start_time, TranscriptSegment.position) > tuple_(*after))
+    query = query.order_by(TranscriptSegment.start_time, TranscriptSegment.position)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = [
+        {
+            "text": row.text,
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "funniness_score": row.funniness_score,
+            "position": row.position
         }
-    )
+        for row in query.all()
+    ]
+    
+    # Rows ingested before the segments table only have the JSON transcript
+    if not rows and not db.query(
+        db.query(TranscriptSegment.id).filter(TranscriptSegment.analytics_id == analytics.id).exists()
+    ).scalar():
+        if analytics.transcript is None:
+            return None, None
+        rows = sorted(
+            (
+                dict(segment, position=position)
+                for position, segment in enumerate(analytics.transcript)
+                if (from_time is None or segment["start_time"] >= from_time)
+                and (to_time is None or segment["start_time"] < to_time)
+                and (after is None or (segment["start_time"], position) > after)
+            ),
+            key=lambda segment: (segment["start_time"], segment["position"])
+        )
+        if limit is not None:
+            rows = rows[:limit + 1]
+    
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1]['start_time']}_{rows[-1]['position']}"
+    
+    return [
+        {key: value for key, value in segment.items() if key != "position"}
+        for segment in rows
+    ], next_cursor
+
+def with_video_authors(query):
+    """Eager-load video authors in the same round trip as the page"""
+    return query.options(joinedload(Video.user))
 
 # Routes
 @router.post("/uploads/presign", response_model=PresignedUploadResponse)
 async def get_presigned_upload_url(
     request: PresignedUploadRequest,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get presigned URL for video/audio upload"""
     try:
         # Get or create user
-        user = get_or_create_user(db, firebase_user)
+        user = await resolve_user_async(db, firebase_user)
         
         # Generate storage key
         storage_key = generate_storage_key(request.filename, user.id)
@@ -146,7 +448,8 @@ async def get_presigned_upload_url(
             content_length=request.content_length
         )
         
-        presigned_response = storage.generate_presigned_url(
+        presigned_response = await run_storage(
+            storage.generate_presigned_url,
             key=storage_key,
             metadata=metadata
         )
@@ -162,48 +465,228 @@ async def get_presigned_upload_url(
         logger.error(f"Error generating presigned URL: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate upload URL")
 
+@router.post("/uploads/multipart", response_model=MultipartUploadResponse)
+async def create_multipart_upload(
+    request: MultipartUploadRequest,
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Start a multipart upload for a long set; parts can then be PUT concurrently"""
+    try:
+        user = await resolve_user_async(db, firebase_user)
+        storage_key = generate_storage_key(request.filename, user.id)
+        part_size = multipart_part_size(request.content_length, MULTIPART_PART_SIZE)
+        part_count = math.ceil(request.content_length / part_size)
+        
+        storage = get_storage()
+        metadata = UploadMetadata(
+            filename=request.filename,
+            content_type=request.content_type,
+            content_length=request.content_length
+        )
+        upload_id = await run_storage(storage.create_multipart_upload, storage_key, metadata)
+        
+        # URLs for the first batch; clients fetch the rest as they go
+        urls = await run_storage(
+            storage.generate_presigned_part_urls,
+            storage_key,
+            upload_id,
+            list(range(1, min(part_count, MULTIPART_URL_BATCH) + 1)),
+            MULTIPART_URL_EXPIRES
+        )
+        
+        return MultipartUploadResponse(
+            upload_id=upload_id,
+            storage_key=storage_key,
+            part_size=part_size,
+            part_count=part_count,
+            expires_in=MULTIPART_URL_EXPIRES,
+            parts=part_urls(urls)
+        )
+    
+    except HTTPException:
+        raise
+    except NotImplementedError:
+        raise HTTPException(status_code=501, detail="Multipart uploads are not supported by this storage backend")
+    except Exception as e:
+        logger.error(f"Error starting multipart upload: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start multipart upload")
+
+@router.post("/uploads/multipart/{upload_id}/parts", response_model=PartUrlsResponse)
+async def get_part_upload_urls(
+    upload_id: str,
+    request: PartUrlsRequest,
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Get presigned URLs for more parts, or fresh ones to retry parts whose URLs expired"""
+    try:
+        user = await resolve_user_async(db, firebase_user)
+        check_upload_key(request.storage_key, user.id)
+        if any(number < 1 or number > MAX_PARTS for number in request.part_numbers):
+            raise HTTPException(status_code=400, detail=f"Part numbers must be between 1 and {MAX_PARTS}")
+        
+        urls = await run_storage(
+            get_storage().generate_presigned_part_urls,
+            request.storage_key,
+            upload_id,
+            sorted(set(request.part_numbers)),
+            MULTIPART_URL_EXPIRES
+        )
+        
+        return PartUrlsResponse(expires_in=MULTIPART_URL_EXPIRES, parts=part_urls(urls))
+    
+    except HTTPException:
+        raise
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except NotImplementedError:
+        raise HTTPException(status_code=501, detail="Multipart uploads are not supported by this storage backend")
+    except Exception as e:
+        logger.error(f"Error generating part URLs: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate part URLs")
+
+@router.get("/uploads/multipart/{upload_id}/parts", response_model=UploadedPartsResponse)
+async def list_uploaded_parts(
+    upload_id: str,
+    storage_key: str = Query(..., description="Storage key from the multipart upload"),
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """List the parts stored so far, so an interrupted upload can resume with the missing ones"""
+    try:
+        user = await resolve_user_async(db, firebase_user)
+        check_upload_key(storage_key, user.id)
+        
+        parts = await run_storage(get_storage().list_uploaded_parts, storage_key, upload_id)
+        
+        return UploadedPartsResponse(parts=[
+            UploadedPartResponse(part_number=part.part_number, etag=part.etag, size=part.size)
+            for part in parts
+        ])
+    
+    except HTTPException:
+        raise
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except NotImplementedError:
+        raise HTTPException(status_code=501, detail="Multipart uploads are not supported by this storage backend")
+    except Exception as e:
+        logger.error(f"Error listing uploaded parts: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list uploaded parts")
+
+@router.post("/uploads/multipart/{upload_id}/complete", response_model=CompleteMultipartResponse)
+async def complete_multipart_upload(
+    upload_id: str,
+    request: CompleteMultipartRequest,
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Assemble the uploaded parts; the storage key can then be passed to POST /api/videos/"""
+    try:
+        user = await resolve_user_async(db, firebase_user)
+        check_upload_key(request.storage_key, user.id)
+        storage = get_storage()
+        
+        if request.parts is not None:
+            parts = [UploadedPart(part_number=part.part_number, etag=part.etag.strip('"')) for part in request.parts]
+        else:
+            # Every stored part, which must run 1..N without gaps
+            parts = await run_storage(storage.list_uploaded_parts, request.storage_key, upload_id)
+            if [part.part_number for part in parts] != list(range(1, len(parts) + 1)):
+                raise HTTPException(status_code=400, detail="Uploaded parts are not contiguous from part 1")
+        if not parts:
+            raise HTTPException(status_code=400, detail="No parts to complete")
+        
+        # Can take a while: the local backend copies every byte
+        await run_storage(storage.complete_multipart_upload, request.storage_key, upload_id, parts)
+        
+        return CompleteMultipartResponse(storage_key=request.storage_key, part_count=len(parts))
+    
+    except HTTPException:
+        raise
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotImplementedError:
+        raise HTTPException(status_code=501, detail="Multipart uploads are not supported by this storage backend")
+    except Exception as e:
+        logger.error(f"Error completing multipart upload: {e}")
+        raise HTTPException(status_code=500, detail="Failed to complete multipart upload")
+
+@router.delete("/uploads/multipart/{upload_id}")
+async def abort_multipart_upload(
+    upload_id: str,
+    storage_key: str = Query(..., description="Storage key from the multipart upload"),
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Abandon a multipart upload and discard its stored parts"""
+    try:
+        user = await resolve_user_async(db, firebase_user)
+        check_upload_key(storage_key, user.id)
+        
+        if not await run_storage(get_storage().abort_multipart_upload, storage_key, upload_id):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        
+        return {"message": "Upload aborted"}
+    
+    except HTTPException:
+        raise
+    except NotImplementedError:
+        raise HTTPException(status_code=501, detail="Multipart uploads are not supported by this storage backend")
+    except Exception as e:
+        logger.error(f"Error aborting multipart upload: {e}")
+        raise HTTPException(status_code=500, detail="Failed to abort multipart upload")
+
 @router.post("/", response_model=VideoResponse)
 async def create_video(
     video_data: VideoCreateRequest,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Create video metadata after successful upload"""
     try:
         # Get or create user
-        user = get_or_create_user(db, firebase_user)
+        user = await resolve_user_async(db, firebase_user)
         
-        # Verify the file was uploaded by checking if it exists in storage
-        storage = get_storage()
-        if not storage.file_exists(video_data.storage_key):
+        # Verify the file was uploaded: one stat gives both existence and metadata
+        file_metadata = await run_storage(get_storage().get_file_metadata, video_data.storage_key)
+        if file_metadata is None:
             raise HTTPException(status_code=400, detail="File not found in storage")
         
-        # Get file metadata from storage
-        file_metadata = storage.get_file_metadata(video_data.storage_key)
-        
-        # Create video record
-        video = Video(
-            user_id=user.id,
-            firebase_uid=firebase_user["uid"],
-            title=video_data.title,
-            description=video_data.description,
-            duration=video_data.duration,
-            file_type=video_data.file_type,
-            storage_key=video_data.storage_key,
-            is_public=video_data.is_public,
-            venue_name=video_data.venue_name,
-            performance_date=video_data.performance_date,
-            set_duration=video_data.set_duration,
-            audience_size=video_data.audience_size,
-            mime_type=file_metadata.get("content_type") if file_metadata else None,
-            file_size=file_metadata.get("size") if file_metadata else None
-        )
-        
-        db.add(video)
-        db.commit()
-        db.refresh(video)
+        def _create_video(db: Session) -> VideoResponse:
+            # Create video record
+            video = Video(
+                user_id=user.id,
+                firebase_uid=firebase_user["uid"],
+                title=video_data.title,
+                description=video_data.description,
+                duration=video_data.duration,
+                file_type=video_data.file_type,
+                storage_key=video_data.storage_key,
+                is_public=video_data.is_public,
+                venue_name=video_data.venue_name,
+                performance_date=video_data.performance_date,
+                set_duration=video_data.set_duration,
+                audience_size=video_data.audience_size,
+                mime_type=file_metadata.get("content_type"),
+                file_size=file_metadata.get("size")
+            )
+            
+            db.add(video)
+            db.flush()
+            
+            # Queue ML analysis, HLS packaging and thumbnails in the same transaction, so no upload is left without its jobs
+            enqueue_job(db, video.id, priority=UPLOAD_JOB_PRIORITY, kind=ML_ANALYSIS_JOB)
+            enqueue_job(db, video.id, priority=UPLOAD_JOB_PRIORITY, kind=TRANSCODE_JOB)
+            enqueue_job(db, video.id, priority=UPLOAD_JOB_PRIORITY, kind=THUMBNAIL_JOB)
+            
+            db.commit()
+            db.refresh(video)
+            
+            return format_video_response(video)
         
-        return format_video_response(video)
+        return await run_db(db, _create_video)
         
     except HTTPException:
         raise
@@ -217,55 +700,46 @@ async def list_videos(
     cursor: Optional[str] = Query(None, description="Pagination cursor"),
     limit: int = Query(20, ge=1, le=100, description="Number of videos to return"),
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """List videos with pagination"""
     try:
-        user = get_or_create_user(db, firebase_user)
+        def _list_videos(db: Session) -> VideoListResponse:
+            user = resolve_user(db, firebase_user)
+            
+            if feed == "home":
+                # Personalized feed - for now, just return public videos ordered by posted_at
+                query = db.query(Video).filter(Video.is_public == True)
+            else:
+                # User's own videos
+                query = db.query(Video).filter(Video.user_id == user.id)
+            
+            # Apply cursor-based pagination, newest first
+            query = apply_feed_cursor(query, cursor)
+            
+            # Fetch one extra to check if there are more results
+            videos = with_video_authors(query).limit(limit + 1).all()
+            
+            has_more = len(videos) > limit
+            if has_more:
+                videos = videos[:limit]
+            
+            # Generate next cursor
+            next_cursor = None
+            if has_more and videos:
+                last_video = videos[-1]
+                next_cursor = f"{last_video.posted_at.isoformat()}_{last_video.id}"
+            
+            liked_ids = get_liked_video_ids(db, user.id, [video.id for video in videos])
+            video_responses = format_video_responses(videos, liked_ids)
+            
+            return FastJSONResponse({
+                "videos": video_responses,
+                "cursor": next_cursor,
+                "has_more": has_more
+            })
         
-        if feed == "home":
-            # Personalized feed - for now, just return public videos ordered by posted_at
-            query = db.query(Video).filter(Video.is_public == True)
-        else:
-            # User's own videos
-            query = db.query(Video).filter(Video.user_id == user.id)
-        
-        # Apply cursor-based pagination
-        if cursor:
-            try:
-                # Cursor format: timestamp_id
-                cursor_timestamp, cursor_id = cursor.split('_')
-                cursor_datetime = datetime.fromisoformat(cursor_timestamp.replace('Z', '+00:00'))
-                query = query.filter(
-                    (Video.posted_at < cursor_datetime) |
-                    ((Video.posted_at == cursor_datetime) & (Video.id < int(cursor_id)))
-                )
-            except (ValueError, IndexError):
-                raise HTTPException(status_code=400, detail="Invalid cursor format")
-        
-        # Order by posted_at descending, then by id for consistent pagination
-        query = query.order_by(Video.posted_at.desc(), Video.id.desc())
-        
-        # Fetch one extra to check if there are more results
-        videos = query.limit(limit + 1).all()
-        
-        has_more = len(videos) > limit
-        if has_more:
-            videos = videos[:limit]
-        
-        # Generate next cursor
-        next_cursor = None
-        if has_more and videos:
-            last_video = videos[-1]
-            next_cursor = f"{last_video.posted_at.isoformat()}_{last_video.id}"
-        
-        video_responses = [format_video_response(video) for video in videos]
-        
-        return VideoListResponse(
-            videos=video_responses,
-            cursor=next_cursor,
-            has_more=has_more
-        )
+        return await run_db(db, _list_videos)
         
     except HTTPException:
         raise
@@ -277,26 +751,34 @@ async def list_videos(
 async def get_video(
     video_id: int,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """Get specific video details"""
     try:
-        user = get_or_create_user(db, firebase_user)
+        def _get_video(db: Session) -> Tuple[Dict[str, Any], bool]:
+            user = resolve_user(db, firebase_user)
+            
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            # Check access permissions
+            if not video.is_public and video.user_id != user.id:
+                raise HTTPException(status_code=403, detail="Access denied")
+            
+            liked_by_me = bool(get_liked_video_ids(db, user.id, [video.id]))
+            return video_response_dict(video, get_storage(), liked_by_me=liked_by_me), video.user_id != user.id
         
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
+        response, count_view = await run_db(db, _get_video)
         
-        # Check access permissions
-        if not video.is_public and video.user_id != user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Increment view count if it's not the owner viewing
-        if video.user_id != user.id:
-            video.view_count += 1
-            db.commit()
+        # Views are buffered and written behind, so reading a video never writes;
+        # the response includes views not yet flushed. Owners' views don't count.
+        if count_view:
+            response["view_count"] += view_counter.record(video_id)
+        else:
+            response["view_count"] += view_counter.pending(video_id)
         
-        return format_video_response(video)
+        return FastJSONResponse(response)
         
     except HTTPException:
         raise
@@ -304,35 +786,117 @@ async def get_video(
         logger.error(f"Error getting video: {e}")
         raise HTTPException(status_code=500, detail="Failed to get video")
 
-@router.get("/{video_id}/analytics", response_model=AnalyticsResponse)
-async def get_video_analytics(
+@router.get("/{video_id}/hls/{path:path}")
+async def get_hls_playlist(
     video_id: int,
+    path: str,
     firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
-    """Get video analytics including transcript and funniness scores"""
+    """Get a video's HLS master or rendition playlist, with segment URLs signed for the viewer"""
+    if not HLS_PLAYLIST_PATTERN.fullmatch(path):
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    
     try:
-        user = get_or_create_user(db, firebase_user)
+        def _get_hls_video(db: Session) -> Tuple[str, bool]:
+            user = resolve_user(db, firebase_user)
+            
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            # Same access rule as the video itself
+            if not video.is_public and video.user_id != user.id:
+                raise HTTPException(status_code=403, detail="Access denied")
+            
+            if not video.hls_manifest_key:
+                raise HTTPException(status_code=404, detail="Video has not been transcoded yet")
+            return video.hls_manifest_key, video.is_public
         
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
+        manifest_key, is_public = await run_db(db, _get_hls_video)
+        playlist_key = posixpath.join(posixpath.dirname(manifest_key), path)
         
-        # Only owner can access analytics
-        if video.user_id != user.id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        storage = get_storage()
+        try:
+            playlist = await run_storage(storage.read_file, playlist_key)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Playlist not found")
         
-        analytics = db.query(AnalyticsData).filter(AnalyticsData.video_id == video_id).first()
+        content = await run_storage(
+            rewrite_playlist,
+            playlist.decode("utf-8"),
+            playlist_key,
+            lambda key: hls_segment_url(storage, key, is_public)
+        )
+        return Response(
+            content=content,
+            media_type="application/vnd.apple.mpegurl",
+            # Per-viewer signed URLs: cacheable by the browser only, well within their lifetime
+            headers={"Cache-Control": "private, max-age=300"}
+        )
         
-        if not analytics:
-            return AnalyticsResponse(processing_status=video.processing_status)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting HLS playlist: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get playlist")
+
+@router.get("/{video_id}/analytics", response_model=AnalyticsResponse)
+async def get_video_analytics(
+    video_id: int,
+    response: Response,
+    from_time: Optional[float] = Query(None, alias="from", ge=0, description="Only segments starting at or after this many seconds"),
+    to_time: Optional[float] = Query(None, alias="to", ge=0, description="Only segments starting before this many seconds"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Segments per page, the whole window when omitted"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    firebase_user: Dict[str, Any] = Depends(verify_token_dependency),
+    db: DBSession = Depends(get_db)
+):
+    """Get video analytics including transcript and funniness scores"""
+    try:
+        def _get_video_analytics(db: Session) -> Union[AnalyticsResponse, Response]:
+            user = resolve_user(db, firebase_user)
+            
+            video = db.query(Video).filter(Video.id == video_id).first()
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            
+            # Only owner can access analytics
+            if video.user_id != user.id:
+                raise HTTPException(status_code=403, detail="Access denied")
+            
+            # Scalar columns only; the JSON is loaded after the conditional check
+            analytics = db.query(AnalyticsData).filter(AnalyticsData.video_id == video_id).first()
+            
+            # Analytics are immutable for a processing version, so the version and
+            # last write identify the representation (plus the requested window)
+            etag = make_etag(
+                video_id,
+                analytics.processing_version if analytics else None,
+                (analytics.updated_at or analytics.created_at) if analytics else None,
+                video.processing_status,
+                from_time, to_time, limit, cursor
+            )
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            set_cache_headers(response, etag)
+            
+            if not analytics:
+                return AnalyticsResponse(processing_status=video.processing_status)
+            
+            transcript, next_cursor = get_transcript_window(db, analytics, from_time, to_time, limit, cursor)
+            
+            return AnalyticsResponse(
+                transcript=transcript,
+                overall_funniness_score=analytics.overall_funniness_score,
+                laughter_timestamps=analytics.laughter_timestamps,
+                processing_status=video.processing_status,
+                next_cursor=next_cursor,
+                has_more=next_cursor is not None
+            )
         
-        return AnalyticsResponse(
-            transcript=analytics.transcript,
-            overall_funniness_score=analytics.overall_funniness_score,
-            laughter_timestamps=analytics.laughter_timestamps,
-            processing_status=video.processing_status
-        )
+        return await run_db(db, _get_video_analytics)
         
     except HTTPException:
         raise
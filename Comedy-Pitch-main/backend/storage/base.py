@@ -1,7 +1,18 @@
+import math
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
+from storage.url_cache import DOWNLOAD_URL_TTL, PRIVATE_SCOPE, PUBLIC_SCOPE, DownloadUrlCache
+
+# S3 multipart limits: parts of 5 MiB to 5 GiB (except the last) and at most 10,000 parts
+MIN_PART_SIZE = 5 * 1024 ** 2
+MAX_PART_SIZE = 5 * 1024 ** 3
+MAX_PARTS = 10_000
+
+# S3 error codes that mean the client's upload id or part list is wrong, not a server fault
+MULTIPART_CLIENT_ERRORS = ("NoSuchUpload", "InvalidPart", "InvalidPartOrder", "EntityTooSmall")
+
 @dataclass
 class UploadMetadata:
     """Metadata for file uploads"""
@@ -18,6 +29,21 @@ class PresignedUrlResponse:
     expires_in: int
     fields: Optional[Dict[str, str]] = None  # For form fields in POST uploads
 
+@dataclass
+class UploadedPart:
+    """One stored part of a multipart upload"""
+    part_number: int
+    etag: str  # Without surrounding quotes
+    size: Optional[int] = None
+
+class MultipartUploadError(Exception):
+    """The upload id is unknown or the parts don't match what was uploaded"""
+    pass
+
+def multipart_part_size(content_length: int, preferred: int) -> int:
+    """Part size for a file: the preferred size, grown if needed to stay within MAX_PARTS"""
+    return max(preferred, MIN_PART_SIZE, math.ceil(content_length / MAX_PARTS))
+
 class StorageBackend(ABC):
     """Abstract base class for storage backends"""
     
@@ -36,6 +62,40 @@ class StorageBackend(ABC):
         """Get public URL for a stored file"""
         pass
     
+    def upload_file(self, key: str, file_path: str, content_type: Optional[str] = None) -> None:
+        """Store a local file under key (workers writing derived media such as HLS segments)"""
+        raise NotImplementedError(f"{type(self).__name__} does not support server-side uploads")
+    
+    def read_file(self, key: str) -> bytes:
+        """Contents of a small stored file (e.g. a playlist), raises FileNotFoundError if missing"""
+        raise NotImplementedError(f"{type(self).__name__} does not support server-side reads")
+    
+    # Minimum seconds a get_public_url URL stays valid; None when it never expires
+    public_url_ttl: Optional[float] = None
+    
+    def __init__(self):
+        self.download_urls = DownloadUrlCache()
+    
+    def generate_presigned_download_url(self, key: str, expires_in: int = DOWNLOAD_URL_TTL) -> str:
+        """Presigned GET URL for a file in a private bucket"""
+        raise NotImplementedError(f"{type(self).__name__} does not support presigned downloads")
+    
+    def get_download_url(self, key: str, private: bool = False) -> str:
+        """URL viewers fetch a file from: the public URL, or a presigned GET for private media.
+        
+        URLs are reused from download_urls until close to expiry, so rendering a
+        feed signs each private file about once an hour rather than once per request.
+        """
+        scope = PRIVATE_SCOPE if private else PUBLIC_SCOPE
+        url = self.download_urls.get(key, scope)
+        if url is None:
+            if private:
+                url, valid_for = self.generate_presigned_download_url(key, DOWNLOAD_URL_TTL), DOWNLOAD_URL_TTL
+            else:
+                url, valid_for = self.get_public_url(key), self.public_url_ttl or DOWNLOAD_URL_TTL
+            self.download_urls.put(key, scope, url, valid_for)
+        return url
+    
     @abstractmethod
     def delete_file(self, key: str) -> bool:
         """Delete a file from storage"""
@@ -49,4 +109,33 @@ class StorageBackend(ABC):
     @abstractmethod
     def get_file_metadata(self, key: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a stored file"""
-        pass 
\ No newline at end of file
+        pass
+    
+    # Multipart uploads: the client PUTs parts in parallel to presigned part URLs and can
+    # resume by listing what was stored. Backends without support raise NotImplementedError.
+    
+    def create_multipart_upload(self, key: str, metadata: Optional[UploadMetadata] = None) -> str:
+        """Start a multipart upload, returns its upload id"""
+        raise NotImplementedError(f"{type(self).__name__} does not support multipart uploads")
+    
+    def generate_presigned_part_urls(
+        self,
+        key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expires_in: int = 3600
+    ) -> Dict[int, str]:
+        """Presigned PUT URLs for parts of a multipart upload, by part number"""
+        raise NotImplementedError(f"{type(self).__name__} does not support multipart uploads")
+    
+    def list_uploaded_parts(self, key: str, upload_id: str) -> List[UploadedPart]:
+        """Parts stored so far, in part number order"""
+        raise NotImplementedError(f"{type(self).__name__} does not support multipart uploads")
+    
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[UploadedPart]) -> None:
+        """Assemble the listed parts, in order, into the final object"""
+        raise NotImplementedError(f"{type(self).__name__} does not support multipart uploads")
+    
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Discard a multipart upload and its stored parts"""
+        raise NotImplementedError(f"{type(self).__name__} does not support multipart uploads")
@@ -1,21 +1,38 @@
+import asyncio
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from config.metrics import instrument_methods, storage_operation_duration
 from storage.base import StorageBackend
+from storage.local_storage import LocalStorage
 from storage.minio_storage import MinIOStorage
 from storage.s3_storage import S3Storage
 
+def storage_backend_name() -> str:
+    """Configured backend name (MinIO unless set; single-node installs opt into "local")"""
+    return os.getenv("STORAGE_BACKEND", "minio").lower()
+
 def get_storage_backend() -> StorageBackend:
     """Get storage backend based on environment configuration"""
-    storage_type = os.getenv("STORAGE_BACKEND", "minio").lower()
+    storage_type = storage_backend_name()
+    
+    if storage_type == "local":
+        return LocalStorage(
+            root_dir=os.getenv("LOCAL_STORAGE_PATH", "./media"),
+            base_url=os.getenv("LOCAL_STORAGE_BASE_URL"),
+            secret_key=os.getenv("LOCAL_STORAGE_SECRET")
+        )
     
-    if storage_type == "minio":
+    elif storage_type == "minio":
         return MinIOStorage(
             endpoint=os.getenv("MINIO_ENDPOINT"),
             access_key=os.getenv("MINIO_ACCESS_KEY"),
             secret_key=os.getenv("MINIO_SECRET_KEY"),
             bucket_name=os.getenv("MINIO_BUCKET_NAME", "comedy-peach"),
-            secure=os.getenv("MINIO_SECURE", "false").lower() == "true"
+            secure=os.getenv("MINIO_SECURE", "false").lower() == "true",
+            region=os.getenv("MINIO_REGION")
         )
     
     elif storage_type == "s3":
@@ -27,14 +44,59 @@ def get_storage_backend() -> StorageBackend:
         )
     
     else:
-        raise ValueError(f"Unknown storage backend: {storage_type}. Supported backends: minio, s3")
+        raise ValueError(f"Unknown storage backend: {storage_type}. Supported backends: local, minio, s3")
+
+# Backend calls that go over the network, timed for /metrics
+TIMED_STORAGE_METHODS = (
+    "file_exists",
+    "get_file_metadata",
+    "generate_presigned_url",
+    "delete_file",
+    "create_multipart_upload",
+    "generate_presigned_part_urls",
+    "list_uploaded_parts",
+    "complete_multipart_upload",
+    "abort_multipart_upload",
+    "upload_file",
+    "read_file"
+)
+
+# Blocking storage calls run on their own bounded pool, so slow object store round trips
+# neither stall the event loop nor starve the default executor. Matches the 10
+# connections boto3 and minio keep per host, so every worker thread can reuse one.
+STORAGE_THREAD_POOL_SIZE = int(os.getenv("STORAGE_THREAD_POOL_SIZE", "10"))
 
 # Global storage instance
 _storage_backend: Optional[StorageBackend] = None
+_storage_executor: Optional[ThreadPoolExecutor] = None
 
 def get_storage() -> StorageBackend:
     """Get the configured storage backend (singleton)"""
     global _storage_backend
     if _storage_backend is None:
-        _storage_backend = get_storage_backend()
-    return _storage_backend 
\ No newline at end of file
+        _storage_backend = instrument_methods(
+            get_storage_backend(),
+            storage_operation_duration,
+            TIMED_STORAGE_METHODS,
+            storage_backend_name()
+        )
+    return _storage_backend
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """The thread pool storage calls run on (created on first use)"""
+    global _storage_executor
+    if _storage_executor is None:
+        _storage_executor = ThreadPoolExecutor(max_workers=STORAGE_THREAD_POOL_SIZE, thread_name_prefix="storage")
+    return _storage_executor
+
+async def run_storage(fn, *args, **kwargs):
+    """Await a blocking storage backend call, e.g. ``await run_storage(storage.get_file_metadata, key)``"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_storage_executor(), functools.partial(fn, *args, **kwargs))
+
+def shutdown_storage_executor() -> None:
+    """Wait for in-flight storage calls and release the pool's threads"""
+    global _storage_executor
+    if _storage_executor is not None:
+        _storage_executor.shutdown(wait=True)
+        _storage_executor = None
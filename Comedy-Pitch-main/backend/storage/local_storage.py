@@ -0,0 +1,296 @@
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import re
+import secrets
+import shutil
+import time
+from stat import S_ISREG
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+from datetime import datetime, timezone
+
+from storage.base import (
+    MultipartUploadError,
+    PresignedUrlResponse,
+    StorageBackend,
+    UploadedPart,
+    UploadMetadata
+)
+from storage.url_cache import DOWNLOAD_URL_TTL
+
+logger = logging.getLogger(__name__)
+
+# Path the media endpoint is mounted at (see routes/media.py)
+LOCAL_MEDIA_PATH = "/media"
+
+# In-progress multipart uploads are staged under root_dir/.multipart/<upload_id>/
+MULTIPART_DIR = ".multipart"
+UPLOAD_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+PART_FILE_GLOB = "[0-9][0-9][0-9][0-9][0-9].part"
+
+# mimetypes maps .ts to Qt Linguist files
+HLS_CONTENT_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t"}
+
+class LocalStorage(StorageBackend):
+    """Local filesystem storage backend for single-node installs.
+    
+    Files live under root_dir and are read and written through the API's /media
+    endpoint using HMAC-signed, expiring URLs in place of an object store's
+    presigned URLs.
+    """
+
+    def __init__(
+        self,
+        root_dir: str = None,
+        base_url: str = None,
+        secret_key: str = None,
+        url_ttl: int = None
+    ):
+        super().__init__()
+        self.root_dir = Path(root_dir or os.getenv("LOCAL_STORAGE_PATH", "./media")).resolve()
+        self.base_url = (base_url or os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000")).rstrip("/")
+        self.url_ttl = url_ttl or int(os.getenv("LOCAL_STORAGE_URL_TTL", "3600"))
+        
+        secret_key = secret_key or os.getenv("LOCAL_STORAGE_SECRET")
+        if not secret_key:
+            # Fine for one process; URLs stop verifying across workers and restarts
+            logger.warning("LOCAL_STORAGE_SECRET is not set, signing media URLs with a random per-process key")
+            secret_key = secrets.token_hex(32)
+        self.secret_key = secret_key.encode("utf-8")
+        
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        """Filesystem path for a storage key, refusing keys that escape root_dir"""
+        path = (self.root_dir / key).resolve()
+        if not key or self.root_dir not in path.parents:
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return path
+
+    def sign(
+        self,
+        method: str,
+        key: str,
+        expires: int,
+        max_size: Optional[int] = None,
+        upload_part: Optional[Tuple[str, int]] = None
+    ) -> str:
+        """HMAC-SHA256 signature over what a media URL permits"""
+        payload = f"{method}\n{key}\n{expires}\n{max_size if max_size is not None else ''}"
+        if upload_part:
+            payload += "\n{}:{}".format(*upload_part)
+        return hmac.new(self.secret_key, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def verify_signature(
+        self,
+        method: str,
+        key: str,
+        expires: int,
+        signature: str,
+        max_size: Optional[int] = None,
+        upload_part: Optional[Tuple[str, int]] = None
+    ) -> bool:
+        """Whether a media URL's signature is valid and unexpired"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.sign(method, key, expires, max_size, upload_part), signature)
+
+    def signed_url(
+        self,
+        method: str,
+        key: str,
+        expires: int,
+        max_size: Optional[int] = None,
+        upload_part: Optional[Tuple[str, int]] = None
+    ) -> str:
+        """Media endpoint URL for a key, valid for one method until expires (Unix time)"""
+        params = {"expires": expires}
+        if max_size is not None:
+            params["size"] = max_size
+        if upload_part:
+            # Same query parameter names as an S3 UploadPart URL
+            params["uploadId"], params["partNumber"] = upload_part
+        params["signature"] = self.sign(method, key, expires, max_size, upload_part)
+        return f"{self.base_url}{LOCAL_MEDIA_PATH}/{quote(key)}?{urlencode(params)}"
+
+    def generate_presigned_url(
+        self,
+        key: str,
+        expires_in: int = 3600,
+        metadata: Optional[UploadMetadata] = None
+    ) -> PresignedUrlResponse:
+        """Generate a signed PUT URL for file upload, capped at the declared size when known"""
+        self.path_for(key)
+        max_size = metadata.content_length if metadata else None
+        return PresignedUrlResponse(
+            upload_url=self.signed_url("PUT", key, int(time.time()) + expires_in, max_size),
+            storage_key=key,
+            expires_in=expires_in
+        )
+
+    def get_public_url(self, key: str) -> str:
+        """Get a signed download URL for a stored file.
+        
+        Expiry is rounded up to the next url_ttl boundary (valid for url_ttl to
+        2 * url_ttl seconds), so a key's URL stays the same within a window and
+        feed and profile responses keep their ETags and browser caches.
+        """
+        expires = (int(time.time()) // self.url_ttl + 2) * self.url_ttl
+        return self.signed_url("GET", key, expires)
+
+    @property
+    def public_url_ttl(self) -> float:
+        return self.url_ttl
+
+    def generate_presigned_download_url(self, key: str, expires_in: int = DOWNLOAD_URL_TTL) -> str:
+        """Signed download URL valid for expires_in seconds"""
+        return self.signed_url("GET", key, int(time.time()) + expires_in)
+
+    def upload_file(self, key: str, file_path: str, content_type: Optional[str] = None) -> None:
+        """Copy a local file into storage (content types come from the key's extension)"""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.part")
+        try:
+            shutil.copyfile(file_path, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def read_file(self, key: str) -> bytes:
+        """Contents of a small stored file, raises FileNotFoundError if missing"""
+        path, _ = self.stat_file(key)
+        return path.read_bytes()
+
+    def delete_file(self, key: str) -> bool:
+        """Delete a file from local storage"""
+        try:
+            self.path_for(key).unlink()
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def file_exists(self, key: str) -> bool:
+        """Check if a file exists in local storage"""
+        try:
+            return self.path_for(key).is_file()
+        except ValueError:
+            return False
+
+    def stat_file(self, key: str) -> Tuple[Path, os.stat_result]:
+        """Path and stat of a stored file, raises FileNotFoundError if missing"""
+        try:
+            path = self.path_for(key)
+        except ValueError:
+            raise FileNotFoundError(key)
+        stat = path.stat()
+        if not S_ISREG(stat.st_mode):
+            raise FileNotFoundError(key)
+        return path, stat
+
+    def get_file_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get metadata for a stored file"""
+        try:
+            _, stat = self.stat_file(key)
+        except OSError:
+            return None
+        return {
+            "size": stat.st_size,
+            "etag": file_etag(stat),
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            "content_type": content_type_for(key),
+            "metadata": {}
+        }
+
+    # Multipart uploads: parts are PUT to the media endpoint and concatenated on completion
+    
+    def multipart_dir(self, key: str, upload_id: str) -> Path:
+        """Staging directory of an in-progress upload, checked against the key it was started for"""
+        directory = self.root_dir / MULTIPART_DIR / upload_id
+        try:
+            if UPLOAD_ID_PATTERN.fullmatch(upload_id) and (directory / "key").read_text() == key:
+                return directory
+        except OSError:
+            pass
+        raise MultipartUploadError("The specified multipart upload does not exist")
+
+    def part_path(self, key: str, upload_id: str, part_number: int) -> Path:
+        """Staged file for one part of an in-progress upload"""
+        return self.multipart_dir(key, upload_id) / f"{part_number:05d}.part"
+
+    def create_multipart_upload(self, key: str, metadata: Optional[UploadMetadata] = None) -> str:
+        """Start a multipart upload, returns its upload id"""
+        self.path_for(key)
+        upload_id = secrets.token_hex(16)
+        directory = self.root_dir / MULTIPART_DIR / upload_id
+        directory.mkdir(parents=True)
+        (directory / "key").write_text(key)
+        return upload_id
+
+    def generate_presigned_part_urls(
+        self,
+        key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expires_in: int = 3600
+    ) -> Dict[int, str]:
+        """Signed PUT URLs for parts of a multipart upload, by part number"""
+        self.multipart_dir(key, upload_id)
+        expires = int(time.time()) + expires_in
+        return {
+            part_number: self.signed_url("PUT", key, expires, upload_part=(upload_id, part_number))
+            for part_number in part_numbers
+        }
+
+    def list_uploaded_parts(self, key: str, upload_id: str) -> List[UploadedPart]:
+        """Parts stored so far, in part number order"""
+        parts = []
+        for path in sorted(self.multipart_dir(key, upload_id).glob(PART_FILE_GLOB)):
+            stat = path.stat()
+            parts.append(UploadedPart(part_number=int(path.stem), etag=file_etag(stat).strip('"'), size=stat.st_size))
+        return parts
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[UploadedPart]) -> None:
+        """Concatenate the listed parts, in order, into the final file"""
+        directory = self.multipart_dir(key, upload_id)
+        uploaded = {part.part_number: part for part in self.list_uploaded_parts(key, upload_id)}
+        part_numbers = [part.part_number for part in parts]
+        if part_numbers != sorted(set(part_numbers)):
+            raise MultipartUploadError("The list of parts was not in ascending order")
+        for part in parts:
+            if part.part_number not in uploaded or uploaded[part.part_number].etag != part.etag:
+                raise MultipartUploadError(f"Part {part.part_number} was not uploaded or its ETag does not match")
+        
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{upload_id[:8]}.part")
+        try:
+            # Assemble beside the target and rename, so readers never see a partial file
+            with open(temp_path, "wb") as target:
+                for part in parts:
+                    with open(directory / f"{part.part_number:05d}.part", "rb") as source:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Discard a multipart upload and its stored parts"""
+        try:
+            shutil.rmtree(self.multipart_dir(key, upload_id))
+            return True
+        except (MultipartUploadError, OSError):
+            return False
+
+def file_etag(stat: os.stat_result) -> str:
+    """Strong ETag for a file version (changes when it is rewritten)"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def content_type_for(key: str) -> str:
+    """MIME type from the key's extension (storage keys keep the uploaded file's)"""
+    return HLS_CONTENT_TYPES.get(Path(key).suffix) or mimetypes.guess_type(key)[0] or "application/octet-stream"
@@ -1,11 +1,20 @@
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from minio import Minio
+from minio.datatypes import Part
 from minio.error import S3Error
 from urllib.parse import urljoin
 from datetime import timedelta
 
-from storage.base import StorageBackend, UploadMetadata, PresignedUrlResponse
+from storage.base import (
+    MULTIPART_CLIENT_ERRORS,
+    MultipartUploadError,
+    PresignedUrlResponse,
+    StorageBackend,
+    UploadedPart,
+    UploadMetadata
+)
+from storage.url_cache import DOWNLOAD_URL_TTL
 
 class MinIOStorage(StorageBackend):
     """MinIO storage backend for S3-compatible object storage"""
@@ -16,20 +25,26 @@ class MinIOStorage(StorageBackend):
         access_key: str = None,
         secret_key: str = None,
         bucket_name: str = "comedy-peach",
-        secure: bool = False
+        secure: bool = False,
+        region: str = None
     ):
+        super().__init__()
         self.endpoint = endpoint or os.getenv("MINIO_ENDPOINT", "localhost:9000")
         self.access_key = access_key or os.getenv("MINIO_ACCESS_KEY", "minioadmin")
         self.secret_key = secret_key or os.getenv("MINIO_SECRET_KEY", "minioadmin")
         self.bucket_name = bucket_name
         self.secure = secure
+        # Known up front, presigning is pure signing: without it the client asks the
+        # server for the bucket's location the first time it signs a URL
+        self.region = region or os.getenv("MINIO_REGION", "us-east-1")
         
         # Initialize MinIO client
         self.client = Minio(
             self.endpoint,
             access_key=self.access_key,
             secret_key=self.secret_key,
-            secure=self.secure
+            secure=self.secure,
+            region=self.region
         )
         
         # Ensure bucket exists
@@ -73,6 +88,34 @@ class MinIOStorage(StorageBackend):
         protocol = "https" if self.secure else "http"
         return f"{protocol}://{self.endpoint}/{self.bucket_name}/{key}"
     
+    def generate_presigned_download_url(self, key: str, expires_in: int = DOWNLOAD_URL_TTL) -> str:
+        """Presigned GET URL for a file in a private bucket"""
+        try:
+            return self.client.presigned_get_object(self.bucket_name, key, expires=timedelta(seconds=expires_in))
+        except S3Error as e:
+            raise Exception(f"Failed to generate download URL: {e}")
+    
+    def upload_file(self, key: str, file_path: str, content_type: Optional[str] = None) -> None:
+        """Store a local file under key"""
+        try:
+            self.client.fput_object(self.bucket_name, key, file_path, content_type=content_type or "application/octet-stream")
+        except S3Error as e:
+            raise Exception(f"Failed to upload {key}: {e}")
+    
+    def read_file(self, key: str) -> bytes:
+        """Contents of a small stored file, raises FileNotFoundError if missing"""
+        try:
+            response = self.client.get_object(self.bucket_name, key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise FileNotFoundError(key)
+            raise Exception(f"Failed to read {key}: {e}")
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    
     def delete_file(self, key: str) -> bool:
         """Delete a file from MinIO storage"""
         try:
@@ -101,4 +144,77 @@ class MinIOStorage(StorageBackend):
                 "metadata": stat.metadata
             }
         except S3Error:
-            return None 
\ No newline at end of file
+            return None
+    
+    # Multipart uploads (minio-py keeps the S3 multipart calls private; their signatures are stable across 7.x)
+    
+    def create_multipart_upload(self, key: str, metadata: Optional[UploadMetadata] = None) -> str:
+        """Start a multipart upload, returns its upload id"""
+        headers = {"Content-Type": metadata.content_type} if metadata and metadata.content_type else {}
+        try:
+            return self.client._create_multipart_upload(self.bucket_name, key, headers)
+        except S3Error as e:
+            raise Exception(f"Failed to start multipart upload: {e}")
+    
+    def generate_presigned_part_urls(
+        self,
+        key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expires_in: int = 3600
+    ) -> Dict[int, str]:
+        """Presigned PUT URLs for parts of a multipart upload, by part number"""
+        try:
+            return {
+                part_number: self.client.get_presigned_url(
+                    "PUT",
+                    self.bucket_name,
+                    key,
+                    expires=timedelta(seconds=expires_in),
+                    extra_query_params={"uploadId": upload_id, "partNumber": str(part_number)}
+                )
+                for part_number in part_numbers
+            }
+        except S3Error as e:
+            raise Exception(f"Failed to generate part URLs: {e}")
+    
+    def list_uploaded_parts(self, key: str, upload_id: str) -> List[UploadedPart]:
+        """Parts stored so far, in part number order"""
+        parts = []
+        marker = None
+        try:
+            while True:
+                result = self.client._list_parts(self.bucket_name, key, upload_id, part_number_marker=marker)
+                parts.extend(
+                    UploadedPart(part_number=part.part_number, etag=part.etag.strip('"'), size=part.size)
+                    for part in result.parts
+                )
+                if not result.is_truncated:
+                    return parts
+                marker = result.next_part_number_marker
+        except S3Error as e:
+            if e.code in MULTIPART_CLIENT_ERRORS:
+                raise MultipartUploadError(e.message)
+            raise Exception(f"Failed to list uploaded parts: {e}")
+    
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[UploadedPart]) -> None:
+        """Assemble the listed parts, in order, into the final object"""
+        try:
+            self.client._complete_multipart_upload(
+                self.bucket_name,
+                key,
+                upload_id,
+                [Part(part.part_number, part.etag) for part in parts]
+            )
+        except S3Error as e:
+            if e.code in MULTIPART_CLIENT_ERRORS:
+                raise MultipartUploadError(e.message)
+            raise Exception(f"Failed to complete multipart upload: {e}")
+    
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Discard a multipart upload and its stored parts"""
+        try:
+            self.client._abort_multipart_upload(self.bucket_name, key, upload_id)
+            return True
+        except S3Error:
+            return False
@@ -1,9 +1,17 @@
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 
-from storage.base import StorageBackend, UploadMetadata, PresignedUrlResponse
+from storage.base import (
+    MULTIPART_CLIENT_ERRORS,
+    MultipartUploadError,
+    PresignedUrlResponse,
+    StorageBackend,
+    UploadedPart,
+    UploadMetadata
+)
+from storage.url_cache import DOWNLOAD_URL_TTL
 
 class S3Storage(StorageBackend):
     """AWS S3 storage backend for production"""
@@ -15,6 +23,7 @@ class S3Storage(StorageBackend):
         access_key: str = None,
         secret_key: str = None
     ):
+        super().__init__()
         self.bucket_name = bucket_name or os.getenv("AWS_S3_BUCKET", "comedy-peach-prod")
         self.region = region or os.getenv("AWS_REGION", "us-east-1")
         
@@ -89,6 +98,38 @@ class S3Storage(StorageBackend):
         else:
             return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
     
+    def generate_presigned_download_url(self, key: str, expires_in: int = DOWNLOAD_URL_TTL) -> str:
+        """Presigned GET URL for a file in a private bucket"""
+        try:
+            return self.s3_client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket_name, "Key": key},
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            raise Exception(f"Failed to generate download URL: {e}")
+    
+    def upload_file(self, key: str, file_path: str, content_type: Optional[str] = None) -> None:
+        """Store a local file under key (multipart for large files)"""
+        try:
+            self.s3_client.upload_file(
+                file_path,
+                self.bucket_name,
+                key,
+                ExtraArgs={"ContentType": content_type or "application/octet-stream"}
+            )
+        except ClientError as e:
+            raise Exception(f"Failed to upload {key}: {e}")
+    
+    def read_file(self, key: str) -> bytes:
+        """Contents of a small stored file, raises FileNotFoundError if missing"""
+        try:
+            return self.s3_client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key)
+            raise Exception(f"Failed to read {key}: {e}")
+    
     def delete_file(self, key: str) -> bool:
         """Delete a file from S3 storage"""
         try:
@@ -117,4 +158,79 @@ class S3Storage(StorageBackend):
                 "metadata": response.get("Metadata", {})
             }
         except ClientError:
-            return None 
\ No newline at end of file
+            return None
+    
+    # Multipart uploads
+    
+    def create_multipart_upload(self, key: str, metadata: Optional[UploadMetadata] = None) -> str:
+        """Start a multipart upload, returns its upload id"""
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if metadata and metadata.content_type:
+            params["ContentType"] = metadata.content_type
+        try:
+            return self.s3_client.create_multipart_upload(**params)["UploadId"]
+        except ClientError as e:
+            raise Exception(f"Failed to start multipart upload: {e}")
+    
+    def generate_presigned_part_urls(
+        self,
+        key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expires_in: int = 3600
+    ) -> Dict[int, str]:
+        """Presigned PUT URLs for parts of a multipart upload, by part number"""
+        try:
+            return {
+                part_number: self.s3_client.generate_presigned_url(
+                    "upload_part",
+                    Params={
+                        "Bucket": self.bucket_name,
+                        "Key": key,
+                        "UploadId": upload_id,
+                        "PartNumber": part_number
+                    },
+                    ExpiresIn=expires_in
+                )
+                for part_number in part_numbers
+            }
+        except ClientError as e:
+            raise Exception(f"Failed to generate part URLs: {e}")
+    
+    def list_uploaded_parts(self, key: str, upload_id: str) -> List[UploadedPart]:
+        """Parts stored so far, in part number order"""
+        try:
+            paginator = self.s3_client.get_paginator("list_parts")
+            return [
+                UploadedPart(part_number=part["PartNumber"], etag=part["ETag"].strip('"'), size=part.get("Size"))
+                for page in paginator.paginate(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+                for part in page.get("Parts", [])
+            ]
+        except ClientError as e:
+            if e.response["Error"]["Code"] in MULTIPART_CLIENT_ERRORS:
+                raise MultipartUploadError(e.response["Error"].get("Message", "Invalid multipart upload"))
+            raise Exception(f"Failed to list uploaded parts: {e}")
+    
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[UploadedPart]) -> None:
+        """Assemble the listed parts, in order, into the final object"""
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [{"PartNumber": part.part_number, "ETag": f'"{part.etag}"'} for part in parts]
+                }
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in MULTIPART_CLIENT_ERRORS:
+                raise MultipartUploadError(e.response["Error"].get("Message", "Invalid multipart upload"))
+            raise Exception(f"Failed to complete multipart upload: {e}")
+    
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Discard a multipart upload and its stored parts"""
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            return True
+        except ClientError:
+            return False
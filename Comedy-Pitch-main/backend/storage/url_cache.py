@@ -0,0 +1,54 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Presigned GETs for private media are signed for this long
+DOWNLOAD_URL_TTL = int(os.getenv("DOWNLOAD_URL_TTL", "3600"))
+
+# Download URLs are cached per (storage key, scope) so feed renders reuse a signed URL
+# instead of signing one per video per request. Entries are dropped this many seconds
+# before the URL itself expires, so a client never receives one about to go stale.
+DOWNLOAD_URL_CACHE_SIZE = int(os.getenv("DOWNLOAD_URL_CACHE_SIZE", "50000"))
+DOWNLOAD_URL_REFRESH_MARGIN = float(os.getenv("DOWNLOAD_URL_REFRESH_MARGIN", "300"))
+
+# Scopes: public media (anyone who can see the video) and private media (its owner)
+PUBLIC_SCOPE = "public"
+PRIVATE_SCOPE = "private"
+
+class DownloadUrlCache:
+    """Bounded LRU cache of download URLs keyed by (storage key, scope)"""
+
+    def __init__(self, max_size: int = DOWNLOAD_URL_CACHE_SIZE, refresh_margin: float = DOWNLOAD_URL_REFRESH_MARGIN):
+        self.max_size = max_size
+        self.refresh_margin = refresh_margin
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, scope: str) -> Optional[str]:
+        """Get a cached URL unless it is close to expiry"""
+        with self._lock:
+            entry = self._entries.get((key, scope))
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[(key, scope)]
+                return None
+            self._entries.move_to_end((key, scope))
+            return entry[1]
+
+    def put(self, key: str, scope: str, url: str, valid_for: float) -> None:
+        """Cache a URL that stays valid for valid_for seconds"""
+        reuse_for = valid_for - self.refresh_margin
+        if self.max_size <= 0 or reuse_for <= 0:
+            return
+        with self._lock:
+            self._entries[(key, scope)] = (time.monotonic() + reuse_for, url)
+            self._entries.move_to_end((key, scope))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -84,19 +84,34 @@ def db_session(engine):
     connection.close()
 
 @pytest.fixture
-def client(db_session):
+def client(db_session, engine):
     """Create test client with overridden database dependency"""
     def override_get_db():
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as test_client:
+    # The status poller reads through its own sessions, which can't see the test transaction
+    from routes.ml import status_poller
+    from config.view_counter import view_counter
+    # Buffered views belong to the rolled-back test data: discard them before the shutdown
+    # flush, which would otherwise go to the app's own database
+    with patch.object(status_poller, "interval", 0), patch.object(view_counter, "bind", engine), \
+            TestClient(app) as test_client:
         yield test_client
+        view_counter.drain()
     
     # Clean up dependency override
     app.dependency_overrides.clear()
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Cached user ids don't survive the per-test rollback"""
+    from config.user_cache import user_cache
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
 @pytest.fixture
 def test_user(db_session):
     """Create a test user for use in tests"""
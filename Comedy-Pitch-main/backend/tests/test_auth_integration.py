@@ -329,4 +329,83 @@ class TestAuthPerformance:
         assert response.status_code == 200
         
         # Should only call Firebase once per request
-        assert mock_firebase_token.call_count == 1 
\ No newline at end of file
+        assert mock_firebase_token.call_count == 1 
+
+class TestTokenCache:
+    """Test the verified ID token cache"""
+    
+    def test_verified_token_cached_until_exp(self):
+        import time
+        from config.firebase_config import verify_firebase_token, token_cache
+        
+        token_cache.clear()
+        decoded = {"uid": "cached-uid", "exp": time.time() + 3600}
+        with patch('config.firebase_config.auth.verify_id_token', return_value=decoded) as mock_verify:
+            assert verify_firebase_token("cached-token") == decoded
+            assert verify_firebase_token("cached-token") == decoded
+            assert mock_verify.call_count == 1
+        
+        stats = token_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        
+    def test_cached_claims_are_not_shared_between_callers(self):
+        import time
+        from config.firebase_config import TokenCache
+        
+        cache = TokenCache()
+        decoded = {"uid": "uid", "exp": time.time() + 3600, "firebase": {"sign_in_provider": "password"}}
+        cache.put("token", decoded)
+        decoded["uid"] = "changed-after-put"
+        
+        first = cache.get("token")
+        first["uid"] = "changed-by-a-route"
+        first["firebase"]["sign_in_provider"] = "custom"
+        
+        assert cache.get("token") == {"uid": "uid", "exp": decoded["exp"], "firebase": {"sign_in_provider": "password"}}
+        
+    def test_expired_entry_is_verified_again(self):
+        import time
+        from config.firebase_config import TokenCache
+        
+        cache = TokenCache()
+        cache.put("token", {"uid": "uid", "exp": time.time() + 3600})
+        cache._entries[cache._key("token")] = (time.time() - 1, {"uid": "uid"})
+        
+        assert cache.get("token") is None
+        assert cache.stats()["size"] == 0
+        
+    def test_tokens_without_exp_are_not_cached(self):
+        from config.firebase_config import TokenCache
+        
+        cache = TokenCache()
+        cache.put("token", {"uid": "uid"})
+        
+        assert cache.get("token") is None
+        
+    def test_lru_eviction(self):
+        import time
+        from config.firebase_config import TokenCache
+        
+        cache = TokenCache(max_size=2)
+        exp = time.time() + 3600
+        cache.put("a", {"uid": "a", "exp": exp})
+        cache.put("b", {"uid": "b", "exp": exp})
+        cache.get("a")
+        cache.put("c", {"uid": "c", "exp": exp})
+        
+        assert cache.get("b") is None
+        assert cache.get("a")["uid"] == "a"
+        assert cache.get("c")["uid"] == "c"
+        assert cache.stats()["evictions"] == 1
+        
+    def test_invalid_token_is_not_cached(self):
+        from config.firebase_config import verify_firebase_token, token_cache
+        
+        token_cache.clear()
+        with patch('config.firebase_config.auth.verify_id_token', side_effect=Exception("bad signature")):
+            with pytest.raises(ValueError):
+                verify_firebase_token("bad-token")
+        
+        assert token_cache.stats()["size"] == 0
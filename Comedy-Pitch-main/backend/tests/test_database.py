@@ -0,0 +1,312 @@
+import pytest
+import os
+import uuid
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from config.database import Base, get_async_database_url, run_db
+from models.models import User, Video
+from routes.videos import get_or_create_user, get_or_create_user_async
+
+class TestAsyncDatabaseUrl:
+    """Test mapping of sync database URLs onto async drivers"""
+    
+    def test_sqlite_url(self):
+        assert get_async_database_url("sqlite:///./comedy_peach.db") == "sqlite+aiosqlite:///./comedy_peach.db"
+        
+    def test_postgresql_url(self):
+        assert get_async_database_url("postgresql://u:p@localhost/db") == "postgresql+asyncpg://u:p@localhost/db"
+        assert get_async_database_url("postgres://u:p@localhost/db") == "postgresql+asyncpg://u:p@localhost/db"
+        
+    def test_explicit_driver_untouched(self):
+        url = "postgresql+asyncpg://u:p@localhost/db"
+        assert get_async_database_url(url) == url
+
+class TestRunDb:
+    """Test running route queries against sync and async sessions"""
+    
+    @pytest.mark.asyncio
+    async def test_run_db_with_sync_session(self, db_session):
+        """A plain Session is passed straight to the callable"""
+        user = await get_or_create_user_async(db_session, {"uid": "sync-uid", "email": "sync@example.com"})
+        
+        assert user.id is not None
+        assert db_session.query(User).filter(User.firebase_uid == "sync-uid").count() == 1
+        
+    @pytest.mark.asyncio
+    async def test_run_db_with_async_session(self):
+        """An AsyncSession runs the callable through run_sync, lazy loads included"""
+        db_name = f"test_async_{uuid.uuid4().hex[:8]}.db"
+        sync_engine = create_engine(f"sqlite:///./{db_name}")
+        Base.metadata.create_all(bind=sync_engine)
+        sync_engine.dispose()
+        
+        async_engine = create_async_engine(get_async_database_url(f"sqlite:///./{db_name}"))
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                user = await get_or_create_user_async(db, {"uid": "async-uid", "email": "async@example.com"})
+                
+                def _add_video(session):
+                    video = Video(
+                        user_id=user.id,
+                        firebase_uid="async-uid",
+                        title="Async Set",
+                        file_type="video",
+                        storage_key="videos/async.mp4"
+                    )
+                    session.add(video)
+                    session.commit()
+                    # Lazy relationship load is allowed inside run_sync
+                    return video.user.firebase_uid
+                
+                assert await run_db(db, _add_video) == "async-uid"
+                
+                # Second lookup finds the existing user instead of creating one
+                again = await run_db(db, get_or_create_user, {"uid": "async-uid", "email": "async@example.com"})
+                assert again.id == user.id
+        finally:
+            await async_engine.dispose()
+            try:
+                os.remove(db_name)
+            except:
+                pass
+
+class TestSQLiteProductionMode:
+    """Test the WAL-mode SQLite pool"""
+    
+    def test_in_memory_database_stays_on_static_pool(self):
+        from config.database import is_sqlite_production
+        
+        assert is_sqlite_production("sqlite:///./comedy_peach.db", "production")
+        assert not is_sqlite_production("sqlite:///:memory:", "production")
+        assert not is_sqlite_production("sqlite:///./comedy_peach.db", "development")
+        assert not is_sqlite_production("postgresql://u:p@localhost/db", "production")
+        
+    def test_production_engine_pragmas(self, tmp_path):
+        """Connections come from a QueuePool with WAL and synchronous=NORMAL"""
+        from sqlalchemy import text
+        from sqlalchemy.pool import QueuePool
+        from config.database import create_db_engine
+        
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}", sqlite_mode="production")
+        try:
+            assert isinstance(engine.pool, QueuePool)
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                # synchronous=NORMAL is 1
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+        finally:
+            engine.dispose()
+            
+    @pytest.mark.asyncio
+    async def test_run_db_retries_locked_writes(self, db_session):
+        """A unit of work that loses the write lock is rolled back and re-run"""
+        from unittest.mock import patch
+        from sqlalchemy.exc import OperationalError
+        
+        calls = []
+        
+        def _write(db):
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            return "ok"
+        
+        with patch("config.database.is_sqlite_production", return_value=True), \
+             patch("config.database.asyncio.sleep"):
+            assert await run_db(db_session, _write) == "ok"
+        
+        assert len(calls) == 3
+        
+    @pytest.mark.asyncio
+    async def test_run_db_does_not_retry_other_errors(self, db_session):
+        from unittest.mock import patch
+        from sqlalchemy.exc import OperationalError
+        
+        def _write(db):
+            raise OperationalError("INSERT", {}, Exception("no such table: videos"))
+        
+        with patch("config.database.is_sqlite_production", return_value=True):
+            with pytest.raises(OperationalError):
+                await run_db(db_session, _write)
+
+class TestViewCounter:
+    """Test the write-behind view count buffer"""
+    
+    def _create_videos(self, db_session, count):
+        user = User(firebase_uid="views-uid", email="views@example.com")
+        db_session.add(user)
+        db_session.commit()
+        videos = [
+            Video(user_id=user.id, firebase_uid="views-uid", title=f"Views {i}", file_type="video", storage_key=f"videos/views_{i}.mp4")
+            for i in range(count)
+        ]
+        db_session.add_all(videos)
+        db_session.commit()
+        return videos
+    
+    def test_flush_coalesces_increments_into_one_statement(self, db_session):
+        from config.query_stats import start_query_stats
+        from config.view_counter import ViewCounter
+        
+        first, second = self._create_videos(db_session, 2)
+        counter = ViewCounter()
+        for _ in range(5):
+            counter.record(first.id)
+        assert counter.record(second.id) == 1
+        assert counter.pending(first.id) == 5
+        
+        stats = start_query_stats()
+        assert counter.flush(db_session.connection()) == 2
+        assert stats.count == 1
+        
+        db_session.refresh(first)
+        db_session.refresh(second)
+        assert first.view_count == 5
+        assert second.view_count == 1
+        assert counter.pending(first.id) == 0
+        
+    def test_failed_flush_keeps_increments(self):
+        from unittest.mock import MagicMock
+        from config.view_counter import ViewCounter
+        
+        counter = ViewCounter()
+        counter.record(1)
+        connection = MagicMock()
+        connection.execute.side_effect = RuntimeError("database is gone")
+        
+        with pytest.raises(RuntimeError):
+            counter.flush(connection)
+        
+        assert counter.pending(1) == 1
+        
+    def test_views_are_dropped_after_repeated_failures(self):
+        from unittest.mock import MagicMock
+        from config.view_counter import ViewCounter
+        
+        counter = ViewCounter(max_retries=2)
+        connection = MagicMock()
+        connection.execute.side_effect = RuntimeError("database is gone")
+        counter.record(1)
+        counter.record(1)
+        
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                counter.flush(connection)
+        
+        assert counter.pending(1) == 0
+        assert counter.dropped_views == 2
+        
+        # A successful flush resets the failure streak
+        connection.execute.side_effect = None
+        counter.record(1)
+        counter.flush(connection)
+        assert counter.failed_flushes == 0
+        
+    def test_flush_uses_the_injected_engine(self, tmp_path):
+        from sqlalchemy import text
+        from config.view_counter import ViewCounter
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'views.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO users (id, firebase_uid, email, is_active) VALUES (1, 'u', 'u@example.com', 1)"))
+            connection.execute(text(
+                "INSERT INTO videos (id, user_id, firebase_uid, title, file_type, storage_key, view_count) "
+                "VALUES (7, 1, 'u', 'Set', 'video', 'videos/7.mp4', 0)"
+            ))
+        
+        counter = ViewCounter(bind=engine)
+        counter.record(7)
+        assert counter.flush() == 1
+        
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT view_count FROM videos WHERE id = 7")).scalar() == 1
+        engine.dispose()
+        
+    @pytest.mark.asyncio
+    async def test_size_threshold_flushes_early_and_stop_flushes_the_rest(self):
+        import asyncio
+        from unittest.mock import patch
+        from config.view_counter import ViewCounter
+        
+        counter = ViewCounter(flush_interval=3600, flush_size=2)
+        with patch.object(counter, "flush", wraps=counter.drain) as flush:
+            counter.start()
+            counter.record(1)
+            counter.record(2)
+            for _ in range(100):
+                if flush.call_count:
+                    break
+                await asyncio.sleep(0.01)
+            assert flush.call_count == 1
+            
+            counter.record(3)
+            await counter.stop()
+            assert flush.call_count == 2
+            assert counter.pending(3) == 0
+
+class TestInitDb:
+    """Test that startup migrates the schema with Alembic instead of create_all"""
+    
+    def _version(self, engine):
+        from sqlalchemy import text
+        
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    
+    def _head(self):
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+        from config.database import MIGRATIONS_PATH
+        
+        config = Config()
+        config.set_main_option("script_location", MIGRATIONS_PATH)
+        return ScriptDirectory.from_config(config).get_current_head()
+    
+    def test_new_database_is_migrated_to_head(self, tmp_path):
+        from config.database import init_db, schema_matches_models
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+        init_db(engine)
+        
+        assert self._version(engine) == self._head()
+        with engine.connect() as connection:
+            assert schema_matches_models(connection)
+        engine.dispose()
+        
+    def test_created_database_is_stamped_at_head(self, tmp_path):
+        from config.database import init_db
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'created.db'}")
+        Base.metadata.create_all(bind=engine)
+        init_db(engine)
+        
+        assert self._version(engine) == self._head()
+        engine.dispose()
+        
+    def test_pre_migration_database_is_upgraded(self, tmp_path):
+        from alembic import command
+        from alembic.config import Config
+        from sqlalchemy import inspect, text
+        from config.database import MIGRATIONS_PATH, init_db
+        
+        # The initial schema with no alembic_version, plus a table a later create_all added
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        config = Config()
+        config.set_main_option("script_location", MIGRATIONS_PATH)
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "0001")
+            connection.execute(text("DROP TABLE alembic_version"))
+        Base.metadata.tables["transcript_segments"].create(engine)
+        
+        init_db(engine)
+        
+        assert self._version(engine) == self._head()
+        assert "video_count" in {column["name"] for column in inspect(engine).get_columns("users")}
+        engine.dispose()
@@ -155,8 +155,75 @@ class TestUnlikeVideo:
         response = client.delete(f"/api/videos/{test_video.id}/likes")
         assert response.status_code == 401
 
-
-
+class TestLikeUserStats:
+    """Test likes keep the video owner's total_likes in step"""
+    
+    def test_like_and_unlike_update_owner_total_likes(self, client, mock_firebase_token, auth_headers, test_video, test_user, db_session):
+        response = client.post(f"/api/videos/{test_video.id}/likes", headers=auth_headers)
+        assert response.status_code == 200
+        
+        db_session.refresh(test_user)
+        assert test_user.total_likes == 1
+        
+        response = client.delete(f"/api/videos/{test_video.id}/likes", headers=auth_headers)
+        assert response.status_code == 200
+        
+        db_session.refresh(test_user)
+        assert test_user.total_likes == 0
+        
+class TestLikeStatus:
+    """Test batched liked-by-me lookups"""
+    
+    def test_like_status_batch(self, client, mock_firebase_token, auth_headers, test_video, test_user, db_session):
+        from models.models import Like
+        
+        db_session.add(Like(user_id=test_user.id, video_id=test_video.id, firebase_uid=test_user.firebase_uid))
+        db_session.commit()
+        
+        response = client.post(
+            "/api/videos/likes/status",
+            json={"video_ids": [test_video.id, 99999]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["statuses"] == {str(test_video.id): True, "99999": False}
+        
+    def test_like_status_rejects_more_than_500_ids(self, client, mock_firebase_token, auth_headers):
+        response = client.post(
+            "/api/videos/likes/status",
+            json={"video_ids": list(range(501))},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 422
+        
+    def test_feed_includes_liked_by_me(self, client, mock_firebase_token, auth_headers, test_video, test_user, db_session):
+        from models.models import Video
+        
+        other_video = Video(
+            user_id=test_user.id,
+            firebase_uid=test_user.firebase_uid,
+            title="Not Liked",
+            file_type="video",
+            storage_key="videos/not_liked.mp4",
+            is_public=True
+        )
+        db_session.add(other_video)
+        db_session.commit()
+        
+        response = client.post(f"/api/videos/{test_video.id}/likes", headers=auth_headers)
+        assert response.status_code == 200
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/video.mp4"
+            response = client.get("/api/videos/?feed=home", headers=auth_headers)
+        
+        assert response.status_code == 200
+        liked = {video["id"]: video["liked_by_me"] for video in response.json()["videos"]}
+        assert liked[test_video.id] is True
+        assert liked[other_video.id] is False
+        
 class TestLikeWorkflow:
     """Test complete like/unlike workflow"""
     
@@ -264,4 +331,68 @@ class TestMultiUserLikes:
         
         # Verify like count in database
         db_session.refresh(test_video)
-        assert test_video.like_count == 1 
\ No newline at end of file
+        assert test_video.like_count == 1 
+
+class TestConcurrentLikes:
+    """Test the atomic like path under parallel load"""
+    
+    def test_parallel_likes_keep_exact_count(self, tmp_path):
+        """Thousands of parallel likes (with duplicates) and unlikes leave exact counters"""
+        from concurrent.futures import ThreadPoolExecutor
+        from sqlalchemy import insert
+        from sqlalchemy.orm import sessionmaker
+        from config.database import Base, create_db_engine
+        from models.models import User, Video, Like
+        from routes.likes import add_like, remove_like
+        
+        users = 2000
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'likes.db'}", sqlite_mode="production")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        
+        with engine.begin() as conn:
+            conn.execute(insert(User), [
+                {"id": i, "firebase_uid": f"liker-{i}", "email": f"liker-{i}@example.com"}
+                for i in range(1, users + 1)
+            ])
+        setup = Session()
+        video = Video(user_id=1, firebase_uid="liker-1", title="Viral Set", file_type="video", storage_key="viral.mp4")
+        setup.add(video)
+        setup.commit()
+        video_id = video.id
+        setup.close()
+        
+        def like(user_id):
+            db = Session()
+            try:
+                return add_like(db, user_id, db.get(Video, video_id), f"liker-{user_id}")[0]
+            finally:
+                db.close()
+        
+        def unlike(user_id):
+            db = Session()
+            try:
+                return remove_like(db, user_id, db.get(Video, video_id))[0]
+            finally:
+                db.close()
+        
+        try:
+            # Every user likes once, the first 500 users double-tap
+            attempts = list(range(1, users + 1)) + list(range(1, 501))
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(like, attempts))
+            assert sum(results) == users
+            
+            # Half the users unlike, some of them twice
+            removals = list(range(1, users // 2 + 1)) + list(range(1, 101))
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(unlike, removals))
+            assert sum(results) == users // 2
+            
+            check = Session()
+            assert check.get(Video, video_id).like_count == users // 2
+            assert check.query(Like).filter(Like.video_id == video_id).count() == users // 2
+            assert check.get(User, 1).total_likes == users // 2
+            check.close()
+        finally:
+            engine.dispose()
@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import patch
+
+from storage.base import UploadMetadata
+from storage.local_storage import LocalStorage
+
+CONTENT = bytes(range(256)) * 40  # 10 KB
+
+@pytest.fixture
+def local_storage(tmp_path):
+    """Serve /media from a LocalStorage rooted in a temp directory"""
+    storage = LocalStorage(root_dir=str(tmp_path), base_url="http://testserver", secret_key="test-secret")
+    with patch("routes.media.get_storage", return_value=storage):
+        yield storage
+
+@pytest.fixture
+def stored_file(local_storage):
+    path = local_storage.path_for("videos/1/set.mp4")
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    return local_storage.get_public_url("videos/1/set.mp4")
+
+class TestMediaUpload:
+    """Test uploads to signed local URLs"""
+
+    def test_upload_to_presigned_url(self, client, local_storage):
+        presigned = local_storage.generate_presigned_url(
+            "videos/1/new.mp4",
+            metadata=UploadMetadata(filename="new.mp4", content_type="video/mp4", content_length=len(CONTENT))
+        )
+        
+        response = client.put(presigned.upload_url, content=CONTENT, headers={"Content-Type": "video/mp4"})
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        assert local_storage.path_for("videos/1/new.mp4").read_bytes() == CONTENT
+        assert local_storage.get_file_metadata("videos/1/new.mp4")["size"] == len(CONTENT)
+        # No temp files left beside the upload
+        assert [p.name for p in local_storage.path_for("videos/1/new.mp4").parent.iterdir()] == ["new.mp4"]
+
+    def test_upload_larger_than_signed_size(self, client, local_storage):
+        presigned = local_storage.generate_presigned_url(
+            "videos/1/new.mp4",
+            metadata=UploadMetadata(filename="new.mp4", content_type="video/mp4", content_length=100)
+        )
+        
+        response = client.put(presigned.upload_url, content=CONTENT)
+        
+        assert response.status_code == 413
+        assert not local_storage.file_exists("videos/1/new.mp4")
+
+    def test_upload_with_download_signature_rejected(self, client, local_storage):
+        response = client.put(local_storage.get_public_url("videos/1/new.mp4"), content=CONTENT)
+        assert response.status_code == 403
+        assert not local_storage.file_exists("videos/1/new.mp4")
+
+class TestMediaDownload:
+    """Test serving local files with ranges and validators"""
+
+    def test_full_download(self, client, stored_file):
+        response = client.get(stored_file)
+        
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "gzip" not in response.headers.get("content-encoding", "")
+        assert response.headers["cache-control"].startswith("private, max-age=")
+
+    def test_range_requests(self, client, stored_file):
+        response = client.get(stored_file, headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+        assert response.headers["content-length"] == "100"
+        
+        # Open-ended and suffix ranges, and an end past EOF
+        assert client.get(stored_file, headers={"Range": "bytes=10000-"}).content == CONTENT[10000:]
+        assert client.get(stored_file, headers={"Range": "bytes=-5"}).content == CONTENT[-5:]
+        assert client.get(stored_file, headers={"Range": "bytes=10230-99999"}).content == CONTENT[10230:]
+
+    def test_unsatisfiable_and_ignored_ranges(self, client, stored_file):
+        response = client.get(stored_file, headers={"Range": f"bytes={len(CONTENT)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+        
+        # Multiple ranges and malformed headers get the whole file
+        for header in ("bytes=0-1,5-6", "items=0-5", "bytes=9-2"):
+            response = client.get(stored_file, headers={"Range": header})
+            assert response.status_code == 200
+            assert response.content == CONTENT
+
+    def test_if_none_match(self, client, stored_file):
+        etag = client.get(stored_file).headers["etag"]
+        
+        response = client.get(stored_file, headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_if_range(self, client, stored_file):
+        etag = client.get(stored_file).headers["etag"]
+        
+        assert client.get(stored_file, headers={"Range": "bytes=0-9", "If-Range": etag}).status_code == 206
+        stale = client.get(stored_file, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        assert stale.status_code == 200
+        assert stale.content == CONTENT
+
+    def test_head(self, client, stored_file):
+        response = client.head(stored_file, headers={"Range": "bytes=0-9"})
+        assert response.status_code == 206
+        assert response.headers["content-length"] == "10"
+        assert response.content == b""
+
+    def test_signature_required(self, client, stored_file):
+        assert client.get(stored_file.replace("signature=", "signature=0")).status_code == 403
+        assert client.get(stored_file.replace("set.mp4", "other.mp4")).status_code == 403
+        assert client.get("/media/videos/1/set.mp4").status_code == 422
+
+    def test_missing_file(self, client, local_storage):
+        assert client.get(local_storage.get_public_url("videos/1/missing.mp4")).status_code == 404
+
+    def test_accel_redirect(self, client, stored_file):
+        with patch("routes.media.LOCAL_STORAGE_ACCEL_REDIRECT", "/protected-media/"):
+            response = client.get(stored_file, headers={"Range": "bytes=0-9"})
+        
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == "/protected-media/videos/1/set.mp4"
+        assert response.content == b""
+
+    def test_object_store_backends_have_no_media_endpoint(self, client, stored_file):
+        with patch("routes.media.get_storage", return_value=object()):
+            assert client.get(stored_file).status_code == 404
@@ -0,0 +1,129 @@
+import logging
+import re
+from unittest.mock import patch
+
+import pytest
+
+class TestMetricsRendering:
+    """Test the Prometheus text exposition"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        from config.metrics import Histogram
+        
+        histogram = Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(5.0, "/a")
+        
+        lines = histogram.render()
+        assert lines[:2] == ["# HELP test_latency_seconds Test latency", "# TYPE test_latency_seconds histogram"]
+        assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="1"} 2' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'test_latency_seconds_sum{route="/a"} 5.55' in lines
+        assert 'test_latency_seconds_count{route="/a"} 3' in lines
+
+    def test_label_values_are_escaped(self):
+        from config.metrics import Counter
+        
+        counter = Counter("test_total", "Test counter", ("path",))
+        counter.inc('say "hi"\n')
+        assert counter.render()[-1] == 'test_total{path="say \\"hi\\"\\n"} 1'
+
+    def test_instrumented_methods_record_outcome(self):
+        from config.metrics import Histogram, instrument_methods
+
+        class Backend:
+            def file_exists(self, key):
+                return True
+
+            def get_file_metadata(self, key):
+                raise ConnectionError("storage down")
+        
+        histogram = Histogram("test_storage_seconds", "Test storage", ("backend", "operation", "outcome"))
+        backend = instrument_methods(Backend(), histogram, ("file_exists", "get_file_metadata"), "minio")
+        
+        assert backend.file_exists("a") is True
+        with pytest.raises(ConnectionError):
+            backend.get_file_metadata("a")
+        
+        lines = histogram.render()
+        assert 'test_storage_seconds_count{backend="minio",operation="file_exists",outcome="ok"} 1' in lines
+        assert 'test_storage_seconds_count{backend="minio",operation="get_file_metadata",outcome="error"} 1' in lines
+
+    def test_pool_saturation(self, tmp_path):
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import QueuePool
+        from config import metrics
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2, max_overflow=2)
+        metrics.instrument_pool(engine, "test-pool")
+        
+        try:
+            engine.connect().close()
+            # Instrumentation survives the pool being replaced
+            engine.dispose()
+            connection = engine.connect()
+            text = metrics.render_metrics()
+            connection.close()
+        finally:
+            engine.dispose()
+            metrics._pools.pop("test-pool")
+        
+        assert 'db_pool_checked_out{engine="test-pool"} 1' in text
+        assert 'db_pool_capacity{engine="test-pool"} 4' in text
+        assert 'db_pool_saturation{engine="test-pool"} 0.25' in text
+        assert 'db_pool_checkout_duration_seconds_count{engine="test-pool"} 1' in text
+        assert 'db_pool_connections_opened_total{engine="test-pool"} 2' in text
+
+class TestMetricsEndpoint:
+    """Test the /metrics endpoint and request instrumentation"""
+
+    def _sample(self, text, name, **labels):
+        label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        match = re.search(rf"^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$", text, re.MULTILINE)
+        return float(match.group(1)) if match else 0.0
+
+    def test_request_latency_by_route_template(self, client, test_video):
+        before = client.get("/metrics").text
+        client.get(f"/api/ml/video/{test_video.id}/status")
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        labels = {"method": "GET", "route": "/api/ml/video/{video_id}/status", "status": "200"}
+        assert self._sample(response.text, "http_request_duration_seconds_count", **labels) == \
+            self._sample(before, "http_request_duration_seconds_count", **labels) + 1
+        assert self._sample(response.text, "db_statements_per_request_count", route="/api/ml/video/{video_id}/status") >= 1
+        assert f"/api/ml/video/{test_video.id}/status" not in response.text
+
+    def test_unmatched_paths_share_one_label(self, client):
+        client.get("/no/such/path/123")
+        text = client.get("/metrics").text
+        assert self._sample(text, "http_request_duration_seconds_count", method="GET", route="unmatched", status="404") >= 1
+        assert "/no/such/path/123" not in text
+
+    def test_statement_durations_by_operation(self, client, test_video):
+        client.get(f"/api/ml/video/{test_video.id}/status")
+        text = client.get("/metrics").text
+        assert self._sample(text, "db_statement_duration_seconds_count", operation="SELECT") >= 1
+
+    def test_firebase_verification_is_timed(self, client):
+        from config.firebase_config import verify_firebase_token
+        
+        before = self._sample(client.get("/metrics").text, "firebase_verify_duration_seconds_count", result="invalid")
+        with patch("config.firebase_config.auth.verify_id_token", side_effect=Exception("expired")):
+            with pytest.raises(ValueError):
+                verify_firebase_token("not-a-real-token")
+        after = self._sample(client.get("/metrics").text, "firebase_verify_duration_seconds_count", result="invalid")
+        assert after == before + 1
+
+    def test_slow_requests_logged_with_query_breakdown(self, client, test_video, caplog):
+        with patch("main.SLOW_REQUEST_SECONDS", 0.0), caplog.at_level(logging.WARNING, logger="slow_requests"):
+            client.get(f"/api/ml/video/{test_video.id}/status")
+        
+        messages = [record.getMessage() for record in caplog.records if record.name == "slow_requests"]
+        assert len(messages) == 1
+        assert "/api/ml/video/{video_id}/status" in messages[0]
+        assert "SQL statements" in messages[0]
+        assert "SELECT videos.id" in messages[0]
@@ -185,6 +185,392 @@ class TestMLScoreResults:
         assert analytics.confidence_score is None
         assert analytics.word_count is None
 
+class TestTranscriptSegmentIngest:
+    """Test transcript segments are stored in their own table on ingest"""
+    
+    def _submit(self, client, video_id, segment_count):
+        return client.post("/api/ml/score-results", json={
+            "video_id": video_id,
+            "processing_version": "v2.0.0",
+            "transcript": [
+                {"text": f"Bit {i}", "start_time": i * 10.0, "end_time": i * 10.0 + 9.0, "funniness_score": 0.5}
+                for i in range(segment_count)
+            ],
+            "overall_funniness_score": 0.5
+        })
+    
+    def test_segments_bulk_inserted(self, client, db_session, test_video):
+        from models.models import TranscriptSegment
+        
+        response = self._submit(client, test_video.id, 5)
+        assert response.status_code == 200
+        
+        segments = db_session.query(TranscriptSegment).filter(
+            TranscriptSegment.analytics_id == response.json()["analytics_id"]
+        ).order_by(TranscriptSegment.position).all()
+        assert [segment.text for segment in segments] == [f"Bit {i}" for i in range(5)]
+        assert segments[3].start_time == 30.0
+        
+    def test_resubmission_replaces_segments(self, client, db_session, test_video):
+        from models.models import TranscriptSegment
+        
+        self._submit(client, test_video.id, 5)
+        response = self._submit(client, test_video.id, 2)
+        assert response.status_code == 200
+        
+        assert db_session.query(TranscriptSegment).filter(
+            TranscriptSegment.analytics_id == response.json()["analytics_id"]
+        ).count() == 2
+
+class TestBulkScoreResults:
+    """Test bulk ML results ingestion"""
+    
+    def _record(self, video_id, score=0.5, segment_count=2):
+        return {
+            "video_id": video_id,
+            "processing_version": "v3.0.0",
+            "transcript": [
+                {"text": f"Bit {i}", "start_time": i * 10.0, "end_time": i * 10.0 + 9.0}
+                for i in range(segment_count)
+            ],
+            "overall_funniness_score": score
+        }
+    
+    def _ndjson(self, *lines):
+        return "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines).encode() + b"\n"
+    
+    def _post(self, client, body, **headers):
+        headers.setdefault("Content-Type", "application/x-ndjson")
+        return client.post("/api/ml/score-results/bulk", content=body, headers=headers)
+    
+    def _second_video(self, db_session, test_video):
+        from models.models import Video
+        
+        video = Video(
+            user_id=test_video.user_id,
+            firebase_uid=test_video.firebase_uid,
+            title="Second Set",
+            file_type="video",
+            storage_key="test/second.mp4"
+        )
+        db_session.add(video)
+        db_session.commit()
+        return video
+    
+    def test_ndjson_per_record_results(self, client, db_session, test_video):
+        from models.models import AnalyticsData, TranscriptSegment
+        
+        body = self._ndjson(self._record(test_video.id), "{not json", self._record(99999), {"video_id": test_video.id})
+        response = self._post(client, body)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["processed"] == 1
+        assert data["failed"] == 3
+        results = data["results"]
+        assert [result["line"] for result in results] == [1, 2, 3, 4]
+        assert results[0]["status"] == "ok" and results[0]["analytics_id"]
+        assert results[1]["status"] == "error"
+        assert results[2] == {"line": 3, "video_id": 99999, "status": "error", "analytics_id": None, "error": "Video not found"}
+        assert "processing_version" in results[3]["error"]
+        
+        analytics = db_session.query(AnalyticsData).filter(AnalyticsData.video_id == test_video.id).one()
+        assert analytics.id == results[0]["analytics_id"]
+        assert analytics.full_transcript_text == "Bit 0 Bit 1"
+        assert db_session.query(TranscriptSegment).filter(TranscriptSegment.analytics_id == analytics.id).count() == 2
+        db_session.refresh(test_video)
+        assert test_video.is_processed is True
+        assert test_video.processing_status == "completed"
+        
+    def test_updates_existing_and_last_record_wins(self, client, db_session, test_video):
+        from models.models import AnalyticsData, TranscriptSegment
+        
+        first = client.post("/api/ml/score-results", json=self._record(test_video.id, segment_count=5)).json()
+        body = self._ndjson(self._record(test_video.id, score=0.3), self._record(test_video.id, score=0.9, segment_count=1))
+        results = self._post(client, body).json()["results"]
+        
+        assert [result["analytics_id"] for result in results] == [first["analytics_id"]] * 2
+        analytics = db_session.query(AnalyticsData).filter(AnalyticsData.video_id == test_video.id).one()
+        assert analytics.overall_funniness_score == 0.9
+        assert db_session.query(TranscriptSegment).filter(TranscriptSegment.analytics_id == analytics.id).count() == 1
+        
+    def test_gzip_body(self, client, test_video):
+        import gzip
+        
+        body = gzip.compress(self._ndjson(self._record(test_video.id)))
+        response = self._post(client, body, **{"Content-Encoding": "gzip"})
+        
+        assert response.status_code == 200
+        assert response.json()["processed"] == 1
+        
+    def test_malformed_gzip_rejected(self, client, test_video):
+        response = self._post(client, b"definitely not gzip", **{"Content-Encoding": "gzip"})
+        assert response.status_code == 400
+        
+    def test_msgpack_body(self, client, db_session, test_video):
+        import msgpack
+        
+        second = self._second_video(db_session, test_video)
+        body = msgpack.packb(self._record(test_video.id)) + msgpack.packb(self._record(second.id))
+        response = self._post(client, body, **{"Content-Type": "application/msgpack"})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["processed"] == 2
+        assert [result["video_id"] for result in data["results"]] == [test_video.id, second.id]
+        
+    def test_batches_use_fixed_statement_count(self, client, db_session, test_video):
+        second = self._second_video(db_session, test_video)
+        records = [self._record(test_video.id), self._record(second.id)] * 3
+        
+        with patch("routes.ml.ML_BULK_BATCH_SIZE", 2):
+            response = self._post(client, self._ndjson(*records))
+        
+        assert response.status_code == 200
+        assert response.json()["processed"] == 6
+        # Per batch: video lookup, analytics lookup, upsert(s), segment delete + insert, video status update
+        assert int(response.headers["X-Query-Count"]) <= 3 * 7
+        
+    def test_unsupported_content_type(self, client):
+        response = self._post(client, b"video_id,score", **{"Content-Type": "text/csv"})
+        assert response.status_code == 415
+
+class TestProcessingJobQueue:
+    """Test the ML job queue endpoints"""
+    
+    def _enqueue(self, client, video_id, priority=0):
+        return client.post("/api/ml/jobs", json={"video_id": video_id, "priority": priority})
+    
+    def _lease(self, client, worker_id="worker-1", limit=1, lease_seconds=60):
+        return client.post("/api/ml/jobs/lease", json={"worker_id": worker_id, "limit": limit, "lease_seconds": lease_seconds})
+    
+    def _second_video(self, db_session, test_video):
+        from models.models import Video
+        
+        video = Video(user_id=test_video.user_id, firebase_uid=test_video.firebase_uid, title="Backfill", file_type="video", storage_key="test/backfill.mp4")
+        db_session.add(video)
+        db_session.commit()
+        return video
+    
+    def test_enqueue_is_idempotent_per_video(self, client, test_video):
+        first = self._enqueue(client, test_video.id)
+        second = self._enqueue(client, test_video.id, priority=5)
+        
+        assert first.status_code == 200
+        assert second.json()["id"] == first.json()["id"]
+        assert second.json()["priority"] == 5
+        assert first.json()["status"] == "queued"
+        
+    def test_concurrent_enqueue_returns_the_committed_job(self, db_session, test_video):
+        from models import job as job_module
+        from models.job import enqueue_job
+        
+        first = enqueue_job(db_session, test_video.id)
+        db_session.commit()
+        
+        # The second enqueue's check ran before the first insert was visible
+        real_active_job = job_module.active_job
+        with patch("models.job.active_job", side_effect=[None, first]) as lookup:
+            second = enqueue_job(db_session, test_video.id, priority=7)
+        db_session.commit()
+        
+        assert lookup.call_count == 2
+        assert second.id == first.id
+        assert second.priority == 7
+        assert real_active_job(db_session, test_video.id, "ml_analysis").id == first.id
+        
+    def test_unique_index_rejects_a_second_active_job(self, db_session, test_video):
+        from sqlalchemy.exc import IntegrityError
+        from models.job import ProcessingJob, enqueue_job, utcnow
+        
+        enqueue_job(db_session, test_video.id)
+        db_session.commit()
+        with pytest.raises(IntegrityError):
+            with db_session.begin_nested():
+                db_session.add(ProcessingJob(video_id=test_video.id, kind="ml_analysis", status="queued", run_after=utcnow()))
+        
+        # Finished jobs don't count
+        with db_session.begin_nested():
+            db_session.add(ProcessingJob(video_id=test_video.id, kind="ml_analysis", status="completed", run_after=utcnow()))
+        
+    def test_enqueue_unknown_video(self, client):
+        assert self._enqueue(client, 99999).status_code == 404
+        
+    def test_lease_orders_by_priority(self, client, db_session, test_video):
+        backfill = self._second_video(db_session, test_video)
+        self._enqueue(client, backfill.id, priority=0)
+        self._enqueue(client, test_video.id, priority=10)
+        
+        response = self._lease(client, limit=1)
+        assert response.status_code == 200
+        jobs = response.json()["jobs"]
+        assert [job["video_id"] for job in jobs] == [test_video.id]
+        assert jobs[0]["status"] == "leased"
+        assert jobs[0]["attempts"] == 1
+        assert jobs[0]["storage_key"] == test_video.storage_key
+        
+        # A second worker gets the remaining job, then nothing
+        assert [job["video_id"] for job in self._lease(client, "worker-2").json()["jobs"]] == [backfill.id]
+        assert self._lease(client, "worker-3").json()["jobs"] == []
+        db_session.refresh(test_video)
+        assert test_video.processing_status == "processing"
+        
+    def test_heartbeat_and_complete_require_the_lease(self, client, test_video):
+        self._enqueue(client, test_video.id)
+        job_id = self._lease(client).json()["jobs"][0]["id"]
+        
+        assert client.post(f"/api/ml/jobs/{job_id}/heartbeat", json={"worker_id": "worker-1"}).status_code == 200
+        assert client.post(f"/api/ml/jobs/{job_id}/heartbeat", json={"worker_id": "intruder"}).status_code == 409
+        assert client.post(f"/api/ml/jobs/{job_id}/complete", json={"worker_id": "intruder"}).status_code == 409
+        
+        response = client.post(f"/api/ml/jobs/{job_id}/complete", json={"worker_id": "worker-1"})
+        assert response.json() == {"job_id": job_id, "status": "completed"}
+        assert client.post(f"/api/ml/jobs/{job_id}/heartbeat", json={"worker_id": "worker-1"}).status_code == 409
+        
+    def test_failure_retries_with_backoff(self, client, db_session, test_video):
+        from datetime import datetime
+        
+        self._enqueue(client, test_video.id)
+        job_id = self._lease(client).json()["jobs"][0]["id"]
+        
+        response = client.post(f"/api/ml/jobs/{job_id}/fail", json={"worker_id": "worker-1", "error": "CUDA out of memory"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "queued"
+        assert data["last_error"] == "CUDA out of memory"
+        assert datetime.fromisoformat(data["run_after"].replace("Z", "")) > datetime.utcnow()
+        
+        # Backing off, so not leasable yet
+        assert self._lease(client).json()["jobs"] == []
+        db_session.refresh(test_video)
+        assert test_video.processing_status == "pending"
+        
+    def test_failure_without_retry_fails_job_and_video(self, client, db_session, test_video):
+        self._enqueue(client, test_video.id)
+        job_id = self._lease(client).json()["jobs"][0]["id"]
+        
+        response = client.post(f"/api/ml/jobs/{job_id}/fail", json={"worker_id": "worker-1", "error": "Corrupt file", "retry": False})
+        assert response.json()["status"] == "failed"
+        db_session.refresh(test_video)
+        assert test_video.processing_status == "failed"
+        
+    def test_expired_lease_is_released(self, db_session, test_video):
+        from models.job import ProcessingJob, enqueue_job, lease_jobs
+        
+        enqueue_job(db_session, test_video.id)
+        db_session.commit()
+        first = lease_jobs(db_session, "crashed-worker", lease_seconds=-1)
+        second = lease_jobs(db_session, "worker-2")
+        
+        assert [job.id for job in second] == [first[0].id]
+        assert second[0].attempts == 2
+        assert second[0].leased_by == "worker-2"
+        
+    def test_expired_lease_without_attempts_left_fails(self, db_session, test_video):
+        from models.job import ProcessingJob, enqueue_job, lease_jobs
+        
+        job = enqueue_job(db_session, test_video.id)
+        job.max_attempts = 1
+        db_session.commit()
+        lease_jobs(db_session, "crashed-worker", lease_seconds=-1)
+        
+        assert lease_jobs(db_session, "worker-2") == []
+        job = db_session.query(ProcessingJob).filter(ProcessingJob.video_id == test_video.id).one()
+        assert job.status == "failed"
+        assert job.last_error == "Lease expired"
+
+class TestMLWorker:
+    """Test the worker loop that runs the ML pipeline for leased jobs"""
+    
+    @pytest.fixture
+    def session_factory(self, db_session):
+        from sqlalchemy.orm import sessionmaker
+        
+        return sessionmaker(bind=db_session.get_bind(), autoflush=False)
+    
+    def _job(self, db_session, test_video):
+        from models.job import enqueue_job
+        
+        job = enqueue_job(db_session, test_video.id)
+        db_session.commit()
+        return job.id
+    
+    def test_successful_handler_completes_job(self, db_session, test_video, session_factory):
+        from models.job import ProcessingJob
+        from workers.base import run_worker
+        
+        job_id = self._job(db_session, test_video)
+        seen = []
+        processed = run_worker(
+            "ml_analysis", lambda job, storage_key, lease: seen.append((job.id, storage_key)),
+            worker_id="worker-1", once=True, session_factory=session_factory
+        )
+        
+        assert processed == 1
+        assert seen == [(job_id, test_video.storage_key)]
+        job = db_session.get(ProcessingJob, job_id)
+        db_session.refresh(job)
+        assert job.status == "completed"
+        assert job.completed_at is not None
+        
+    def test_failing_handler_requeues_and_permanent_error_fails(self, db_session, test_video, session_factory):
+        from models.job import ProcessingJob
+        from workers.base import PermanentJobError, run_next_job
+        
+        job_id = self._job(db_session, test_video)
+        
+        def flaky(job, storage_key, lease):
+            raise RuntimeError("Transcoder crashed")
+        
+        run_next_job("ml_analysis", flaky, "worker-1", session_factory=session_factory)
+        job = db_session.get(ProcessingJob, job_id)
+        db_session.refresh(job)
+        assert job.status == "queued"
+        assert job.last_error == "Transcoder crashed"
+        
+        job.run_after = job.created_at
+        db_session.commit()
+        
+        def broken(job, storage_key, lease):
+            raise PermanentJobError("Invalid pipeline output")
+        
+        run_next_job("ml_analysis", broken, "worker-1", session_factory=session_factory)
+        db_session.refresh(job)
+        assert job.status == "failed"
+        
+    def test_ml_pipeline_stores_results(self, db_session, test_video, session_factory, tmp_path):
+        import sys
+        from models.models import AnalyticsData
+        from workers import ml_worker
+        from workers.base import run_worker
+        
+        output = tmp_path / "scores.json"
+        output.write_text(json.dumps({
+            "processing_version": "pipeline-1",
+            "transcript": [{"text": "Hello", "start_time": 0.0, "end_time": 1.0}],
+            "overall_funniness_score": 0.6
+        }))
+        # Stands in for the mlmodel pipeline: prints the scores for the video it was given
+        command = f"{sys.executable} -c 'import sys; print(open(sys.argv[1]).read())' {output} {{video_id}} {{storage_key}}"
+        self._job(db_session, test_video)
+        
+        with patch.object(ml_worker, "ML_PIPELINE_COMMAND", command):
+            run_worker("ml_analysis", ml_worker.run_ml_pipeline, worker_id="worker-1", once=True, session_factory=session_factory)
+        
+        analytics = db_session.query(AnalyticsData).filter(AnalyticsData.video_id == test_video.id).one()
+        assert analytics.processing_version == "pipeline-1"
+        db_session.refresh(test_video)
+        assert test_video.processing_status == "completed"
+        
+    def test_invalid_pipeline_output_is_permanent(self, test_video):
+        from workers.base import PermanentJobError
+        from workers.ml_worker import parse_pipeline_output
+        
+        with pytest.raises(PermanentJobError):
+            parse_pipeline_output("Traceback (most recent call last):", test_video.id)
+        with pytest.raises(PermanentJobError):
+            parse_pipeline_output(json.dumps({"processing_version": "v1"}), test_video.id)
+
 class TestMLProcessingStatus:
     """Test ML processing status updates"""
     
@@ -279,6 +665,33 @@ class TestGetProcessingStatus:
         assert data["has_analytics"] is True
         assert data["processing_version"] == "v1.0.0"
         
+    def test_get_processing_status_skips_analytics_json(self, client, test_video, db_session, engine):
+        """The status check selects scalar columns only"""
+        from sqlalchemy import event
+        from models.models import AnalyticsData
+        
+        db_session.add(AnalyticsData(
+            video_id=test_video.id,
+            transcript=[{"text": "bit", "start_time": 0.0, "end_time": 1.0}],
+            processing_version="v1.0.0"
+        ))
+        db_session.commit()
+        
+        statements = []
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", _capture)
+        try:
+            response = client.get(f"/api/ml/video/{test_video.id}/status")
+        finally:
+            event.remove(engine, "before_cursor_execute", _capture)
+        
+        assert response.status_code == 200
+        assert response.json()["processing_version"] == "v1.0.0"
+        assert statements
+        assert not any("transcript" in statement for statement in statements)
+        
     def test_get_processing_status_no_analytics(self, client, test_video):
         """Test processing status when no analytics exist"""
         response = client.get(f"/api/ml/video/{test_video.id}/status")
@@ -297,6 +710,130 @@ class TestGetProcessingStatus:
         response = client.get("/api/ml/video/99999/status")
         assert response.status_code == 404
 
+class TestProcessingStatusStream:
+    """Test push-based processing status (SSE)"""
+    
+    def _events(self, body):
+        return [
+            json.loads(line[len("data: "):])
+            for line in body.splitlines() if line.startswith("data: ")
+        ]
+    
+    def test_stream_sends_snapshot_and_closes_when_done(self, client, db_session, test_video):
+        test_video.processing_status = "completed"
+        test_video.is_processed = True
+        db_session.commit()
+        
+        response = client.get(f"/api/ml/status/stream?video_ids={test_video.id}")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "event: status" in response.text
+        assert self._events(response.text) == [{
+            "video_id": test_video.id,
+            "processing_status": "completed",
+            "is_processed": True,
+            "has_analytics": False,
+            "processing_version": None
+        }]
+        
+    def test_stream_is_not_gzipped(self, client, db_session, test_video):
+        test_video.processing_status = "failed"
+        db_session.commit()
+        
+        response = client.get(f"/api/ml/status/stream?video_ids={test_video.id}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers.get("content-encoding") != "gzip"
+        
+    def test_stream_rejects_bad_ids(self, client, test_video):
+        assert client.get("/api/ml/status/stream?video_ids=abc").status_code == 400
+        assert client.get("/api/ml/status/stream?video_ids=").status_code == 400
+        assert client.get(f"/api/ml/status/stream?video_ids={test_video.id},99999").status_code == 404
+        
+    @pytest.mark.asyncio
+    async def test_status_changes_are_published(self, client, test_video):
+        from config.status_events import status_broker
+        
+        subscription = status_broker.subscribe([test_video.id])
+        try:
+            # The app runs on the test client's own loop; delivery hops back to this one
+            response = client.post("/api/ml/processing-status", json={"video_id": test_video.id, "status": "processing"})
+            assert response.status_code == 200
+            events = await subscription.next_events(timeout=2)
+        finally:
+            status_broker.unsubscribe(subscription)
+        
+        assert [(event["video_id"], event["processing_status"]) for event in events] == [(test_video.id, "processing")]
+        
+    @pytest.mark.asyncio
+    async def test_poller_publishes_changes_from_other_processes(self, db_session, test_video):
+        """Test statuses written outside this process are published once per change"""
+        from sqlalchemy.orm import sessionmaker
+        from config.status_events import StatusBroker, StatusPoller
+        from routes.ml import fetch_video_statuses
+        
+        broker = StatusBroker()
+        poller = StatusPoller(broker, fetch_video_statuses, session_factory=sessionmaker(bind=db_session.get_bind()))
+        subscription = broker.subscribe([test_video.id])
+        try:
+            assert poller.poll(broker.followed_video_ids()) == 1
+            assert [event["processing_status"] for event in await subscription.next_events(timeout=1)] == ["pending"]
+            assert poller.poll(broker.followed_video_ids()) == 0
+            
+            test_video.processing_status = "processing"
+            db_session.commit()
+            assert poller.poll(broker.followed_video_ids()) == 1
+            events = await subscription.next_events(timeout=1)
+        finally:
+            broker.unsubscribe(subscription)
+        
+        assert [(event["video_id"], event["processing_status"]) for event in events] == [(test_video.id, "processing")]
+        # Nobody follows anything: no query, and the poller forgets the video
+        assert poller.poll(broker.followed_video_ids()) == 0
+        assert poller._last == {}
+        
+    @pytest.mark.asyncio
+    async def test_expired_lease_failure_is_published(self, client, db_session, test_video):
+        from datetime import datetime, timedelta
+        from config.status_events import status_broker
+        from models.job import enqueue_job
+        
+        job = enqueue_job(db_session, test_video.id)
+        job.status = "leased"
+        job.leased_by = "crashed-worker"
+        job.attempts = job.max_attempts = 1
+        job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+        
+        subscription = status_broker.subscribe([test_video.id])
+        try:
+            response = client.post("/api/ml/jobs/lease", json={"worker_id": "worker-2"})
+            assert response.json()["jobs"] == []
+            events = await subscription.next_events(timeout=2)
+        finally:
+            status_broker.unsubscribe(subscription)
+        
+        assert [(event["video_id"], event["processing_status"]) for event in events] == [(test_video.id, "failed")]
+        
+    @pytest.mark.asyncio
+    async def test_broker_coalesces_and_unsubscribes(self):
+        from config.status_events import StatusBroker
+        
+        broker = StatusBroker()
+        first = broker.subscribe([1, 2])
+        second = broker.subscribe([2])
+        
+        broker.publish(1, {"video_id": 1, "processing_status": "processing"})
+        broker.publish(1, {"video_id": 1, "processing_status": "completed"})
+        broker.publish(3, {"video_id": 3, "processing_status": "completed"})
+        
+        assert await first.next_events(timeout=1) == [{"video_id": 1, "processing_status": "completed"}]
+        assert await second.next_events(timeout=0.01) == []
+        assert broker.subscriber_count() == 2
+        
+        broker.unsubscribe(first)
+        broker.unsubscribe(second)
+        assert not broker.has_subscribers([1, 2])
+
 class TestMLHealthCheck:
     """Test ML health check endpoint"""
     
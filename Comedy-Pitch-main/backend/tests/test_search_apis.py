@@ -0,0 +1,151 @@
+import pytest
+from unittest.mock import patch
+
+from models.models import User, Video, AnalyticsData
+
+def make_video(db_session, user, title, description=None, is_public=True):
+    video = Video(
+        user_id=user.id,
+        firebase_uid=user.firebase_uid,
+        title=title,
+        description=description,
+        file_type="video",
+        storage_key=f"videos/{user.id}/{title}.mp4",
+        is_public=is_public
+    )
+    db_session.add(video)
+    db_session.commit()
+    return video
+
+@pytest.fixture(autouse=True)
+def mock_public_urls():
+    with patch('routes.videos.get_storage') as mock_get_storage:
+        mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/video.mp4"
+        yield
+
+class TestVideoSearch:
+    """Test ranked full-text search over videos"""
+
+    def search(self, client, auth_headers, **params):
+        response = client.get("/api/search", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_matches_title_description_and_transcript(self, client, mock_firebase_token, auth_headers, db_session, test_user):
+        in_title = make_video(db_session, test_user, "Landlord Troubles")
+        in_description = make_video(db_session, test_user, "Tuesday Set", description="Mostly about my landlord")
+        in_transcript = make_video(db_session, test_user, "Open Mic")
+        make_video(db_session, test_user, "Airline Food")
+        db_session.add(AnalyticsData(video_id=in_transcript.id, full_transcript_text="so my landlord calls me at 3am"))
+        db_session.commit()
+        
+        data = self.search(client, auth_headers, q="landlord")
+        
+        # Title outranks description outranks transcript
+        assert [result["id"] for result in data["results"]] == [in_title.id, in_description.id, in_transcript.id]
+        assert data["type"] == "videos"
+        assert data["has_more"] is False
+        assert data["results"][0]["user"]["id"] == test_user.id
+        assert "<mark>landlord</mark>" in data["results"][2]["snippet"]
+
+    def test_stemming_prefix_and_query_syntax(self, client, mock_firebase_token, auth_headers, db_session, test_user):
+        video = make_video(db_session, test_user, "Running Late Again")
+        
+        assert [r["id"] for r in self.search(client, auth_headers, q="runs late")["results"]] == [video.id]
+        assert [r["id"] for r in self.search(client, auth_headers, q="running la")["results"]] == [video.id]
+        # Operators and quotes are treated as plain words
+        assert self.search(client, auth_headers, q='late" OR NOT "x')["results"] == []
+        assert self.search(client, auth_headers, q="***")["results"] == []
+
+    def test_private_videos_excluded(self, client, mock_firebase_token, auth_headers, db_session, test_user):
+        make_video(db_session, test_user, "Secret Landlord Set", is_public=False)
+        assert self.search(client, auth_headers, q="landlord")["results"] == []
+
+    def test_index_follows_writes(self, client, mock_firebase_token, auth_headers, db_session, test_user):
+        video = make_video(db_session, test_user, "Dating Apps")
+        analytics = AnalyticsData(video_id=video.id, full_transcript_text="my therapist says")
+        db_session.add(analytics)
+        db_session.commit()
+        assert len(self.search(client, auth_headers, q="therapist")["results"]) == 1
+        
+        video.title = "Wedding Speeches"
+        analytics.full_transcript_text = "my dentist says"
+        db_session.commit()
+        assert self.search(client, auth_headers, q="dating")["results"] == []
+        assert self.search(client, auth_headers, q="therapist")["results"] == []
+        assert len(self.search(client, auth_headers, q="wedding dentist")["results"]) == 1
+        
+        test_user.stage_name = "Big Kev"
+        db_session.commit()
+        assert [r["id"] for r in self.search(client, auth_headers, q="kev")["results"]] == [video.id]
+        
+        db_session.delete(analytics)
+        db_session.delete(video)
+        db_session.commit()
+        assert self.search(client, auth_headers, q="wedding")["results"] == []
+
+    def test_cursor_pagination(self, client, mock_firebase_token, auth_headers, db_session, test_user):
+        videos = [make_video(db_session, test_user, f"Crowd Work {i}") for i in range(5)]
+        
+        seen = []
+        cursor = None
+        while True:
+            params = {"q": "crowd", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.search(client, auth_headers, **params)
+            seen.extend(result["id"] for result in data["results"])
+            if not data["has_more"]:
+                break
+            cursor = data["cursor"]
+        
+        assert sorted(seen) == sorted(video.id for video in videos)
+        assert len(seen) == len(set(seen))
+
+    def test_invalid_cursor(self, client, mock_firebase_token, auth_headers, test_user):
+        response = client.get("/api/search", params={"q": "crowd", "cursor": "nope"}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_requires_auth(self, client):
+        assert client.get("/api/search", params={"q": "crowd"}).status_code == 401
+
+class TestComedianSearch:
+    """Test name search over comedians"""
+
+    def test_matches_stage_and_display_names(self, client, mock_firebase_token, auth_headers, db_session, test_user):
+        comedian = User(firebase_uid="uid-kev", email="kev@example.com", display_name="Kevin Smith",
+                        stage_name="Big Kev", is_comedian=True)
+        fan = User(firebase_uid="uid-fan", email="fan@example.com", display_name="Kevin Fan")
+        db_session.add_all([comedian, fan])
+        db_session.commit()
+        
+        response = client.get("/api/search", params={"q": "kev", "type": "comedians"}, headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["type"] == "comedians"
+        assert [result["id"] for result in data["results"]] == [comedian.id]
+        assert data["results"][0]["stage_name"] == "Big Kev"
+        assert "email" not in data["results"][0]
+
+    def test_invalid_type(self, client, mock_firebase_token, auth_headers, test_user):
+        response = client.get("/api/search", params={"q": "kev", "type": "venues"}, headers=auth_headers)
+        assert response.status_code == 422
+
+class TestSearchIndexMaintenance:
+    """Test creating and rebuilding the index"""
+
+    def test_rebuild_matches_triggers(self, db_session, test_user):
+        from sqlalchemy import text
+        from models.search import rebuild_search_index
+        
+        video = make_video(db_session, test_user, "Airport Security", description="A bit about queues")
+        db_session.add(AnalyticsData(video_id=video.id, full_transcript_text="take your shoes off"))
+        db_session.commit()
+        query = text("SELECT title, description, performer, transcript FROM video_search WHERE rowid = :id")
+        maintained = db_session.execute(query, {"id": video.id}).one()
+        
+        rebuild_search_index(db_session.connection())
+        
+        assert db_session.execute(query, {"id": video.id}).one() == maintained
+        assert maintained.performer == "Test User"
@@ -4,7 +4,16 @@ import tempfile
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 
-from storage.base import StorageBackend, UploadMetadata, PresignedUrlResponse
+from storage.base import (
+    MAX_PARTS,
+    MIN_PART_SIZE,
+    MultipartUploadError,
+    PresignedUrlResponse,
+    StorageBackend,
+    UploadedPart,
+    UploadMetadata,
+    multipart_part_size
+)
 from storage.factory import get_storage_backend, get_storage
 
 class TestStorageBase:
@@ -37,6 +46,13 @@ class TestStorageBase:
         assert response.expires_in == 3600
         assert response.fields["key"] == "test/video.mp4"
 
+    def test_multipart_part_size(self):
+        """Test part sizes respect the S3 minimum and the 10,000 part limit"""
+        assert multipart_part_size(100 * 1024 ** 2, 64 * 1024 ** 2) == 64 * 1024 ** 2
+        assert multipart_part_size(100, 1024) == MIN_PART_SIZE
+        huge = 1024 ** 4
+        assert multipart_part_size(huge, 64 * 1024 ** 2) * MAX_PARTS >= huge
+
 class TestStorageFactory:
     """Test storage factory functionality"""
     
@@ -71,6 +87,23 @@ class TestStorageFactory:
             assert storage == mock_instance
             mock_s3_class.assert_called_once()
             
+    def test_get_local_storage(self, tmp_path):
+        """Test getting the local filesystem backend"""
+        from storage.local_storage import LocalStorage
+        
+        with patch.dict(os.environ, {"STORAGE_BACKEND": "local", "LOCAL_STORAGE_PATH": str(tmp_path), "LOCAL_STORAGE_SECRET": "s"}):
+            storage = get_storage_backend()
+            assert isinstance(storage, LocalStorage)
+            assert storage.root_dir == tmp_path.resolve()
+            
+    def test_default_storage_backend_is_minio(self):
+        """Test deployments that never set STORAGE_BACKEND keep using MinIO"""
+        from storage.factory import storage_backend_name
+        
+        with patch.dict(os.environ):
+            os.environ.pop("STORAGE_BACKEND", None)
+            assert storage_backend_name() == "minio"
+            
     def test_invalid_storage_backend(self):
         """Test invalid storage backend raises error"""
         with patch.dict(os.environ, {"STORAGE_BACKEND": "invalid"}):
@@ -95,6 +128,72 @@ class TestStorageFactory:
                 # Should not call get_storage_backend again
                 mock_get.assert_called_once()
 
+class TestStorageExecutor:
+    """Test blocking storage calls run on the bounded storage pool"""
+    
+    @pytest.mark.asyncio
+    async def test_run_storage_uses_storage_threads(self):
+        import threading
+        from storage.factory import STORAGE_THREAD_POOL_SIZE, get_storage_executor, run_storage
+        
+        name = await run_storage(lambda: threading.current_thread().name)
+        
+        assert name.startswith("storage")
+        assert name != threading.current_thread().name
+        assert get_storage_executor()._max_workers == STORAGE_THREAD_POOL_SIZE
+        
+    @pytest.mark.asyncio
+    async def test_run_storage_overlaps_calls(self):
+        import asyncio
+        import time
+        from storage.factory import run_storage
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(run_storage(time.sleep, 0.1) for _ in range(5)))
+        
+        # Five 100 ms calls overlap instead of blocking the loop one after another
+        assert time.perf_counter() - started < 0.4
+        
+    @pytest.mark.asyncio
+    async def test_run_storage_passes_arguments_and_errors(self):
+        from storage.factory import run_storage
+        
+        assert await run_storage(dict, key="videos/1/set.mp4") == {"key": "videos/1/set.mp4"}
+        with pytest.raises(ZeroDivisionError):
+            await run_storage(lambda: 1 / 0)
+
+class TestDownloadUrlCache:
+    """Test reuse and refresh of cached download URLs"""
+    
+    def test_reused_until_refresh_margin(self):
+        from storage.url_cache import DownloadUrlCache
+        
+        cache = DownloadUrlCache(max_size=10, refresh_margin=300)
+        with patch("storage.url_cache.time.monotonic", return_value=1000.0):
+            cache.put("videos/1/set.mp4", "private", "https://signed/1", valid_for=3600)
+        
+        with patch("storage.url_cache.time.monotonic", return_value=1000.0 + 3299):
+            assert cache.get("videos/1/set.mp4", "private") == "https://signed/1"
+            assert cache.get("videos/1/set.mp4", "public") is None
+        with patch("storage.url_cache.time.monotonic", return_value=1000.0 + 3300):
+            assert cache.get("videos/1/set.mp4", "private") is None
+        
+    def test_short_lived_urls_not_cached(self):
+        from storage.url_cache import DownloadUrlCache
+        
+        cache = DownloadUrlCache(max_size=10, refresh_margin=300)
+        cache.put("videos/1/set.mp4", "private", "https://signed/1", valid_for=300)
+        assert cache.get("videos/1/set.mp4", "private") is None
+        
+    def test_bounded(self):
+        from storage.url_cache import DownloadUrlCache
+        
+        cache = DownloadUrlCache(max_size=2, refresh_margin=0)
+        for i in range(3):
+            cache.put(f"videos/1/{i}.mp4", "public", f"https://cdn/{i}", valid_for=60)
+        assert cache.get("videos/1/0.mp4", "public") is None
+        assert cache.get("videos/1/2.mp4", "public") == "https://cdn/2"
+
 class TestMinIOStorageMocking:
     """Test MinIO storage with mocked dependencies"""
     
@@ -146,6 +245,77 @@ class TestMinIOStorageMocking:
         assert response.upload_url == "http://minio/upload"
         assert response.storage_key == "test/video.mp4"
         assert response.expires_in == 3600
+        
+    @patch('storage.minio_storage.Minio')
+    def test_minio_multipart_upload(self, mock_minio_class):
+        """Test MinIO multipart calls map onto the client's S3 multipart API"""
+        from minio.error import S3Error
+        from storage.minio_storage import MinIOStorage
+        
+        mock_client = Mock()
+        mock_minio_class.return_value = mock_client
+        mock_client._create_multipart_upload.return_value = "upload-1"
+        mock_client.get_presigned_url.side_effect = lambda method, bucket, key, **kwargs: (
+            f"http://minio/{key}?partNumber={kwargs['extra_query_params']['partNumber']}"
+        )
+        mock_client._list_parts.return_value = Mock(
+            parts=[Mock(part_number=1, etag='"abc"', size=10)], is_truncated=False
+        )
+        storage = MinIOStorage(bucket_name="test-bucket")
+        
+        metadata = UploadMetadata(filename="set.mp4", content_type="video/mp4")
+        assert storage.create_multipart_upload("videos/1/set.mp4", metadata) == "upload-1"
+        mock_client._create_multipart_upload.assert_called_once_with(
+            "test-bucket", "videos/1/set.mp4", {"Content-Type": "video/mp4"}
+        )
+        
+        urls = storage.generate_presigned_part_urls("videos/1/set.mp4", "upload-1", [1, 2])
+        assert urls == {1: "http://minio/videos/1/set.mp4?partNumber=1", 2: "http://minio/videos/1/set.mp4?partNumber=2"}
+        assert mock_client.get_presigned_url.call_args.kwargs["extra_query_params"]["uploadId"] == "upload-1"
+        
+        assert storage.list_uploaded_parts("videos/1/set.mp4", "upload-1") == [UploadedPart(1, "abc", 10)]
+        
+        storage.complete_multipart_upload("videos/1/set.mp4", "upload-1", [UploadedPart(1, "abc")])
+        bucket, key, upload_id, parts = mock_client._complete_multipart_upload.call_args.args
+        assert (parts[0].part_number, parts[0].etag) == (1, "abc")
+        
+        mock_client._complete_multipart_upload.side_effect = S3Error(
+            "InvalidPart", "One or more of the specified parts could not be found", "", "", "", None
+        )
+        with pytest.raises(MultipartUploadError):
+            storage.complete_multipart_upload("videos/1/set.mp4", "upload-1", [UploadedPart(1, "abc")])
+        
+        assert storage.abort_multipart_upload("videos/1/set.mp4", "upload-1") is True
+
+    @patch('storage.minio_storage.Minio')
+    def test_minio_download_urls(self, mock_minio_class):
+        """Test private media gets one presigned GET, reused across renders"""
+        from storage.minio_storage import MinIOStorage
+        
+        mock_client = Mock()
+        mock_minio_class.return_value = mock_client
+        mock_client.presigned_get_object.side_effect = ["http://minio/signed-1", "http://minio/signed-2"]
+        storage = MinIOStorage(endpoint="localhost:9000", bucket_name="test-bucket")
+        
+        assert storage.get_download_url("videos/1/set.mp4", private=True) == "http://minio/signed-1"
+        assert storage.get_download_url("videos/1/set.mp4", private=True) == "http://minio/signed-1"
+        assert mock_client.presigned_get_object.call_count == 1
+        assert storage.get_download_url("videos/1/set.mp4") == "http://localhost:9000/test-bucket/videos/1/set.mp4"
+        assert mock_client.presigned_get_object.call_count == 1
+        
+    def test_minio_presigning_needs_no_network(self):
+        """Test a configured region lets the real client sign URLs without asking the server"""
+        from storage.minio_storage import MinIOStorage
+        
+        with patch.object(MinIOStorage, "_ensure_bucket_exists"):
+            storage = MinIOStorage(endpoint="localhost:9", bucket_name="test-bucket", region="eu-west-1")
+        
+        # Nothing listens on port 9: any request would raise
+        with patch.object(storage.client, "_url_open", side_effect=AssertionError("network request")):
+            url = storage.generate_presigned_download_url("videos/1/set.mp4")
+        
+        assert url.startswith("http://localhost:9/test-bucket/videos/1/set.mp4?")
+        assert "eu-west-1" in url
 
 class TestS3StorageMocking:
     """Test S3 storage with mocked dependencies"""
@@ -202,4 +372,146 @@ class TestS3StorageMocking:
         assert response.upload_url == "http://s3/upload"
         assert response.storage_key == "test/video.mp4"
         assert response.expires_in == 3600
-        assert response.fields == {'key': 'test/video.mp4'} 
\ No newline at end of file
+        assert response.fields == {'key': 'test/video.mp4'}
+        
+    @patch('storage.s3_storage.boto3')
+    def test_s3_multipart_upload(self, mock_boto3):
+        """Test S3 multipart calls and error mapping"""
+        from botocore.exceptions import ClientError
+        from storage.s3_storage import S3Storage
+        
+        mock_s3_client = Mock()
+        mock_boto3.Session.return_value.client.return_value = mock_s3_client
+        mock_s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        mock_s3_client.generate_presigned_url.return_value = "http://s3/part"
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [
+            {"Parts": [{"PartNumber": 1, "ETag": '"abc"', "Size": 10}]},
+            {"Parts": [{"PartNumber": 2, "ETag": '"def"', "Size": 4}]}
+        ]
+        storage = S3Storage(bucket_name="test-bucket", region="us-east-1")
+        
+        assert storage.create_multipart_upload("videos/1/set.mp4") == "upload-1"
+        assert storage.generate_presigned_part_urls("videos/1/set.mp4", "upload-1", [3]) == {3: "http://s3/part"}
+        mock_s3_client.generate_presigned_url.assert_called_once_with(
+            "upload_part",
+            Params={"Bucket": "test-bucket", "Key": "videos/1/set.mp4", "UploadId": "upload-1", "PartNumber": 3},
+            ExpiresIn=3600
+        )
+        assert storage.list_uploaded_parts("videos/1/set.mp4", "upload-1") == [
+            UploadedPart(1, "abc", 10), UploadedPart(2, "def", 4)
+        ]
+        
+        storage.complete_multipart_upload("videos/1/set.mp4", "upload-1", [UploadedPart(1, "abc")])
+        assert mock_s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"] == {
+            "Parts": [{"PartNumber": 1, "ETag": '"abc"'}]
+        }
+        
+        mock_s3_client.abort_multipart_upload.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchUpload", "Message": "gone"}}, "AbortMultipartUpload"
+        )
+        assert storage.abort_multipart_upload("videos/1/set.mp4", "upload-1") is False
+
+class TestLocalStorage:
+    """Test the local filesystem backend"""
+    
+    @pytest.fixture
+    def storage(self, tmp_path):
+        from storage.local_storage import LocalStorage
+        return LocalStorage(root_dir=str(tmp_path), base_url="http://testserver", secret_key="test-secret", url_ttl=600)
+        
+    def test_presigned_upload_url_is_signed_for_put(self, storage):
+        """Test upload URLs carry a PUT signature and the declared size"""
+        from urllib.parse import parse_qs, urlparse
+        
+        metadata = UploadMetadata(filename="set.mp4", content_type="video/mp4", content_length=1024)
+        response = storage.generate_presigned_url("videos/1/set.mp4", expires_in=300, metadata=metadata)
+        
+        url = urlparse(response.upload_url)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        assert url.path == "/media/videos/1/set.mp4"
+        assert params["size"] == "1024"
+        assert storage.verify_signature("PUT", "videos/1/set.mp4", int(params["expires"]), params["signature"], 1024)
+        assert not storage.verify_signature("GET", "videos/1/set.mp4", int(params["expires"]), params["signature"], 1024)
+        assert not storage.verify_signature("PUT", "videos/1/set.mp4", int(params["expires"]), params["signature"])
+        
+    def test_expired_signature_rejected(self, storage):
+        """Test signatures stop verifying after they expire"""
+        expires = 1000
+        assert not storage.verify_signature("GET", "a.mp4", expires, storage.sign("GET", "a.mp4", expires))
+        
+    def test_public_url_stable_within_window(self, storage):
+        """Test download URLs don't change between requests"""
+        with patch("storage.local_storage.time.time", return_value=6000.0):
+            first = storage.get_public_url("videos/1/set.mp4")
+        with patch("storage.local_storage.time.time", return_value=6599.0):
+            second = storage.get_public_url("videos/1/set.mp4")
+        assert first == second
+        assert "expires=7200" in first
+        
+    def test_keys_cannot_escape_root(self, storage):
+        """Test path traversal is refused"""
+        with pytest.raises(ValueError):
+            storage.path_for("../outside.mp4")
+        assert storage.file_exists("../../etc/passwd") is False
+        assert storage.get_file_metadata("/etc/passwd") is None
+        
+    def test_file_operations(self, storage):
+        """Test exists, metadata and delete"""
+        path = storage.path_for("videos/1/set.mp4")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"0123456789")
+        
+        assert storage.file_exists("videos/1/set.mp4")
+        metadata = storage.get_file_metadata("videos/1/set.mp4")
+        assert metadata["size"] == 10
+        assert metadata["content_type"] == "video/mp4"
+        assert storage.delete_file("videos/1/set.mp4") is True
+        assert storage.file_exists("videos/1/set.mp4") is False
+        assert storage.delete_file("videos/1/set.mp4") is False
+        
+    def test_download_urls(self, storage):
+        """Test private downloads are signed and cached per scope"""
+        from urllib.parse import parse_qs, urlparse
+        
+        private = storage.get_download_url("videos/1/set.mp4", private=True)
+        params = {name: values[0] for name, values in parse_qs(urlparse(private).query).items()}
+        assert storage.verify_signature("GET", "videos/1/set.mp4", int(params["expires"]), params["signature"])
+        
+        with patch("storage.local_storage.time.time", return_value=0):
+            # Cached: no re-signing even though the clock moved
+            assert storage.get_download_url("videos/1/set.mp4", private=True) == private
+        assert storage.get_download_url("videos/1/set.mp4") == storage.get_public_url("videos/1/set.mp4")
+        
+    def test_multipart_upload(self, storage):
+        """Test parts are staged, listed and concatenated in order"""
+        upload_id = storage.create_multipart_upload("videos/1/set.mp4")
+        
+        urls = storage.generate_presigned_part_urls("videos/1/set.mp4", upload_id, [1, 2])
+        assert f"uploadId={upload_id}" in urls[2] and "partNumber=2" in urls[2]
+        storage.part_path("videos/1/set.mp4", upload_id, 2).write_bytes(b"world")
+        storage.part_path("videos/1/set.mp4", upload_id, 1).write_bytes(b"hello ")
+        parts = storage.list_uploaded_parts("videos/1/set.mp4", upload_id)
+        assert [(part.part_number, part.size) for part in parts] == [(1, 6), (2, 5)]
+        
+        with pytest.raises(MultipartUploadError):
+            storage.complete_multipart_upload("videos/1/set.mp4", upload_id, [UploadedPart(1, "stale")])
+        with pytest.raises(MultipartUploadError):
+            storage.complete_multipart_upload("videos/1/set.mp4", upload_id, list(reversed(parts)))
+        storage.complete_multipart_upload("videos/1/set.mp4", upload_id, parts)
+        
+        assert storage.path_for("videos/1/set.mp4").read_bytes() == b"hello world"
+        # The staging directory is gone, so the upload can't be reused
+        with pytest.raises(MultipartUploadError):
+            storage.list_uploaded_parts("videos/1/set.mp4", upload_id)
+        
+    def test_multipart_upload_bound_to_key(self, storage):
+        """Test an upload id only works with the key it was started for"""
+        upload_id = storage.create_multipart_upload("videos/1/set.mp4")
+        
+        with pytest.raises(MultipartUploadError):
+            storage.generate_presigned_part_urls("videos/2/other.mp4", upload_id, [1])
+        with pytest.raises(MultipartUploadError):
+            storage.list_uploaded_parts("videos/1/set.mp4", "../../etc")
+        assert storage.abort_multipart_upload("videos/2/other.mp4", upload_id) is False
+        assert storage.abort_multipart_upload("videos/1/set.mp4", upload_id) is True
+        assert storage.abort_multipart_upload("videos/1/set.mp4", upload_id) is False
@@ -0,0 +1,145 @@
+import pytest
+import json
+from unittest.mock import patch
+
+from PIL import Image
+
+from workers.thumbnail_worker import (
+    frame_command,
+    frame_times,
+    pick_frame,
+    thumbnail_prefix,
+    variant_widths,
+    write_variants
+)
+
+def noisy_frame(width, height):
+    """A detailed frame, like a lit stage"""
+    return Image.frombytes("RGB", (width, height), bytes((i * 37) % 256 for i in range(width * height * 3)))
+
+class TestThumbnailFrames:
+    """Test choosing and encoding the thumbnail frame"""
+
+    def test_frames_sampled_through_the_set(self):
+        assert frame_times(3600.0) == [360.0, 900.0, 1800.0]
+        assert frame_times(None) == [0.0]
+
+    def test_frame_command_seeks_before_decoding(self):
+        command = frame_command("/media/set.mp4", 360.0, "/tmp/frame.png")
+        
+        # Input options: seek and keyframe-only decode happen before the file is opened
+        assert command.index("-ss") < command.index("-i")
+        assert command.index("-skip_frame") < command.index("-i")
+        assert command[command.index("-frames:v") + 1] == "1"
+
+    def test_black_frames_lose_to_detailed_ones(self, tmp_path):
+        Image.new("RGB", (64, 36)).save(tmp_path / "black.png")
+        noisy_frame(64, 36).save(tmp_path / "stage.png")
+        
+        frame = pick_frame([str(tmp_path / "black.png"), str(tmp_path / "stage.png")])
+        
+        assert frame.getextrema() != ((0, 0), (0, 0), (0, 0))
+
+    def test_variants_downscale_only(self, tmp_path):
+        variants = write_variants(noisy_frame(800, 450), str(tmp_path))
+        
+        sizes = []
+        for width, path in variants:
+            with Image.open(path) as image:
+                assert image.format == "WEBP"
+                assert image.width == width
+                sizes.append(image.size)
+        assert sizes == [(320, 180), (640, 360), (800, 450)]
+
+    def test_variant_widths_never_upscale(self):
+        assert variant_widths(1920) == [320, 640, 1280]
+        assert variant_widths(1280) == [320, 640, 1280]
+        assert variant_widths(800) == [320, 640, 800]
+        assert variant_widths(240) == [240]
+
+    def test_thumbnail_prefix_sits_beside_upload(self):
+        assert thumbnail_prefix("videos/1/0f8e.mp4") == "videos/1/0f8e/thumbnails"
+
+class TestThumbnailWorker:
+    """Test the thumbnail job handler against local storage"""
+
+    @pytest.fixture
+    def session_factory(self, db_session):
+        from sqlalchemy.orm import sessionmaker
+        
+        return sessionmaker(bind=db_session.get_bind(), autoflush=False)
+
+    @pytest.fixture
+    def local_storage(self, tmp_path):
+        from storage.local_storage import LocalStorage
+        
+        storage = LocalStorage(root_dir=str(tmp_path / "media"), base_url="http://testserver", secret_key="test-secret")
+        with patch("workers.thumbnail_worker.get_storage", return_value=storage):
+            yield storage
+
+    def _fake_ffmpeg(self, command, lease, timeout, name):
+        """ffprobe finds a 1080p set; ffmpeg writes a black frame at the first point, then stage shots"""
+        if name == "ffprobe":
+            return json.dumps({
+                "streams": [{"codec_type": "video", "height": 1080}, {"codec_type": "audio"}],
+                "format": {"duration": "600.0"}
+            })
+        seconds = float(command[command.index("-ss") + 1])
+        frame = Image.new("RGB", (1280, 720)) if seconds < 100 else noisy_frame(1280, 720)
+        frame.save(command[-1])
+        return ""
+
+    def _run(self, db_session, test_video, session_factory):
+        from models.job import THUMBNAIL_JOB, enqueue_job
+        from workers.base import run_worker
+        from workers.thumbnail_worker import run_thumbnails
+        
+        enqueue_job(db_session, test_video.id, kind=THUMBNAIL_JOB)
+        db_session.commit()
+        with patch("workers.transcode_worker.run_command", side_effect=self._fake_ffmpeg), \
+                patch("workers.thumbnail_worker.run_command", side_effect=self._fake_ffmpeg) as run_command:
+            run_worker(THUMBNAIL_JOB, run_thumbnails, worker_id="worker-1", once=True, session_factory=session_factory)
+        return run_command
+
+    def test_thumbnails_stored_and_recorded(self, db_session, test_video, local_storage, session_factory):
+        run_command = self._run(db_session, test_video, session_factory)
+        
+        assert run_command.call_count == 3
+        db_session.refresh(test_video)
+        assert test_video.thumbnail_key == "test/video/thumbnails"
+        assert test_video.thumbnail_widths == [320, 640, 1280]
+        for width in (320, 640, 1280):
+            path, _ = local_storage.stat_file(f"test/video/thumbnails/{width}.webp")
+            with Image.open(path) as image:
+                assert image.width == width
+                # The black intro frame was skipped
+                assert image.convert("L").getextrema() != (0, 0)
+        assert local_storage.get_file_metadata("test/video/thumbnails/640.webp")["content_type"] == "image/webp"
+
+    def test_rerun_reuses_stored_thumbnails(self, db_session, test_video, local_storage, session_factory):
+        self._run(db_session, test_video, session_factory)
+        test_video.thumbnail_key = None
+        db_session.commit()
+        
+        run_command = self._run(db_session, test_video, session_factory)
+        
+        assert run_command.call_count == 0
+        db_session.refresh(test_video)
+        assert test_video.thumbnail_key == "test/video/thumbnails"
+        assert test_video.thumbnail_widths == [320, 640, 1280]
+
+    def test_audio_only_upload_completes_without_thumbnail(self, db_session, test_video, local_storage, session_factory):
+        from models.job import THUMBNAIL_JOB, enqueue_job
+        from workers.base import run_worker
+        from workers.thumbnail_worker import run_thumbnails
+        
+        job = enqueue_job(db_session, test_video.id, kind=THUMBNAIL_JOB)
+        db_session.commit()
+        probe = json.dumps({"streams": [{"codec_type": "audio"}], "format": {"duration": "60.0"}})
+        with patch("workers.transcode_worker.run_command", return_value=probe):
+            run_worker(THUMBNAIL_JOB, run_thumbnails, worker_id="worker-1", once=True, session_factory=session_factory)
+        
+        db_session.refresh(job)
+        db_session.refresh(test_video)
+        assert job.status == "completed"
+        assert test_video.thumbnail_key is None
@@ -0,0 +1,149 @@
+import pytest
+import json
+import os
+from unittest.mock import patch
+
+from workers.transcode_worker import (
+    AUDIO_RENDITION,
+    VIDEO_RENDITIONS,
+    MediaInfo,
+    ffmpeg_command,
+    hls_prefix,
+    select_renditions
+)
+
+class TestRenditionLadder:
+    """Test choosing and encoding HLS renditions"""
+
+    def test_ladder_stops_at_source_height(self):
+        renditions = select_renditions(MediaInfo(has_video=True, has_audio=True, height=540, duration=3600.0))
+        
+        assert [r.name for r in renditions] == ["360p", "540p", "audio"]
+
+    def test_low_resolution_source_keeps_lowest_rendition(self):
+        renditions = select_renditions(MediaInfo(has_video=True, has_audio=True, height=240, duration=60.0))
+        
+        assert renditions == [VIDEO_RENDITIONS[0], AUDIO_RENDITION]
+
+    def test_audio_only_upload(self):
+        renditions = select_renditions(MediaInfo(has_video=False, has_audio=True, height=None, duration=60.0))
+        
+        assert renditions == [AUDIO_RENDITION]
+
+    def test_single_pass_command(self):
+        info = MediaInfo(has_video=True, has_audio=True, height=1080, duration=3600.0)
+        command = ffmpeg_command("/media/set.mp4", "/tmp/out", select_renditions(info), info)
+        
+        # One decode, split into one scaler per video rendition
+        assert command.count("-i") == 1
+        assert command[command.index("-filter_complex") + 1] == (
+            "[0:v:0]split=3[v0][v1][v2];[v0]scale=-2:360[v0out];[v1]scale=-2:540[v1out];[v2]scale=-2:720[v2out]"
+        )
+        assert command[command.index("-var_stream_map") + 1] == (
+            "v:0,a:0,name:360p v:1,a:1,name:540p v:2,a:2,name:720p a:3,name:audio"
+        )
+        assert command[command.index("-hls_playlist_type") + 1] == "vod"
+        assert command[command.index("-force_key_frames") + 1] == "expr:gte(t,n_forced*6)"
+        assert command[-1] == os.path.join("/tmp/out", "%v", "index.m3u8")
+
+    def test_hls_prefix_sits_beside_upload(self):
+        assert hls_prefix("videos/1/0f8e.mp4") == "videos/1/0f8e/hls"
+        assert hls_prefix("videos/1/0f8e") == "videos/1/0f8e/hls"
+
+class TestTranscodeWorker:
+    """Test the transcode job handler against local storage"""
+
+    @pytest.fixture
+    def session_factory(self, db_session):
+        from sqlalchemy.orm import sessionmaker
+        
+        return sessionmaker(bind=db_session.get_bind(), autoflush=False)
+
+    @pytest.fixture
+    def local_storage(self, tmp_path):
+        from storage.local_storage import LocalStorage
+        
+        storage = LocalStorage(root_dir=str(tmp_path / "media"), base_url="http://testserver", secret_key="test-secret")
+        with patch("workers.transcode_worker.get_storage", return_value=storage):
+            yield storage
+
+    def _fake_ffmpeg(self, command, lease, timeout, name):
+        """Writes what ffmpeg's HLS muxer would for the requested renditions"""
+        if name == "ffprobe":
+            return json.dumps({
+                "streams": [
+                    {"codec_type": "video", "height": 540},
+                    {"codec_type": "audio"}
+                ],
+                "format": {"duration": "12.0"}
+            })
+        output_dir = os.path.dirname(os.path.dirname(command[-1]))
+        names = [entry.rsplit("name:", 1)[1] for entry in command[command.index("-var_stream_map") + 1].split()]
+        master = ["#EXTM3U"]
+        for rendition in names:
+            os.makedirs(os.path.join(output_dir, rendition), exist_ok=True)
+            for index in range(2):
+                with open(os.path.join(output_dir, rendition, f"segment_{index:05d}.ts"), "w") as segment:
+                    segment.write(f"{rendition}-{index}")
+            with open(os.path.join(output_dir, rendition, "index.m3u8"), "w") as playlist:
+                playlist.write("#EXTM3U\n#EXTINF:6.0,\nsegment_00000.ts\n#EXTINF:6.0,\nsegment_00001.ts\n#EXT-X-ENDLIST\n")
+            master += ["#EXT-X-STREAM-INF:BANDWIDTH=1", f"{rendition}/index.m3u8"]
+        with open(os.path.join(output_dir, "master.m3u8"), "w") as playlist:
+            playlist.write("\n".join(master) + "\n")
+        return ""
+
+    def test_transcode_uploads_renditions_and_records_manifest(self, db_session, test_video, local_storage, session_factory):
+        from models.job import TRANSCODE_JOB, enqueue_job
+        from workers.base import run_worker
+        from workers.transcode_worker import run_transcode
+        
+        source = local_storage.path_for(test_video.storage_key)
+        source.parent.mkdir(parents=True)
+        source.write_bytes(b"not really a video")
+        job = enqueue_job(db_session, test_video.id, kind=TRANSCODE_JOB)
+        db_session.commit()
+        
+        with patch("workers.transcode_worker.run_command", side_effect=self._fake_ffmpeg) as run_command:
+            processed = run_worker(TRANSCODE_JOB, run_transcode, worker_id="worker-1", once=True, session_factory=session_factory)
+        
+        assert processed == 1
+        # ffmpeg reads the upload straight from disk on local storage
+        assert str(source) in run_command.call_args_list[1].args[0]
+        db_session.refresh(test_video)
+        assert test_video.hls_manifest_key == "test/video/hls/master.m3u8"
+        for key in ("master.m3u8", "360p/index.m3u8", "540p/segment_00001.ts", "audio/segment_00000.ts"):
+            assert local_storage.file_exists(f"test/video/hls/{key}")
+        assert local_storage.read_file("test/video/hls/540p/segment_00001.ts") == b"540p-1"
+        # Transcoding does not touch the ML analysis status
+        assert test_video.processing_status == "pending"
+        db_session.refresh(job)
+        assert job.status == "completed"
+
+    def test_failed_transcode_leaves_video_untouched(self, db_session, test_video, local_storage, session_factory):
+        from models.job import TRANSCODE_JOB, enqueue_job
+        from workers.base import run_next_job
+        from workers.transcode_worker import run_transcode
+        
+        job = enqueue_job(db_session, test_video.id, kind=TRANSCODE_JOB)
+        db_session.commit()
+        
+        with patch("workers.transcode_worker.run_command", side_effect=RuntimeError("ffprobe exited with 1")):
+            run_next_job(TRANSCODE_JOB, run_transcode, "worker-1", session_factory=session_factory)
+        
+        db_session.refresh(job)
+        db_session.refresh(test_video)
+        assert job.status == "queued"
+        assert job.last_error == "ffprobe exited with 1"
+        assert test_video.hls_manifest_key is None
+        assert test_video.processing_status == "pending"
+
+    def test_leasing_transcode_job_keeps_ml_status(self, db_session, test_video):
+        from models.job import TRANSCODE_JOB, enqueue_job, lease_jobs
+        
+        enqueue_job(db_session, test_video.id, kind=TRANSCODE_JOB)
+        db_session.commit()
+        
+        assert lease_jobs(db_session, "worker-1", kind="ml_analysis") == []
+        assert len(lease_jobs(db_session, "worker-1", kind=TRANSCODE_JOB)) == 1
+        db_session.refresh(test_video)
+        assert test_video.processing_status == "pending"
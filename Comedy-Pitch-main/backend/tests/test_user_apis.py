@@ -22,6 +22,18 @@ class TestGetUserProfile:
         assert "total_likes" in data
         assert "created_at" in data
         
+    def test_get_my_profile_conditional_get(self, client, mock_firebase_token, auth_headers, test_user):
+        first = client.get("/api/users/me", headers=auth_headers)
+        assert first.status_code == 200
+        
+        cached = client.get("/api/users/me", headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+        assert cached.status_code == 304
+        
+        client.put("/api/users/me", json={"bio": "New bio"}, headers=auth_headers)
+        changed = client.get("/api/users/me", headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+        assert changed.status_code == 200
+        assert changed.json()["bio"] == "New bio"
+        
     def test_get_my_profile_without_auth(self, client):
         """Test profile retrieval without authentication"""
         response = client.get("/api/users/me")
@@ -472,4 +484,97 @@ class TestUserProfileWithVideos:
         assert social_links["twitter"] == "@comedian"
         assert social_links["instagram"] == "comedian_official"
         assert social_links["tiktok"] == "@funny_comedian"
-        assert social_links["website"] == "https://comedian.com" 
\ No newline at end of file
+        assert social_links["website"] == "https://comedian.com" 
+
+class TestUserIdentityCache:
+    """Test the resolved-user cache used by authenticated routes"""
+    
+    def test_cached_user_skips_users_lookup(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/video.mp4"
+            
+            db_session.expire_all()
+            cold = client.get("/api/videos/?feed=home", headers=auth_headers)
+            db_session.expire_all()
+            warm = client.get("/api/videos/?feed=home", headers=auth_headers)
+        
+        assert cold.status_code == 200
+        assert warm.status_code == 200
+        assert int(warm.headers["X-Query-Count"]) == int(cold.headers["X-Query-Count"]) - 1
+        
+    def test_first_seen_user_created_by_upsert(self, db_session):
+        from models.models import User
+        from routes.videos import get_or_create_user, upsert_user
+        
+        firebase_user = {"uid": "upsert-uid", "email": "upsert@example.com", "name": "Upsert User"}
+        user = get_or_create_user(db_session, firebase_user)
+        
+        # A concurrent first request resolves to the same row instead of failing
+        again = upsert_user(db_session, firebase_user)
+        assert again.id == user.id
+        assert again.display_name == "Upsert User"
+        assert db_session.query(User).filter(User.firebase_uid == "upsert-uid").count() == 1
+        
+    def test_profile_update_invalidates_cache(self, client, mock_firebase_token, auth_headers, test_user):
+        from config.user_cache import user_cache
+        
+        response = client.get("/api/users/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert user_cache.get("test-uid-123").display_name == "Test User"
+        
+        response = client.put("/api/users/me", json={"display_name": "Renamed"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert user_cache.get("test-uid-123") is None
+
+class TestAnalyticsSummary:
+    """Test the per-user analytics score summary"""
+    
+    def test_summary_lists_scores_for_my_sets(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        from datetime import datetime
+        from models.models import Video, AnalyticsData
+        
+        scores = [0.4, 0.8]
+        for i, score in enumerate(scores):
+            video = Video(
+                user_id=test_user.id,
+                firebase_uid=test_user.firebase_uid,
+                title=f"Set {i}",
+                file_type="video",
+                storage_key=f"videos/set_{i}.mp4",
+                posted_at=datetime(2024, 1, i + 1)
+            )
+            db_session.add(video)
+            db_session.commit()
+            db_session.add(AnalyticsData(
+                video_id=video.id,
+                transcript=[{"text": "x" * 1000, "start_time": 0.0, "end_time": 1.0}],
+                overall_funniness_score=score,
+                processing_version="v1"
+            ))
+        db_session.commit()
+        
+        # Unprocessed sets are left out
+        db_session.add(Video(
+            user_id=test_user.id,
+            firebase_uid=test_user.firebase_uid,
+            title="Unprocessed",
+            file_type="video",
+            storage_key="videos/unprocessed.mp4"
+        ))
+        db_session.commit()
+        
+        response = client.get("/api/users/me/analytics/summary", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert [s["title"] for s in data["sets"]] == ["Set 1", "Set 0"]
+        assert data["sets"][0]["overall_funniness_score"] == 0.8
+        assert data["average_funniness_score"] == pytest.approx(0.6)
+        assert "transcript" not in data["sets"][0]
+        
+    def test_summary_empty(self, client, mock_firebase_token, auth_headers, test_user):
+        response = client.get("/api/users/me/analytics/summary", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json() == {"sets": [], "count": 0, "average_funniness_score": None}
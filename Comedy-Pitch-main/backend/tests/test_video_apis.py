@@ -54,6 +54,126 @@ class TestVideoPresignedUpload:
         
         assert response.status_code == 422  # Validation error
 
+class TestMultipartUpload:
+    """Test parallel multipart uploads, run against the local storage backend"""
+    
+    CONTENT = b"hello world"
+    
+    @pytest.fixture
+    def storage(self, tmp_path):
+        from storage.local_storage import LocalStorage
+        storage = LocalStorage(root_dir=str(tmp_path), base_url="http://testserver", secret_key="test-secret")
+        # 4-byte parts, so the 11-byte file above is 3 parts
+        with patch('routes.videos.get_storage', return_value=storage), \
+                patch('routes.media.get_storage', return_value=storage), \
+                patch('routes.videos.multipart_part_size', return_value=4):
+            yield storage
+            
+    def start(self, client, auth_headers):
+        response = client.post(
+            "/api/videos/uploads/multipart",
+            json={"filename": "set.mp4", "content_type": "video/mp4", "content_length": len(self.CONTENT)},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        return response.json()
+        
+    def test_parallel_upload_and_resume(self, client, mock_firebase_token, auth_headers, test_user, storage):
+        """Test parts upload in any order and an interrupted upload resumes from the part list"""
+        upload = self.start(client, auth_headers)
+        assert upload["storage_key"].startswith(f"videos/{test_user.id}/")
+        assert (upload["part_size"], upload["part_count"]) == (4, 3)
+        assert [part["part_number"] for part in upload["parts"]] == [1, 2, 3]
+        urls = {part["part_number"]: part["upload_url"] for part in upload["parts"]}
+        parts_url = f"/api/videos/uploads/multipart/{upload['upload_id']}/parts"
+        
+        # Parts 1 and 3 land, then the client is interrupted
+        assert client.put(urls[3], content=self.CONTENT[8:]).status_code == 200
+        assert client.put(urls[1], content=self.CONTENT[0:4]).status_code == 200
+        
+        response = client.get(parts_url, params={"storage_key": upload["storage_key"]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert [(part["part_number"], part["size"]) for part in response.json()["parts"]] == [(1, 4), (3, 3)]
+        
+        complete_url = f"/api/videos/uploads/multipart/{upload['upload_id']}/complete"
+        response = client.post(complete_url, json={"storage_key": upload["storage_key"]}, headers=auth_headers)
+        assert response.status_code == 400  # Part 2 is missing
+        
+        # Resuming: a fresh URL for the missing part
+        response = client.post(parts_url, json={"storage_key": upload["storage_key"], "part_numbers": [2]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert client.put(response.json()["parts"][0]["upload_url"], content=self.CONTENT[4:8]).status_code == 200
+        
+        response = client.post(complete_url, json={"storage_key": upload["storage_key"]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {"storage_key": upload["storage_key"], "part_count": 3}
+        assert storage.path_for(upload["storage_key"]).read_bytes() == self.CONTENT
+        
+    def test_complete_with_part_etags(self, client, mock_firebase_token, auth_headers, test_user, storage):
+        """Test completing with the ETags the part uploads returned, and rejecting wrong ones"""
+        upload = self.start(client, auth_headers)
+        etags = []
+        for part in upload["parts"]:
+            start = (part["part_number"] - 1) * 4
+            etags.append(client.put(part["upload_url"], content=self.CONTENT[start:start + 4]).headers["ETag"])
+        complete_url = f"/api/videos/uploads/multipart/{upload['upload_id']}/complete"
+        
+        wrong = [{"part_number": 1, "etag": etags[1]}]
+        response = client.post(complete_url, json={"storage_key": upload["storage_key"], "parts": wrong}, headers=auth_headers)
+        assert response.status_code == 400
+        
+        parts = [{"part_number": number, "etag": etag} for number, etag in enumerate(etags, start=1)]
+        response = client.post(complete_url, json={"storage_key": upload["storage_key"], "parts": parts}, headers=auth_headers)
+        assert response.status_code == 200
+        assert storage.path_for(upload["storage_key"]).read_bytes() == self.CONTENT
+        
+    def test_abort(self, client, mock_firebase_token, auth_headers, test_user, storage):
+        """Test aborting discards the upload"""
+        upload = self.start(client, auth_headers)
+        client.put(upload["parts"][0]["upload_url"], content=self.CONTENT[:4])
+        upload_url = f"/api/videos/uploads/multipart/{upload['upload_id']}"
+        
+        assert client.delete(upload_url, params={"storage_key": upload["storage_key"]}, headers=auth_headers).status_code == 200
+        
+        assert client.get(f"{upload_url}/parts", params={"storage_key": upload["storage_key"]}, headers=auth_headers).status_code == 404
+        assert client.delete(upload_url, params={"storage_key": upload["storage_key"]}, headers=auth_headers).status_code == 404
+        # Part URLs stop working too
+        assert client.put(upload["parts"][1]["upload_url"], content=self.CONTENT[4:8]).status_code == 404
+        
+    def test_other_users_uploads_refused(self, client, mock_firebase_token, auth_headers, test_user, storage):
+        """Test storage keys outside the user's prefix are refused"""
+        upload = self.start(client, auth_headers)
+        other_key = upload["storage_key"].replace(f"videos/{test_user.id}/", f"videos/{test_user.id + 1}/")
+        
+        response = client.get(
+            f"/api/videos/uploads/multipart/{upload['upload_id']}/parts",
+            params={"storage_key": other_key},
+            headers=auth_headers
+        )
+        assert response.status_code == 403
+        
+    def test_backend_without_multipart(self, client, mock_firebase_token, auth_headers, test_user):
+        """Test backends that don't implement multipart answer 501"""
+        from storage.base import StorageBackend
+        
+        storage = Mock(spec=StorageBackend)
+        storage.create_multipart_upload.side_effect = NotImplementedError
+        with patch('routes.videos.get_storage', return_value=storage):
+            response = client.post(
+                "/api/videos/uploads/multipart",
+                json={"filename": "set.mp4", "content_type": "video/mp4", "content_length": 100},
+                headers=auth_headers
+            )
+        assert response.status_code == 501
+        
+    def test_requires_auth(self, client):
+        """Test multipart uploads need authentication"""
+        response = client.post(
+            "/api/videos/uploads/multipart",
+            json={"filename": "set.mp4", "content_type": "video/mp4", "content_length": 100}
+        )
+        assert response.status_code == 401
+
 class TestVideoCreation:
     """Test video creation after upload"""
     
@@ -111,6 +231,95 @@ class TestVideoCreation:
             assert response.status_code == 400
             assert "File not found in storage" in response.json()["detail"]
             
+    def test_create_video_enqueues_ml_job(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        """Test a new upload is queued for ML analysis ahead of backfills"""
+        from models.job import ProcessingJob, UPLOAD_JOB_PRIORITY
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.file_exists.return_value = True
+            mock_get_storage.return_value.get_file_metadata.return_value = {"content_type": "video/mp4", "size": 1024}
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/set.mp4"
+            
+            response = client.post(
+                "/api/videos/",
+                json={"storage_key": "videos/1/set.mp4", "title": "Queued Set", "file_type": "video"},
+                headers=auth_headers
+            )
+        
+        assert response.status_code == 200
+        job = db_session.query(ProcessingJob).filter(
+            ProcessingJob.video_id == response.json()["id"],
+            ProcessingJob.kind == "ml_analysis"
+        ).one()
+        assert job.status == "queued"
+        assert job.priority == UPLOAD_JOB_PRIORITY
+        
+    def test_create_video_enqueues_media_jobs(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        """Test a new upload is also queued for HLS transcoding and thumbnails"""
+        from models.job import ProcessingJob, UPLOAD_JOB_PRIORITY
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_file_metadata.return_value = {"content_type": "video/mp4", "size": 1024}
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/set.mp4"
+            
+            response = client.post(
+                "/api/videos/",
+                json={"storage_key": "videos/1/set.mp4", "title": "Queued Set", "file_type": "video"},
+                headers=auth_headers
+            )
+        
+        assert response.status_code == 200
+        assert response.json()["hls_url"] is None
+        assert response.json()["thumbnails"] is None
+        for kind in ("transcode", "thumbnail"):
+            job = db_session.query(ProcessingJob).filter(
+                ProcessingJob.video_id == response.json()["id"],
+                ProcessingJob.kind == kind
+            ).one()
+            assert job.status == "queued"
+            assert job.priority == UPLOAD_JOB_PRIORITY
+            
+    def test_create_video_single_storage_round_trip(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        """Test the upload is verified with one metadata call, off the event loop"""
+        import threading
+        from models.models import Video
+        
+        calls = []
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            def get_file_metadata(key):
+                calls.append(threading.current_thread().name)
+                return {"content_type": "video/mp4", "size": 2048}
+            
+            mock_get_storage.return_value.get_file_metadata.side_effect = get_file_metadata
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/set.mp4"
+            
+            response = client.post(
+                "/api/videos/",
+                json={"storage_key": "videos/1/set.mp4", "title": "One Stat", "file_type": "video"},
+                headers=auth_headers
+            )
+            
+            mock_get_storage.return_value.file_exists.assert_not_called()
+        
+        assert response.status_code == 200
+        assert len(calls) == 1 and calls[0].startswith("storage")
+        video = db_session.query(Video).filter(Video.id == response.json()["id"]).one()
+        assert (video.file_size, video.mime_type) == (2048, "video/mp4")
+        
+    def test_create_video_missing_upload(self, client, mock_firebase_token, auth_headers, test_user):
+        """Test a storage key with nothing uploaded is refused"""
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_file_metadata.return_value = None
+            
+            response = client.post(
+                "/api/videos/",
+                json={"storage_key": "videos/1/missing.mp4", "title": "Missing", "file_type": "video"},
+                headers=auth_headers
+            )
+        
+        assert response.status_code == 400
+        assert "File not found in storage" in response.json()["detail"]
+        
     def test_create_video_invalid_data(self, client, mock_firebase_token, auth_headers):
         """Test video creation with invalid data"""
         video_data = {
@@ -204,7 +413,7 @@ class TestVideoListing:
                 cursor = data["cursor"]
                 response2 = client.get(f"/api/videos/?cursor={cursor}", headers=auth_headers)
                 assert response2.status_code == 200
-                
+        
         finally:
             db.close()
             
@@ -234,9 +443,48 @@ class TestVideoRetrieval:
         assert "user" in data
         assert "storage_url" in data
         
+    def test_get_video_generated_thumbnails(self, client, mock_firebase_token, auth_headers, test_video, db_session):
+        """Test generated thumbnails replace thumbnail_url and are listed by width"""
+        test_video.thumbnail_key = "test/video/thumbnails"
+        test_video.thumbnail_widths = [320, 640, 1280]
+        db_session.commit()
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_download_url.side_effect = lambda key, private=False: f"https://cdn.example.com/{key}"
+            response = client.get(f"/api/videos/{test_video.id}", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["thumbnail_url"] == "https://cdn.example.com/test/video/thumbnails/640.webp"
+        assert data["thumbnails"] == {
+            "320": "https://cdn.example.com/test/video/thumbnails/320.webp",
+            "640": "https://cdn.example.com/test/video/thumbnails/640.webp",
+            "1280": "https://cdn.example.com/test/video/thumbnails/1280.webp"
+        }
+
+    def test_get_video_thumbnails_from_narrow_source(self, client, mock_firebase_token, auth_headers, test_video, db_session):
+        """Test only the widths actually generated are listed for a source narrower than 640px"""
+        test_video.thumbnail_key = "test/video/thumbnails"
+        test_video.thumbnail_widths = [320, 480]
+        db_session.commit()
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_download_url.side_effect = lambda key, private=False: f"https://cdn.example.com/{key}"
+            response = client.get(f"/api/videos/{test_video.id}", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["thumbnail_url"] == "https://cdn.example.com/test/video/thumbnails/480.webp"
+        assert data["thumbnails"] == {
+            "320": "https://cdn.example.com/test/video/thumbnails/320.webp",
+            "480": "https://cdn.example.com/test/video/thumbnails/480.webp"
+        }
+        
     def test_get_video_increments_view_count(self, client, mock_firebase_token, auth_headers, db_session):
-        """Test that viewing a video increments view count"""
+        """Test that viewing a video increments view count once buffered views are flushed"""
         from models.models import Video, User
+        from config.view_counter import view_counter
+        view_counter.drain()
         
         # Create another user and their video
         other_user = User(
@@ -264,8 +512,14 @@ class TestVideoRetrieval:
         # View the video
         response = client.get(f"/api/videos/{video.id}", headers=auth_headers)
         assert response.status_code == 200
+        assert response.json()["view_count"] == 1
+        
+        # The read itself doesn't write
+        db_session.refresh(video)
+        assert video.view_count == 0
         
-        # Check that view count increased
+        # Check that view count increased after the flush
+        view_counter.flush(db_session.connection())
         db_session.refresh(video)
         assert video.view_count == 1
         
@@ -306,6 +560,119 @@ class TestVideoRetrieval:
         response = client.get(f"/api/videos/{test_video.id}")
         assert response.status_code == 401
 
+class TestHLSPlaylists:
+    """Test serving transcoded HLS playlists"""
+    
+    MASTER = (
+        "#EXTM3U\n"
+        "#EXT-X-VERSION:3\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=796000,RESOLUTION=640x360\n"
+        "360p/index.m3u8\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=64000,CODECS=\"mp4a.40.2\"\n"
+        "audio/index.m3u8\n"
+    )
+    VARIANT = (
+        "#EXTM3U\n"
+        "#EXT-X-TARGETDURATION:6\n"
+        "#EXT-X-PLAYLIST-TYPE:VOD\n"
+        "#EXTINF:6.000000,\n"
+        "segment_00000.ts\n"
+        "#EXTINF:4.500000,\n"
+        "segment_00001.ts\n"
+        "#EXT-X-ENDLIST\n"
+    )
+    
+    @pytest.fixture
+    def local_storage(self, tmp_path):
+        from storage.local_storage import LocalStorage
+        
+        storage = LocalStorage(root_dir=str(tmp_path), base_url="http://testserver", secret_key="test-secret")
+        with patch("routes.videos.get_storage", return_value=storage), patch("routes.media.get_storage", return_value=storage):
+            yield storage
+    
+    @pytest.fixture
+    def transcoded_video(self, db_session, test_video, local_storage):
+        for key, content in (
+            ("test/video/hls/master.m3u8", self.MASTER),
+            ("test/video/hls/360p/index.m3u8", self.VARIANT),
+            ("test/video/hls/360p/segment_00000.ts", "first"),
+            ("test/video/hls/360p/segment_00001.ts", "second")
+        ):
+            path = local_storage.path_for(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        test_video.hls_manifest_key = "test/video/hls/master.m3u8"
+        db_session.commit()
+        return test_video
+    
+    def test_video_response_includes_hls_url(self, client, mock_firebase_token, auth_headers, transcoded_video):
+        """Test transcoded videos advertise their master playlist"""
+        response = client.get(f"/api/videos/{transcoded_video.id}", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["hls_url"] == f"/api/videos/{transcoded_video.id}/hls/master.m3u8"
+        
+    def test_master_playlist_keeps_relative_variants(self, client, mock_firebase_token, auth_headers, transcoded_video):
+        """Test the master playlist is served as stored, so players come back for each rendition"""
+        response = client.get(f"/api/videos/{transcoded_video.id}/hls/master.m3u8", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/vnd.apple.mpegurl")
+        assert response.headers["cache-control"] == "private, max-age=300"
+        assert response.text == self.MASTER
+        
+    def test_variant_playlist_signs_segments(self, client, mock_firebase_token, auth_headers, transcoded_video):
+        """Test segment lines become signed media URLs that outlive a long set"""
+        import time
+        from urllib.parse import parse_qs, urlparse
+        
+        response = client.get(f"/api/videos/{transcoded_video.id}/hls/360p/index.m3u8", headers=auth_headers)
+        
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        segment_urls = [line for line in lines if not line.startswith("#")]
+        assert [urlparse(url).path for url in segment_urls] == [
+            "/media/test/video/hls/360p/segment_00000.ts",
+            "/media/test/video/hls/360p/segment_00001.ts"
+        ]
+        assert int(parse_qs(urlparse(segment_urls[0]).query)["expires"][0]) >= time.time() + 5 * 3600
+        assert "#EXT-X-ENDLIST" in lines
+        
+        segment = client.get(segment_urls[1])
+        assert segment.status_code == 200
+        assert segment.content == b"second"
+        assert segment.headers["content-type"] == "video/mp2t"
+        
+    def test_private_video_playlist_is_owner_only(self, client, mock_firebase_token, auth_headers, db_session, transcoded_video):
+        """Test playlists follow the video's access rules"""
+        from models.models import User
+        
+        transcoded_video.is_public = False
+        db_session.commit()
+        assert client.get(f"/api/videos/{transcoded_video.id}/hls/master.m3u8", headers=auth_headers).status_code == 200
+        
+        # Hand the private video to another user
+        other_user = User(firebase_uid="hls-other-uid", email="other@example.com", display_name="Other User")
+        db_session.add(other_user)
+        db_session.commit()
+        transcoded_video.user_id = other_user.id
+        transcoded_video.firebase_uid = other_user.firebase_uid
+        db_session.commit()
+        
+        response = client.get(f"/api/videos/{transcoded_video.id}/hls/master.m3u8", headers=auth_headers)
+        assert response.status_code == 403
+        
+    def test_missing_playlists(self, client, mock_firebase_token, auth_headers, db_session, test_video, local_storage):
+        """Test untranscoded videos, unknown renditions and non-playlist paths are 404"""
+        assert client.get(f"/api/videos/{test_video.id}/hls/master.m3u8", headers=auth_headers).status_code == 404
+        
+        test_video.hls_manifest_key = "test/video/hls/master.m3u8"
+        db_session.commit()
+        assert client.get(f"/api/videos/{test_video.id}/hls/master.m3u8", headers=auth_headers).status_code == 404
+        assert client.get(f"/api/videos/{test_video.id}/hls/..%2F..%2Fsecret.m3u8", headers=auth_headers).status_code == 404
+        assert client.get(f"/api/videos/{test_video.id}/hls/360p/segment_00000.ts", headers=auth_headers).status_code == 404
+        assert client.get("/api/videos/99999/hls/master.m3u8", headers=auth_headers).status_code == 404
+
 class TestVideoAnalytics:
     """Test video analytics endpoints"""
     
@@ -356,6 +723,118 @@ class TestVideoAnalytics:
         assert len(data["laughter_timestamps"]) == 1
         assert data["laughter_timestamps"][0]["intensity"] == 0.8
         
+    def _ingest(self, client, video_id, segment_count):
+        response = client.post("/api/ml/score-results", json={
+            "video_id": video_id,
+            "processing_version": "v2.0.0",
+            "transcript": [
+                {"text": f"Bit {i}", "start_time": i * 10.0, "end_time": i * 10.0 + 9.0, "funniness_score": 0.5}
+                for i in range(segment_count)
+            ],
+            "overall_funniness_score": 0.5
+        })
+        assert response.status_code == 200
+        
+    def test_get_video_analytics_time_window(self, client, mock_firebase_token, auth_headers, test_video):
+        """Segments starting in [from, to) are returned"""
+        self._ingest(client, test_video.id, 20)
+        
+        response = client.get(f"/api/videos/{test_video.id}/analytics?from=50&to=90", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [segment["text"] for segment in data["transcript"]] == ["Bit 5", "Bit 6", "Bit 7", "Bit 8"]
+        assert data["has_more"] is False
+        
+    def test_get_video_analytics_pages_through_window(self, client, mock_firebase_token, auth_headers, test_video):
+        self._ingest(client, test_video.id, 20)
+        
+        texts = []
+        url = f"/api/videos/{test_video.id}/analytics?from=30&limit=6"
+        while url:
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["transcript"]) <= 6
+            texts.extend(segment["text"] for segment in data["transcript"])
+            url = f"/api/videos/{test_video.id}/analytics?from=30&limit=6&cursor={data['next_cursor']}" if data["has_more"] else None
+        
+        assert texts == [f"Bit {i}" for i in range(3, 20)]
+        
+    def test_get_video_analytics_window_on_legacy_json_transcript(self, client, mock_firebase_token, auth_headers, test_video, db_session):
+        """Rows without segments fall back to the JSON transcript"""
+        from models.models import AnalyticsData
+        
+        db_session.add(AnalyticsData(
+            video_id=test_video.id,
+            transcript=[{"text": f"Old {i}", "start_time": float(i), "end_time": i + 1.0} for i in range(5)]
+        ))
+        db_session.commit()
+        
+        response = client.get(f"/api/videos/{test_video.id}/analytics?from=1&to=4&limit=2", headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [segment["text"] for segment in data["transcript"]] == ["Old 1", "Old 2"]
+        assert data["has_more"] is True
+        
+    def test_get_video_analytics_invalid_cursor(self, client, mock_firebase_token, auth_headers, test_video):
+        self._ingest(client, test_video.id, 2)
+        
+        response = client.get(f"/api/videos/{test_video.id}/analytics?cursor=bogus", headers=auth_headers)
+        
+        assert response.status_code == 400
+        
+    def test_get_video_analytics_conditional_get(self, client, mock_firebase_token, auth_headers, test_video, db_session):
+        """A matching If-None-Match gets an empty 304 until the analytics change"""
+        from models.models import AnalyticsData
+        
+        self._ingest(client, test_video.id, 3)
+        
+        first = client.get(f"/api/videos/{test_video.id}/analytics", headers=auth_headers)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        
+        cached = client.get(
+            f"/api/videos/{test_video.id}/analytics",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+        
+        # A different window is a different representation
+        window = client.get(
+            f"/api/videos/{test_video.id}/analytics?from=10",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert window.status_code == 200
+        
+        # Reprocessing with a new model version invalidates the ETag
+        analytics = db_session.query(AnalyticsData).filter(AnalyticsData.video_id == test_video.id).one()
+        analytics.processing_version = "v3.0.0"
+        db_session.commit()
+        
+        stale = client.get(
+            f"/api/videos/{test_video.id}/analytics",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert stale.status_code == 200
+        assert stale.headers["ETag"] != etag
+        
+    def test_get_video_analytics_gzip(self, client, mock_firebase_token, auth_headers, test_video):
+        self._ingest(client, test_video.id, 200)
+        
+        response = client.get(
+            f"/api/videos/{test_video.id}/analytics",
+            headers={**auth_headers, "Accept-Encoding": "gzip"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(response.json()["transcript"]) == 200
+        
     def test_get_video_analytics_no_analytics(self, client, mock_firebase_token, auth_headers, test_video):
         """Test analytics retrieval when no analytics exist"""
         response = client.get(f"/api/videos/{test_video.id}/analytics", headers=auth_headers)
@@ -463,4 +942,155 @@ class TestVideoIntegration:
         listing_result = response.json()
         
         video_titles = [v["title"] for v in listing_result["videos"]]
-        assert "Workflow Test Video" in video_titles 
\ No newline at end of file
+        assert "Workflow Test Video" in video_titles 
+
+class TestFeedQueryCount:
+    """Test that a feed page costs a constant number of SQL statements"""
+    
+    def _create_feed(self, db_session, count):
+        from models.models import User, Video
+        
+        authors = []
+        for i in range(4):
+            author = User(
+                firebase_uid=f"feed-author-{i}",
+                email=f"feed-author-{i}@example.com",
+                display_name=f"Feed Author {i}"
+            )
+            db_session.add(author)
+            authors.append(author)
+        db_session.commit()
+        
+        for i in range(count):
+            author = authors[i % len(authors)]
+            db_session.add(Video(
+                user_id=author.id,
+                firebase_uid=author.firebase_uid,
+                title=f"Feed Video {i}",
+                file_type="video",
+                storage_key=f"videos/feed_{i}.mp4",
+                is_public=True
+            ))
+        db_session.commit()
+        return authors
+    
+    def test_home_feed_query_count_independent_of_page_size(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        """Authors are eager-loaded instead of one lazy load per video"""
+        self._create_feed(db_session, 30)
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/video.mp4"
+            
+            # Resolve the requesting user once so both pages hit the user cache
+            client.get("/api/users/me", headers=auth_headers)
+            
+            # The test session is shared across requests, so start each one cold
+            db_session.expire_all()
+            small = client.get("/api/videos/?feed=home&limit=2", headers=auth_headers)
+            db_session.expire_all()
+            large = client.get("/api/videos/?feed=home&limit=25", headers=auth_headers)
+            
+            # Storage is resolved once per page, not per video
+            assert mock_get_storage.call_count == 2
+        
+        assert small.status_code == 200
+        assert large.status_code == 200
+        assert len(small.json()["videos"]) == 2
+        assert len(large.json()["videos"]) == 25
+        assert small.headers["X-Query-Count"] == large.headers["X-Query-Count"]
+        
+    def test_user_videos_query_count_independent_of_page_size(self, client, mock_firebase_token, auth_headers, test_user, db_session):
+        authors = self._create_feed(db_session, 40)
+        
+        with patch('routes.videos.get_storage') as mock_get_storage:
+            mock_get_storage.return_value.get_download_url.return_value = "https://cdn.example.com/video.mp4"
+            
+            client.get("/api/users/me", headers=auth_headers)
+            
+            db_session.expire_all()
+            small = client.get(f"/api/users/{authors[0].id}/videos?limit=2", headers=auth_headers)
+            db_session.expire_all()
+            large = client.get(f"/api/users/{authors[0].id}/videos?limit=10", headers=auth_headers)
+        
+        assert small.status_code == 200
+        assert large.status_code == 200
+        assert len(large.json()["videos"]) == 10
+        assert small.headers["X-Query-Count"] == large.headers["X-Query-Count"]
+
+class TestFeedCursor:
+    """Test keyset pagination cursor handling"""
+    
+    def test_cursor_pages_cover_feed_without_duplicates(self, db_session, test_user):
+        """Walking the cursor visits every video once in (posted_at, id) DESC order"""
+        from models.models import Video
+        from routes.videos import apply_feed_cursor
+        
+        base = datetime(2024, 1, 1)
+        for i in range(7):
+            db_session.add(Video(
+                user_id=test_user.id,
+                firebase_uid=test_user.firebase_uid,
+                title=f"Cursor Video {i}",
+                file_type="video",
+                storage_key=f"videos/cursor_{i}.mp4",
+                # Pairs share a timestamp so the id tiebreak is exercised
+                posted_at=base + timedelta(minutes=i // 2)
+            ))
+        db_session.commit()
+        
+        seen = []
+        cursor = None
+        while True:
+            query = db_session.query(Video).filter(Video.user_id == test_user.id)
+            page = apply_feed_cursor(query, cursor).limit(3).all()
+            if not page:
+                break
+            seen.extend(page)
+            cursor = f"{page[-1].posted_at.isoformat()}_{page[-1].id}"
+        
+        assert len(seen) == 7
+        assert len({video.id for video in seen}) == 7
+        keys = [(video.posted_at, video.id) for video in seen]
+        assert keys == sorted(keys, reverse=True)
+        
+    def test_invalid_cursor(self, db_session):
+        from fastapi import HTTPException
+        from models.models import Video
+        from routes.videos import apply_feed_cursor
+        
+        with pytest.raises(HTTPException) as exc_info:
+            apply_feed_cursor(db_session.query(Video), "not-a-cursor")
+        assert exc_info.value.status_code == 400
+
+class TestFastJSON:
+    """Test the orjson response path matches validated Pydantic output"""
+    
+    def test_trusted_dict_matches_validated_json(self, test_video):
+        import json
+        from unittest.mock import MagicMock
+        from config.fast_json import dumps
+        from routes.videos import format_video_response, video_response_dict
+        
+        storage = MagicMock()
+        storage.get_download_url.return_value = "https://cdn.example.com/video.mp4"
+        trusted = video_response_dict(test_video, storage, liked_by_me=True)
+        validated = format_video_response(test_video, storage=storage, liked_by_me=True)
+        
+        assert json.loads(dumps(trusted)) == json.loads(validated.model_dump_json())
+        
+    def test_private_media_gets_presigned_url(self, test_video):
+        from unittest.mock import MagicMock
+        from routes.videos import video_response_dict
+        
+        storage = MagicMock()
+        storage.get_download_url.side_effect = lambda key, private=False: f"https://{'signed' if private else 'cdn'}/{key}"
+        
+        assert video_response_dict(test_video, storage)["storage_url"] == f"https://cdn/{test_video.storage_key}"
+        test_video.is_public = False
+        assert video_response_dict(test_video, storage)["storage_url"] == f"https://signed/{test_video.storage_key}"
+        
+    def test_utc_datetimes_render_like_pydantic(self):
+        from datetime import datetime, timezone
+        from config.fast_json import dumps
+        
+        assert dumps({"at": datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)}) == b'{"at":"2024-01-01T12:00:00Z"}'
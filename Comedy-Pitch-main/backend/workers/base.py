@@ -0,0 +1,159 @@
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from config.database import SessionLocal
+from models.job import ML_JOB_LEASE_SECONDS, ProcessingJob, complete_job, fail_job, heartbeat_job, lease_jobs
+from models.video import Video
+from storage.base import StorageBackend
+from storage.local_storage import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+class PermanentJobError(Exception):
+    """A failure that retrying cannot fix (bad input, bad pipeline output)"""
+
+class JobLease:
+    """Keeps a leased job alive with heartbeats from a background thread while it runs.
+
+    ``lost`` is set when a heartbeat finds the lease taken over (it expired and another
+    worker leased the job), so long-running handlers can stop early.
+    """
+
+    def __init__(self, job_id: int, worker_id: str, lease_seconds: int, session_factory: sessionmaker = SessionLocal):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "JobLease":
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.job_id}-heartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        # Three heartbeats per lease period, so one slow or failed beat doesn't lose the job
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                with self.session_factory() as db:
+                    expires_at = heartbeat_job(db, self.job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {self.job_id} failed: {e}")
+                continue
+            if expires_at is None:
+                logger.warning(f"Lost the lease on job {self.job_id}")
+                self.lost.set()
+                return
+
+JobHandler = Callable[[ProcessingJob, str, JobLease], None]
+
+def run_command(command: List[str], lease: JobLease, timeout: float, name: str) -> str:
+    """Run a subprocess for a job, returns its stdout.
+
+    It is killed when the lease is lost or after ``timeout`` seconds, and a non-zero
+    exit raises RuntimeError with the end of stderr, so the job is retried.
+    """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=1)
+            break
+        except subprocess.TimeoutExpired:
+            if lease.lost.is_set() or time.monotonic() > deadline:
+                process.kill()
+                process.communicate()
+                raise RuntimeError("Lease lost" if lease.lost.is_set() else f"{name} timed out after {timeout:.0f}s")
+
+    if process.returncode != 0:
+        raise RuntimeError(f"{name} exited with {process.returncode}: {stderr.strip()[-500:]}")
+    return stdout
+
+def media_source(storage: StorageBackend, storage_key: str) -> str:
+    """What ffmpeg and pipelines should read a stored file from: its path on local
+    storage (cheap seeks, no HTTP), a presigned URL on object stores"""
+    if isinstance(storage, LocalStorage):
+        return str(storage.path_for(storage_key))
+    return storage.get_download_url(storage_key, private=True)
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def run_next_job(
+    kind: str,
+    handler: JobHandler,
+    worker_id: str,
+    lease_seconds: int = ML_JOB_LEASE_SECONDS,
+    session_factory: sessionmaker = SessionLocal
+) -> Optional[ProcessingJob]:
+    """Lease one job of ``kind`` and run ``handler(job, storage_key, lease)`` on it.
+
+    The job completes if the handler returns, is retried with backoff if it raises, and
+    fails for good on PermanentJobError. Returns the job, or None if nothing was ready.
+    """
+    with session_factory() as db:
+        jobs = lease_jobs(db, worker_id, limit=1, lease_seconds=lease_seconds, kind=kind)
+        if not jobs:
+            return None
+        job = jobs[0]
+        storage_key = db.scalar(select(Video.storage_key).where(Video.id == job.video_id))
+
+    logger.info(f"Running {kind} job {job.id} for video {job.video_id} (attempt {job.attempts}/{job.max_attempts})")
+    try:
+        with JobLease(job.id, worker_id, lease_seconds, session_factory) as lease:
+            handler(job, storage_key, lease)
+    except Exception as e:
+        retry = not isinstance(e, PermanentJobError)
+        logger.error(f"{kind} job {job.id} failed ({'will retry' if retry else 'permanent'}): {e}")
+        with session_factory() as db:
+            fail_job(db, job.id, worker_id, str(e) or type(e).__name__, retry=retry)
+        return job
+
+    with session_factory() as db:
+        if not complete_job(db, job.id, worker_id):
+            logger.warning(f"{kind} job {job.id} finished after its lease was lost")
+    return job
+
+def run_worker(
+    kind: str,
+    handler: JobHandler,
+    worker_id: Optional[str] = None,
+    poll_interval: float = 5.0,
+    once: bool = False,
+    lease_seconds: int = ML_JOB_LEASE_SECONDS,
+    session_factory: sessionmaker = SessionLocal
+) -> int:
+    """Process jobs until interrupted (or until the queue is empty with ``once``), returns jobs run.
+
+    Workers share nothing but the database, so throughput scales by starting more processes.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    logger.info(f"Worker {worker_id} polling for {kind} jobs")
+    while True:
+        try:
+            job = run_next_job(kind, handler, worker_id, lease_seconds, session_factory)
+        except Exception as e:
+            # Database unavailable or similar: back off and keep the worker alive
+            logger.error(f"Worker {worker_id} could not lease a job: {e}")
+            job = None
+        if job is not None:
+            processed += 1
+            continue
+        if once:
+            return processed
+        time.sleep(poll_interval)
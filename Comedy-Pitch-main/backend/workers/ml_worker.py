@@ -0,0 +1,66 @@
+"""
+ML analysis worker: runs the mlmodel pipeline for each leased video and stores its scores.
+
+ML_PIPELINE_COMMAND is the command line to run per video, with {video_id},
+{storage_key} and {media_url} placeholders, e.g.
+
+    ML_PIPELINE_COMMAND="python path/to/pipeline_adapter.py --url {media_url}"
+
+The command must print one MLScoreRequest JSON object on stdout (video_id may be
+omitted); a non-zero exit is retried with backoff, unparseable output is not.
+"""
+import json
+import os
+import shlex
+
+from pydantic import ValidationError
+
+from models.job import ProcessingJob
+from routes.ml import MLScoreRequest, validation_error_message, write_score_batch
+from storage.factory import get_storage
+from workers.base import JobLease, PermanentJobError, run_command
+
+ML_PIPELINE_COMMAND = os.getenv("ML_PIPELINE_COMMAND", "")
+ML_PIPELINE_TIMEOUT = float(os.getenv("ML_PIPELINE_TIMEOUT", "3600"))
+
+def pipeline_command(template: str, job: ProcessingJob, storage_key: str) -> list:
+    """Split the command template and fill in the job's placeholders"""
+    values = {"video_id": job.video_id, "storage_key": storage_key}
+    if "{media_url}" in template:
+        # Presigned, so the pipeline can fetch private sets too
+        values["media_url"] = get_storage().get_download_url(storage_key, private=True)
+    return [part.format(**values) for part in shlex.split(template)]
+
+def parse_pipeline_output(stdout: str, video_id: int) -> MLScoreRequest:
+    """Validate the pipeline's JSON output as an MLScoreRequest for this video"""
+    try:
+        payload = json.loads(stdout)
+    except json.JSONDecodeError as e:
+        raise PermanentJobError(f"Pipeline output is not JSON: {e}")
+    if not isinstance(payload, dict):
+        raise PermanentJobError("Pipeline output must be a JSON object")
+    payload["video_id"] = video_id
+    try:
+        return MLScoreRequest.model_validate(payload)
+    except ValidationError as e:
+        raise PermanentJobError(f"Invalid pipeline output: {validation_error_message(e)}")
+
+def run_ml_pipeline(job: ProcessingJob, storage_key: str, lease: JobLease) -> None:
+    """Job handler: run the pipeline command and upsert its results"""
+    if not ML_PIPELINE_COMMAND:
+        raise RuntimeError("ML_PIPELINE_COMMAND is not set")
+    if not storage_key:
+        raise PermanentJobError("Video no longer exists")
+
+    stdout = run_command(
+        pipeline_command(ML_PIPELINE_COMMAND, job, storage_key),
+        lease,
+        ML_PIPELINE_TIMEOUT,
+        "Pipeline"
+    )
+
+    record = parse_pipeline_output(stdout, job.video_id)
+    with lease.session_factory() as db:
+        result = write_score_batch(db, [(1, record)])[0]
+    if result.status != "ok":
+        raise PermanentJobError(result.error)
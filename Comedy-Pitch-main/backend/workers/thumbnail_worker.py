@@ -0,0 +1,126 @@
+"""
+Thumbnail worker: picks a representative frame from each uploaded set and stores
+WebP thumbnails at THUMBNAIL_WIDTHS.
+
+Candidate frames are grabbed at a few points into the set with input seeking and
+keyframe-only decoding (ffmpeg reads from the nearest keyframe, never the whole
+file); the most detailed one wins, which skips black intros and fades. Pillow
+resizes it and encodes each width as WebP under
+"<storage key without extension>/thumbnails/<width>.webp". Frames are never
+upscaled: a source narrower than a target width gets one thumbnail at its own
+width instead. The video's thumbnail_key and the widths actually written are
+then recorded. Keys are deterministic and a rerun whose recorded files are all
+stored just records them again, so generation is idempotent.
+
+Requires ffmpeg and ffprobe (FFMPEG_PATH / FFPROBE_PATH).
+"""
+import logging
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageStat
+from sqlalchemy import select, update
+
+from models.job import ProcessingJob
+from models.video import THUMBNAIL_WIDTHS, Video, thumbnail_variant_key
+from storage.factory import get_storage
+from workers.base import JobLease, PermanentJobError, media_source, run_command
+from workers.transcode_worker import FFMPEG_PATH, probe_media
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+FRAME_TIMEOUT = 120
+
+# Candidate frames, as fractions of the duration: past the walk-on and into the set
+THUMBNAIL_POSITIONS = (0.1, 0.25, 0.5)
+
+def thumbnail_prefix(storage_key: str) -> str:
+    """Storage prefix for a video's thumbnails, beside the upload"""
+    return f"{os.path.splitext(storage_key)[0]}/thumbnails"
+
+def frame_times(duration: Optional[float]) -> List[float]:
+    """Seconds to grab candidate frames at"""
+    if not duration:
+        return [0.0]
+    return sorted({round(duration * position, 3) for position in THUMBNAIL_POSITIONS})
+
+def frame_command(source: str, seconds: float, output_path: str) -> List[str]:
+    """ffmpeg command writing one keyframe at or after ``seconds``, scaled to the largest width"""
+    return [
+        FFMPEG_PATH, "-hide_banner", "-loglevel", "error", "-y",
+        # Before -i: seek in the container, then decode keyframes only
+        "-skip_frame", "nokey", "-ss", f"{seconds:.3f}", "-i", source,
+        "-frames:v", "1", "-an",
+        "-vf", f"scale='min({max(THUMBNAIL_WIDTHS)},iw)':-2",
+        output_path
+    ]
+
+def frame_detail(image: Image.Image) -> float:
+    """Luma standard deviation: near zero for black, blank or faded frames"""
+    return ImageStat.Stat(image.convert("L")).stddev[0]
+
+def pick_frame(paths: List[str]) -> Image.Image:
+    """Open the candidate frames and return the most detailed one"""
+    frames = []
+    for path in paths:
+        with Image.open(path) as image:
+            frames.append(image.convert("RGB"))
+    if not frames:
+        raise RuntimeError("ffmpeg extracted no frames")
+    return max(frames, key=frame_detail)
+
+def variant_widths(frame_width: int) -> List[int]:
+    """Widths to generate for a frame: the targets it is wider than, then its own width
+    (capped at the largest target) in place of the ones it can't fill"""
+    largest = min(frame_width, max(THUMBNAIL_WIDTHS))
+    return [width for width in THUMBNAIL_WIDTHS if width < largest] + [largest]
+
+def write_variants(frame: Image.Image, output_dir: str) -> List[Tuple[int, str]]:
+    """Encode the frame as WebP at each of its variant widths, returns (width, path) pairs"""
+    variants = []
+    for width in variant_widths(frame.width):
+        variant = frame
+        if frame.width > width:
+            variant = frame.resize((width, max(round(frame.height * width / frame.width), 1)), Image.LANCZOS)
+        path = os.path.join(output_dir, f"{width}.webp")
+        variant.save(path, "WEBP", quality=THUMBNAIL_QUALITY, method=6)
+        variants.append((width, path))
+    return variants
+
+def run_thumbnails(job: ProcessingJob, storage_key: str, lease: JobLease) -> None:
+    """Job handler: generate and store the thumbnails, then record their prefix and widths"""
+    if not storage_key:
+        raise PermanentJobError("Video no longer exists")
+
+    storage = get_storage()
+    prefix = thumbnail_prefix(storage_key)
+    with lease.session_factory() as db:
+        widths = db.scalar(select(Video.thumbnail_widths).where(Video.id == job.video_id))
+
+    if widths and all(storage.file_exists(thumbnail_variant_key(prefix, width)) for width in widths):
+        logger.info(f"Thumbnails for video {job.video_id} already stored")
+    else:
+        source = media_source(storage, storage_key)
+        info = probe_media(source, lease)
+        if not info.has_video:
+            logger.info(f"Video {job.video_id} is audio-only, no thumbnail")
+            return
+
+        with tempfile.TemporaryDirectory(prefix=f"thumbnails-{job.video_id}-") as output_dir:
+            candidates = []
+            for index, seconds in enumerate(frame_times(info.duration)):
+                path = os.path.join(output_dir, f"candidate-{index}.png")
+                run_command(frame_command(source, seconds, path), lease, FRAME_TIMEOUT, "ffmpeg")
+                if os.path.exists(path):
+                    candidates.append(path)
+            widths = []
+            for width, path in write_variants(pick_frame(candidates), output_dir):
+                storage.upload_file(thumbnail_variant_key(prefix, width), path, "image/webp")
+                widths.append(width)
+
+    with lease.session_factory() as db:
+        db.execute(update(Video).where(Video.id == job.video_id).values(thumbnail_key=prefix, thumbnail_widths=widths))
+        db.commit()
+    logger.info(f"Stored thumbnails for video {job.video_id}")
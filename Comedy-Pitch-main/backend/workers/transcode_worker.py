@@ -0,0 +1,201 @@
+"""
+HLS transcoding worker: turns each uploaded set into adaptive-bitrate HLS.
+
+One ffmpeg pass decodes the upload once and encodes a small ladder of H.264
+renditions (never above the source height) plus an audio-only rendition, cut
+into HLS_SEGMENT_SECONDS segments with aligned keyframes so players can switch
+between them. Everything is written under "<storage key without extension>/hls/"
+through the storage backend, master playlist last, and the video's
+hls_manifest_key is set once it is complete. Keys are deterministic, so a
+retried job simply overwrites a partial earlier attempt.
+
+Requires ffmpeg and ffprobe (FFMPEG_PATH / FFPROBE_PATH).
+"""
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import update
+
+from models.job import ProcessingJob
+from models.video import Video
+from storage.factory import get_storage
+from workers.base import JobLease, PermanentJobError, media_source, run_command
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+FFPROBE_PATH = os.getenv("FFPROBE_PATH", "ffprobe")
+TRANSCODE_TIMEOUT = float(os.getenv("TRANSCODE_TIMEOUT", "14400"))
+
+# Six-second segments (Apple's recommendation): short enough to start fast, long
+# enough that a 60-minute set is ~600 segments per rendition
+HLS_SEGMENT_SECONDS = int(os.getenv("HLS_SEGMENT_SECONDS", "6"))
+
+HLS_MASTER_PLAYLIST = "master.m3u8"
+HLS_VARIANT_PLAYLIST = "index.m3u8"
+
+@dataclass(frozen=True)
+class Rendition:
+    """One HLS variant stream; height None means audio-only"""
+    name: str
+    height: Optional[int]
+    video_bitrate: Optional[int]  # bits/s
+    audio_bitrate: int  # bits/s
+
+    @property
+    def bandwidth(self) -> int:
+        return (self.video_bitrate or 0) + self.audio_bitrate
+
+# Lowest first: players start on the first variant listed in the master playlist.
+# Bitrates suit a mostly static stage shot, which compresses well.
+VIDEO_RENDITIONS = (
+    Rendition("360p", 360, 700_000, 96_000),
+    Rendition("540p", 540, 1_500_000, 128_000),
+    Rendition("720p", 720, 2_800_000, 128_000),
+)
+AUDIO_RENDITION = Rendition("audio", None, None, 64_000)
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """What ffprobe found in an upload"""
+    has_video: bool
+    has_audio: bool
+    height: Optional[int]
+    duration: Optional[float]
+
+def hls_prefix(storage_key: str) -> str:
+    """Storage prefix for a video's HLS files, beside the upload"""
+    return f"{os.path.splitext(storage_key)[0]}/hls"
+
+def probe_media(source: str, lease: JobLease) -> MediaInfo:
+    """Read stream layout and duration with ffprobe (container headers only, no decode)"""
+    stdout = run_command(
+        [FFPROBE_PATH, "-v", "error", "-print_format", "json", "-show_streams", "-show_format", source],
+        lease,
+        300,
+        "ffprobe"
+    )
+    try:
+        probe = json.loads(stdout)
+    except json.JSONDecodeError:
+        raise PermanentJobError("ffprobe output is not JSON")
+    streams = probe.get("streams", [])
+    # Cover art is a single-frame "video" stream in many audio files
+    video = next((
+        stream for stream in streams
+        if stream.get("codec_type") == "video" and not stream.get("disposition", {}).get("attached_pic")
+    ), None)
+    has_audio = any(stream.get("codec_type") == "audio" for stream in streams)
+    if video is None and not has_audio:
+        raise PermanentJobError("Upload has no audio or video stream")
+    duration = probe.get("format", {}).get("duration")
+    return MediaInfo(
+        has_video=video is not None,
+        has_audio=has_audio,
+        height=video.get("height") if video else None,
+        duration=float(duration) if duration else None
+    )
+
+def select_renditions(info: MediaInfo) -> List[Rendition]:
+    """The ladder for an upload: video renditions up to the source height (at least the
+    lowest), then audio-only"""
+    renditions = []
+    if info.has_video:
+        renditions = [r for r in VIDEO_RENDITIONS if info.height and r.height <= info.height] or [VIDEO_RENDITIONS[0]]
+    if info.has_audio:
+        renditions.append(AUDIO_RENDITION)
+    return renditions
+
+def ffmpeg_command(source: str, output_dir: str, renditions: List[Rendition], info: MediaInfo) -> List[str]:
+    """One ffmpeg invocation that decodes once and writes every rendition as HLS"""
+    video_renditions = [r for r in renditions if r.height]
+    command = [FFMPEG_PATH, "-hide_banner", "-loglevel", "error", "-y", "-i", source]
+
+    if video_renditions:
+        outputs = "".join(f"[v{i}]" for i in range(len(video_renditions)))
+        scales = ";".join(
+            f"[v{i}]scale=-2:{r.height}[v{i}out]" for i, r in enumerate(video_renditions)
+        )
+        command += ["-filter_complex", f"[0:v:0]split={len(video_renditions)}{outputs};{scales}"]
+
+    stream_map = []
+    audio_index = 0
+    for i, rendition in enumerate(renditions):
+        entry = []
+        if rendition.height:
+            command += ["-map", f"[v{i}out]"]
+            command += [
+                f"-b:v:{i}", str(rendition.video_bitrate),
+                f"-maxrate:v:{i}", str(int(rendition.video_bitrate * 1.07)),
+                f"-bufsize:v:{i}", str(rendition.video_bitrate * 2)
+            ]
+            entry.append(f"v:{i}")
+        if info.has_audio:
+            command += ["-map", "0:a:0", f"-b:a:{audio_index}", str(rendition.audio_bitrate)]
+            entry.append(f"a:{audio_index}")
+            audio_index += 1
+        entry.append(f"name:{rendition.name}")
+        stream_map.append(",".join(entry))
+
+    if video_renditions:
+        command += [
+            "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main", "-pix_fmt", "yuv420p",
+            # Keyframes exactly on segment boundaries, identical across renditions, for clean switching
+            "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})", "-sc_threshold", "0"
+        ]
+    if info.has_audio:
+        command += ["-c:a", "aac", "-ac", "2", "-ar", "48000"]
+
+    command += [
+        "-f", "hls",
+        "-hls_time", str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(output_dir, "%v", "segment_%05d.ts"),
+        "-master_pl_name", HLS_MASTER_PLAYLIST,
+        "-var_stream_map", " ".join(stream_map),
+        os.path.join(output_dir, "%v", HLS_VARIANT_PLAYLIST)
+    ]
+    return command
+
+def upload_hls(output_dir: Path, prefix: str) -> str:
+    """Upload every rendition's files, then the master playlist; returns the master key"""
+    storage = get_storage()
+    master = output_dir / HLS_MASTER_PLAYLIST
+    if not master.is_file():
+        raise RuntimeError("ffmpeg wrote no master playlist")
+
+    # Segments before their playlists, and the master last, so nothing referenced is ever missing
+    files = sorted(
+        (path for path in output_dir.rglob("*") if path.is_file() and path != master),
+        key=lambda path: (path.suffix == ".m3u8", str(path))
+    )
+    for path in files:
+        content_type = "application/vnd.apple.mpegurl" if path.suffix == ".m3u8" else "video/mp2t"
+        storage.upload_file(f"{prefix}/{path.relative_to(output_dir).as_posix()}", str(path), content_type)
+    master_key = f"{prefix}/{HLS_MASTER_PLAYLIST}"
+    storage.upload_file(master_key, str(master), "application/vnd.apple.mpegurl")
+    return master_key
+
+def run_transcode(job: ProcessingJob, storage_key: str, lease: JobLease) -> None:
+    """Job handler: transcode the upload to HLS and record the master playlist"""
+    if not storage_key:
+        raise PermanentJobError("Video no longer exists")
+
+    source = media_source(get_storage(), storage_key)
+    info = probe_media(source, lease)
+    renditions = select_renditions(info)
+    with tempfile.TemporaryDirectory(prefix=f"hls-{job.video_id}-") as output_dir:
+        for rendition in renditions:
+            os.makedirs(os.path.join(output_dir, rendition.name))
+        run_command(ffmpeg_command(source, output_dir, renditions, info), lease, TRANSCODE_TIMEOUT, "ffmpeg")
+        master_key = upload_hls(Path(output_dir), hls_prefix(storage_key))
+
+    with lease.session_factory() as db:
+        db.execute(update(Video).where(Video.id == job.video_id).values(hls_manifest_key=master_key))
+        db.commit()
+    logger.info(f"Transcoded video {job.video_id} to {', '.join(r.name for r in renditions)}")